@@ -8,6 +8,12 @@ from django.shortcuts import render
 from drf_yasg.utils import swagger_auto_schema
 from django.shortcuts import redirect
 from core.decorators import check_team_permission
+from core.pagination import paginate
+from core.serializers.projections import USER_PROJECTION
+from core.services.search import search_queryset, USER_SEARCH, RANK_FIELD
+from core.services.counts import count_records, get_team_scope
+from core.services.versions import USER
+from core.services.reference import get_reference_data
 from django.db.models import Q
 from rest_framework.exceptions import PermissionDenied
 from .models import Team
@@ -112,6 +118,19 @@ class LogoutView(APIView):
         return response
 
 
+def get_team_permissions(team_ids):
+    """
+    Takımların yetki adlarını tek sorguda okur (Team.cache_permissions ile aynı küme).
+    Returns:
+        dict: {takım id: {yetki adı}}
+    """
+    permissions = {}
+    rows = Team.permissions.through.objects.filter(team_id__in=team_ids).values_list('team_id', 'teampermission__name')
+    for team_id, name in rows:
+        permissions.setdefault(team_id, set()).add(name)
+    return permissions
+
+
 class UserView(APIView):
     
     template_name = 'accounts/user_list.html'
@@ -131,12 +150,7 @@ class UserView(APIView):
         elif not user.team.is_assembly_team:
             queryset = queryset.filter(type_id=user.team.part_type_id) 
         
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(type__name__icontains=search) |
-                Q(aircraft_type__name__icontains=search)
-            )
+        queryset = search_queryset(queryset, search, USER_SEARCH)
 
         if order_by:
             queryset = queryset.order_by(order_by)
@@ -159,25 +173,38 @@ class UserView(APIView):
             search = request.GET.get('search_value', '')
             order_column = request.GET.get('order_column', 0)
             order_dir = request.GET.get('order_dir', 'asc')
-            start = int(request.GET.get('start', 0))
-            length = int(request.GET.get('length', 10))
 
             columns = ['username', 'mail', 'team', 'is_superuser']
             
             order_by = columns[int(order_column)] if int(order_column) < len(columns) else 'name'
             if order_dir == 'desc':
                 order_by = '-' + order_by
+            # Sıralama sütunu seçilmeden arama yapıldığında sonuçlar eşleşme puanına göre sıralanır
+            if search and 'order_column' not in request.GET:
+                order_by = '-' + RANK_FIELD
             
             queryset = self.get_queryset(search=search, order_by=order_by)
+            # Her sayı istek başına en fazla bir kez hesaplanır, sonuç tablo sürümüne göre önbelleğe alınır
+            records_total, records_filtered = count_records(
+                'user', queryset, self.get_queryset(), get_team_scope(request.user), search, [USER]
+            )
+
+            # cursor parametresi verilirse OFFSET yerine (sıralama değeri, id) üzerinden sayfalanır
+            # Satırlar model nesnesi oluşturulmadan okunur, çıktı UserSerializer ile aynıdır
+            rows, next_cursor, prev_cursor = paginate(request, USER_PROJECTION.values(queryset), order_by)
 
-            paginated_queryset = queryset[start:start + length]
+            rows = list(rows)
+            permissions = get_team_permissions({row['team_id'] for row in rows if row['team_id']})
+            for row in rows:
+                row['permissions'] = list(permissions.get(row['team_id'], ()))
 
-            serializer = UserSerializer(paginated_queryset, many=True)
             response_data = {
                 "draw": int(request.GET.get('draw', 1)),  
-                "recordsTotal": queryset.count(),  
-                "recordsFiltered": queryset.count(),  
-                "data": serializer.data 
+                "recordsTotal": records_total,
+                "recordsFiltered": records_filtered,
+                "data": USER_PROJECTION.serialize(rows),
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             }
 
             return Response(response_data)
@@ -308,6 +335,7 @@ class TeamListView(APIView):
     @check_team_permission('manage_users')
     def get(self, request):
         """GET metodu - Takım listesini döndürür"""
-        teams = Team.objects.all()
+        # Takımlar referans önbelleğinden okunur
+        teams = get_reference_data().teams
         serializer = TeamSerializer(teams, many=True)
         return Response(serializer.data)
\ No newline at end of file
@@ -98,6 +98,16 @@ DATABASES = {
     }
 }
 
+# Cache
+# Önbelleğe alınan kayıt sayıları tüm gunicorn worker'larında aynı olmalı, tablo sürümleri TableVersion tablosundadır
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -272,6 +282,11 @@ LOGGING = {
 }
 
 
+# Envanter ayarları
+# True ise envanter yazmaları sadece hareket defterine eklenir, anlık görüntüler compact_inventory komutu ile güncellenir
+INVENTORY_DEFERRED_SNAPSHOTS = os.getenv('INVENTORY_DEFERRED_SNAPSHOTS', 'False').lower() == 'true'
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -294,6 +294,25 @@ LOGGING = {
 }
 
 
+# Envanter ayarları
+# True ise envanter yazmaları sadece hareket defterine eklenir, anlık görüntüler compact_inventory komutu ile güncellenir
+INVENTORY_DEFERRED_SNAPSHOTS = os.getenv('INVENTORY_DEFERRED_SNAPSHOTS', 'False').lower() == 'true'
+
+# Önbelleğe alınan kayıt sayıları tüm gunicorn süreçlerinin ortak okuduğu veritabanı tablosunda tutulur
+# (tablo: createcachetable). Tablo sürümleri önbellekte değil TableVersion sayaçlarında tutulur,
+# MAX_ENTRIES aşıldığında yapılan temizlik (cull) sürümleri silmez
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
+# Referans verisi önbelleği, paylaşılan sürüm anahtarı en fazla bu aralıkla (saniye) kontrol edilir
+REFERENCE_CACHE_CHECK_INTERVAL = float(os.getenv('REFERENCE_CACHE_CHECK_INTERVAL', 1))
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
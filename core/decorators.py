@@ -1,7 +1,12 @@
+import hashlib
 from functools import wraps
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from .services.counts import ALL_SCOPE, get_team_scope
+from .services.versions import get_versions, version_names
 
 import logging
 
@@ -20,4 +25,63 @@ def check_team_permission(permission):
                 return redirect('403')
             return view_func(self, request, *args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+
+# DataTables'ın her istekte değişen sayaç ve önbellek parametreleri ETag'e dahil edilmez
+ETAG_IGNORED_PARAMS = {'draw', '_'}
+
+
+def team_scope(request, kwargs):
+    """Listelerdeki takım kapsamı: tüm kayıtlar için None, diğer takımlar için 'part_type:<id>'"""
+    scope = get_team_scope(request.user)
+    return None if scope == ALL_SCOPE else scope
+
+
+def part_type_scope(kwarg):
+    """Kapsamı URL'deki parça tipi parametresinden alır"""
+    def scope(request, kwargs):
+        return f'part_type:{kwargs[kwarg]}'
+    return scope
+
+
+def conditional_response(*tables, scope=None):
+    """
+    GET yanıtlarına ilgili tabloların sürümlerinden üretilen ETag ekler.
+    İstekteki If-None-Match güncel ETag ile eşleşirse görünüm çalıştırılmaz, sorgu ve serializer
+    atlanarak 304 döner. Sürümler yazma işlemlerinde artırıldığı için ETag veri değişince kendiliğinden değişir.
+    tables: yanıtı etkileyen tablolar (versions modülündeki isimler)
+    scope: (request, kwargs) alıp sürüm kapsamını döndüren fonksiyon (team_scope, part_type_scope)
+    check_team_permission'dan sonra (altında) kullanılmalıdır.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(self, request, *args, **kwargs):
+            view_scope = scope(request, kwargs) if scope else None
+            params = sorted(
+                (key, value) for key, value in request.GET.lists() if key not in ETAG_IGNORED_PARAMS
+            )
+            validator = '|'.join([
+                request.path,
+                str(params),
+                request.content_type,
+                str(view_scope),
+                get_versions(*version_names(tables, view_scope)),
+            ])
+            etag = quote_etag(hashlib.md5(validator.encode()).hexdigest())
+
+            if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+            if etag in if_none_match or '*' in if_none_match:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = view_func(self, request, *args, **kwargs)
+                # HTML sayfaları (render) ve hata yanıtları ETag almaz
+                if not isinstance(response, Response) or response.status_code != status.HTTP_200_OK:
+                    return response
+
+            response['ETag'] = etag
+            # Tarayıcı yanıtı saklar ama her kullanımda sunucuya doğrulatır
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,170 @@
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from accounts.models import Team
+from accounts.serializers import UserSerializer
+from accounts.views import get_team_permissions
+from core.models.aircraft import Aircraft
+from core.models.assembly import Assembly
+from core.models.inventory import Inventory
+from core.models.part import Part, PartType
+from core.serializers.assembly import AssemblySummarySerializer
+from core.serializers.inventory import InventorySerializer
+from core.serializers.part import PartSerializer
+from core.serializers.projections import (
+    ASSEMBLY_SUMMARY_PROJECTION, INVENTORY_PROJECTION, PART_PROJECTION, USER_PROJECTION
+)
+from core.services.assembly import get_assembly_summaries
+from core.services.part import produce_parts
+
+
+def add_summaries(items, get_id, assign):
+    summaries = get_assembly_summaries([get_id(item) for item in items])
+    for item in items:
+        assign(item, summaries[get_id(item)])
+
+
+def assign_summary(assembly, summary):
+    assembly.part_count = summary['part_count']
+    assembly.part_types = summary['part_types']
+    assembly.teams = summary['teams']
+
+
+def add_permissions(rows):
+    permissions = get_team_permissions({row['team_id'] for row in rows if row['team_id']})
+    for row in rows:
+        row['permissions'] = list(permissions.get(row['team_id'], ()))
+
+
+class Command(BaseCommand):
+    help = 'Liste uç noktalarının DRF serializer ve projeksiyon (.values()) ile sorgu + serileştirme ve sadece serileştirme süresini karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Sayfadaki satır sayısı')
+        parser.add_argument('--repeat', type=int, default=20, help='Ölçüm tekrar sayısı')
+
+    def handle(self, *args, **options):
+        # Veriler tek transaction içinde oluşturulur ve ölçümden sonra geri alınır
+        with transaction.atomic():
+            for name, *paths in self.create_pages(options['rows']):
+                self.measure(name, *paths, options['repeat'])
+            transaction.set_rollback(True)
+
+    def create_pages(self, rows):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+
+        aircraft = Aircraft.objects.create(name=f"benchmark-{suffix}")
+        part_type = PartType.objects.create(name=f"benchmark-{suffix}")
+        team = Team.objects.create(name=f"benchmark-{suffix}", part_type=part_type)
+        users = User.objects.bulk_create([
+            User(username=f"benchmark-{suffix}-{i}", first_name="Ad", last_name=f"Soyad {i}", team=team)
+            for i in range(rows)
+        ])
+
+        parts = produce_parts(users[0], [
+            {'name': f"PRC-{i}", 'type_id': part_type.id, 'aircraft_type_id': aircraft.id}
+            for i in range(rows)
+        ])
+        assemblies = Assembly.objects.bulk_create([
+            Assembly(aircraft_type=aircraft, assembled_by=users[i], notes=f"Montaj {i}")
+            for i in range(rows)
+        ])
+        Assembly.parts.through.objects.bulk_create([
+            Assembly.parts.through(assembly_id=assembly.id, part_id=part.id)
+            for assembly, part in zip(assemblies, parts)
+        ])
+
+        part_types = PartType.objects.bulk_create([
+            PartType(name=f"benchmark-{suffix}-{i}") for i in range(rows)
+        ])
+        Inventory.objects.bulk_create([
+            Inventory(part_type=item, aircraft_type=aircraft, quantity=i) for i, item in enumerate(part_types)
+        ])
+
+        # Her sayfa için (ad, DRF yolu, projeksiyon yolu), ikisi de sorguyu çalıştırıp JSON'a hazır liste döndürür
+        part_queryset = Part.objects.filter(aircraft_type=aircraft).order_by('id')
+        inventory_queryset = (
+            Inventory.objects.filter(aircraft_type=aircraft, part_type__in=part_types).with_current_quantity().order_by('id')
+        )
+        assembly_queryset = Assembly.objects.filter(aircraft_type=aircraft).order_by('id')
+        user_queryset = User.objects.filter(team=team).order_by('id')
+
+        def load_assemblies():
+            assemblies = list(assembly_queryset.select_related('aircraft_type', 'assembled_by', 'assembled_by__team'))
+            add_summaries(assemblies, lambda assembly: assembly.id, assign_summary)
+            return assemblies
+
+        def load_assembly_rows():
+            rows = list(ASSEMBLY_SUMMARY_PROJECTION.values(assembly_queryset))
+            add_summaries(rows, lambda row: row['id'], dict.update)
+            return rows
+
+        def load_user_rows():
+            rows = list(USER_PROJECTION.values(user_queryset))
+            add_permissions(rows)
+            return rows
+
+        # Her sayfa için (ad, DRF yükleme, DRF serileştirme, projeksiyon yükleme, projeksiyon serileştirme)
+        # Yükleme sorguyu çalıştırır, serileştirme yüklenen liste üzerinden JSON'a hazır liste döndürür
+        return [
+            (
+                'Part',
+                lambda: list(part_queryset.select_related('type', 'aircraft_type', 'created_by', 'created_by__team')),
+                lambda parts: PartSerializer(parts, many=True).data,
+                lambda: list(PART_PROJECTION.values(part_queryset)),
+                PART_PROJECTION.serialize,
+            ),
+            (
+                'Inventory',
+                lambda: list(inventory_queryset.select_related('part_type', 'aircraft_type')),
+                lambda inventories: InventorySerializer(inventories, many=True).data,
+                lambda: list(INVENTORY_PROJECTION.values(inventory_queryset)),
+                INVENTORY_PROJECTION.serialize,
+            ),
+            (
+                'AssemblySummary',
+                load_assemblies,
+                lambda assemblies: AssemblySummarySerializer(assemblies, many=True).data,
+                load_assembly_rows,
+                ASSEMBLY_SUMMARY_PROJECTION.serialize,
+            ),
+            (
+                'User',
+                # DRF yolu yetkileri satır başına okur, bu yüzden yükleme ve serileştirme ayrılmaz
+                lambda: list(user_queryset.select_related('team')),
+                lambda users: UserSerializer(users, many=True).data,
+                load_user_rows,
+                USER_PROJECTION.serialize,
+            ),
+        ]
+
+    def measure(self, name, drf_load, drf_serialize, projection_load, projection_serialize, repeat):
+        # İlk çalıştırma ısınma ve çıktı karşılaştırması içindir
+        renderer = JSONRenderer()
+        instances, rows = drf_load(), projection_load()
+        if renderer.render(projection_serialize(rows)) != renderer.render(drf_serialize(instances)):
+            self.stdout.write(self.style.ERROR(f"{name}: çıktılar farklı"))
+            return
+
+        drf_total = self.timed(lambda: drf_serialize(drf_load()), repeat)
+        projection_total = self.timed(lambda: projection_serialize(projection_load()), repeat)
+        drf_time = self.timed(lambda: drf_serialize(instances), repeat)
+        projection_time = self.timed(lambda: projection_serialize(rows), repeat)
+
+        self.stdout.write(
+            f"{name:>16}: sorgu + serileştirme DRF {drf_total * 1000:.1f} ms, projeksiyon {projection_total * 1000:.1f} ms "
+            + self.style.SUCCESS(f"{drf_total / projection_total:.1f}x")
+            + f" | serileştirme DRF {drf_time * 1000:.1f} ms, projeksiyon {projection_time * 1000:.1f} ms "
+            + self.style.SUCCESS(f"{drf_time / projection_time:.1f}x")
+        )
+
+    def timed(self, function, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        return (time.perf_counter() - started) / repeat
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from core.services.inventory import compact_inventory_movements
+
+
+class Command(BaseCommand):
+    help = 'Bekleyen envanter hareketlerini Inventory anlık görüntülerine işler'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Tek transaction içinde işlenecek hareket sayısı'
+        )
+
+    def handle(self, *args, **options):
+        # Parti dolu geldiği sürece devam edilir, sürekli yazılan hareketler komutu sonsuza kadar çalıştırmaz
+        total = 0
+        while True:
+            compacted = compact_inventory_movements(batch_size=options['batch_size'])
+            total += compacted
+            if compacted < options['batch_size']:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f'{total} envanter hareketi işlendi'))
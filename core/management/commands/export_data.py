@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from core.services.export import EXPORT_CHUNK_SIZE, EXPORTS, FORMATS, get_export_rows, render_export
+
+
+class Command(BaseCommand):
+    help = 'Parça, montaj veya envanter kayıtlarını CSV / NDJSON olarak dosyaya veya standart çıktıya aktarır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=list(EXPORTS), help='Dışa aktarılacak kayıt')
+        parser.add_argument('--format', dest='export_format', choices=list(FORMATS), default='csv', help='Çıktı formatı')
+        parser.add_argument('--output', help='Çıktı dosyası, verilmezse standart çıktıya yazılır')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Sunucu taraflı imleçten tek seferde okunacak satır sayısı'
+        )
+
+    def handle(self, *args, **options):
+        name = options['model']
+        rows = get_export_rows(name, chunk_size=options['chunk_size'])
+        lines = render_export(name, rows, options['export_format'])
+
+        # Satırlar okundukça yazılır, dosya boyutundan bağımsız olarak bellekte biriktirilmez
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        count = -1 if options['export_format'] == 'csv' else 0
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            for line in lines:
+                output.write(line)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'{count} kayıt {options["output"]} dosyasına aktarıldı'))
@@ -0,0 +1,86 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from core.services.planning import compute_plan, get_planning_matrices, get_stock_matrix, plan_production
+
+
+class Command(BaseCommand):
+    help = 'Hedef üretim planı için net parça ihtiyacını, darboğaz parça tiplerini ve üretilebilir uçak sayısını hesaplar (MRP)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            action='append',
+            default=[],
+            metavar='UCAK_ID=ADET',
+            help='Uçak tipi hedefi, birden fazla verilebilir'
+        )
+        parser.add_argument(
+            '--all',
+            type=int,
+            metavar='ADET',
+            help='Tüm uçak tipleri için aynı hedef'
+        )
+        parser.add_argument('--json', action='store_true', help='Sonucu JSON olarak yazar')
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            metavar='UCAK_TIPI',
+            help='Veritabanı yerine bu kadar uçak tipi ve --part-types parça tipi ile rastgele matrislerde hesap süresini ölçer'
+        )
+        parser.add_argument('--part-types', type=int, default=50, help='Benchmark parça tipi sayısı')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self.benchmark(options['benchmark'], options['part_types'])
+            return
+
+        matrices = get_planning_matrices()
+        targets = {}
+        if options['all'] is not None:
+            targets = {aircraft_id: options['all'] for aircraft_id in matrices.aircraft_ids.tolist()}
+        for target in options['target']:
+            try:
+                aircraft_id, count = (int(value) for value in target.split('='))
+            except ValueError:
+                raise CommandError(f"Geçersiz hedef: {target} (UCAK_ID=ADET bekleniyor)")
+            if aircraft_id not in matrices.aircraft_ids:
+                raise CommandError(f"Uçak tipi bulunamadı: {aircraft_id}")
+            targets[aircraft_id] = count
+
+        stock = get_stock_matrix(matrices)
+        started = time.perf_counter()
+        plan = plan_production(targets, matrices=matrices, stock=stock)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if options['json']:
+            self.stdout.write(json.dumps(plan, ensure_ascii=False, indent=2))
+            return
+
+        for row in plan['aircrafts']:
+            self.stdout.write(
+                f"{row['aircraft_type']}: hedef {row['target']}, üretilebilir {row['max_buildable']}"
+                + (f", darboğaz: {', '.join(row['bottlenecks'])}" if row['bottlenecks'] else '')
+            )
+        for row in plan['part_types']:
+            self.stdout.write(
+                f"{row['part_type']} ({row['team'] or 'takım yok'}): brüt {row['gross']}, stoktan {row['allocated']}, net {row['net']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Plan {elapsed:.1f} ms içinde hesaplandı"))
+
+    def benchmark(self, aircraft_count, part_type_count):
+        rng = np.random.default_rng(0)
+        # Her uçak tipi parça tiplerinin yaklaşık dörtte birini kullanır
+        bom = rng.integers(1, 5, size=(aircraft_count, part_type_count)) * (rng.random((aircraft_count, part_type_count)) < 0.25)
+        stock = rng.integers(0, 50, size=(aircraft_count, part_type_count))
+        target = rng.integers(0, 20, size=aircraft_count)
+
+        started = time.perf_counter()
+        result = compute_plan(bom, stock, target)
+        net_by_part_type = result.net.sum(axis=0)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(f"{aircraft_count} uçak tipi x {part_type_count} parça tipi, toplam net ihtiyaç {int(net_by_part_type.sum())}")
+        self.stdout.write(self.style.SUCCESS(f"Plan {elapsed:.1f} ms içinde hesaplandı"))
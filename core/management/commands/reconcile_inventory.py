@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from core.models.aircraft import Aircraft
+from core.models.part import PartType
+from core.services.reconciliation import reconcile_inventory
+
+
+class Command(BaseCommand):
+    help = 'Envanter sayaçlarını Part tablosu ile karşılaştırır, farkları raporlar ve istenirse düzeltir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Bulunan farkları envantere uygular'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Sadece son çalışmadan bu yana değişen parça tipi / uçak tipi çiftlerini kontrol eder'
+        )
+        parser.add_argument(
+            '--since',
+            help='Sadece bu tarihten (ISO 8601) sonra değişen çiftleri kontrol eder'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Düzeltme sırasında tek transaction içinde işlenecek satır sayısı'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"Geçersiz tarih: {options['since']}")
+
+        run, drifts = reconcile_inventory(
+            repair=options['repair'],
+            incremental=options['incremental'],
+            since=since,
+            chunk_size=options['chunk_size']
+        )
+
+        if not drifts:
+            self.stdout.write(self.style.SUCCESS('Envanter tutarlı, fark bulunamadı'))
+            return
+
+        # İsimleri rapor için toplu al
+        part_types = PartType.objects.in_bulk({drift.part_type_id for drift in drifts})
+        aircrafts = Aircraft.objects.in_bulk({drift.aircraft_type_id for drift in drifts})
+
+        for drift in drifts:
+            self.stdout.write(
+                f"{aircrafts.get(drift.aircraft_type_id, drift.aircraft_type_id)} - "
+                f"{part_types.get(drift.part_type_id, drift.part_type_id)}: "
+                f"kayıtlı {drift.recorded}, gerçek {drift.actual}, fark {drift.actual - drift.recorded:+d}"
+            )
+
+        if options['repair']:
+            self.stdout.write(self.style.SUCCESS(f'{len(drifts)} envanter farkı düzeltildi'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(drifts)} envanter farkı bulundu'))
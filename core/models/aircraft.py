@@ -61,4 +61,31 @@ class AircraftRequirement(models.Model):
         return f"{self.aircraft_type} - {self.part_type} ({self.quantity} adet)"
 
 
+class AircraftBuildability(models.Model):
+    """
+    Her uçak tipi için mevcut envanterle kaç adet tam uçak üretilebileceğini tutar.
+    Envanter değiştikçe sadece etkilenen uçak tipi için yeniden hesaplanır.
+    """
+    aircraft_type = models.OneToOneField(
+        Aircraft,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='buildability',
+        verbose_name="Hava Aracı"
+    )
+    buildable_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Üretilebilir Adet"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Son Güncelleme"
+    )
 
+    class Meta:
+        verbose_name = "Üretilebilir Hava Aracı"
+        verbose_name_plural = "Üretilebilir Hava Araçları"
+        ordering = ['aircraft_type__name']
+
+    def __str__(self):
+        return f"{self.aircraft_type} ({self.buildable_count} adet)"
@@ -1,6 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
 from .aircraft import Aircraft
+from ..services.indexes import register_postgres_indexes
+from ..services.search import search_vector
 
 
 class Assembly(models.Model):
@@ -42,4 +45,10 @@ class Assembly(models.Model):
 
     def __str__(self):
         return f"{self.aircraft_type} Montajı - {self.assembled_at}"
+
+
+register_postgres_indexes(Assembly, [
+    # Liste aramasında kullanılan tsvector ifadesi ile aynı olmalı
+    GinIndex(search_vector('notes'), name='assembly_notes_search'),
+])
                     
\ No newline at end of file
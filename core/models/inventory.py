@@ -1,9 +1,43 @@
 # core/models/inventory.py
 from django.db import models
+from django.conf import settings
 from django.core.validators import MinValueValidator
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from ..services.indexes import register_postgres_indexes
+
+
+class InventoryQuerySet(models.QuerySet):
+
+    def with_current_quantity(self):
+        """
+        Anlık görüntüdeki miktara henüz işlenmemiş hareketleri ekleyerek current_quantity alanını annotate eder.
+        Bekleyen hareketler kısmi indeks üzerinden toplanır.
+        """
+        pending = (
+            InventoryMovement.objects
+            .filter(
+                is_compacted=False,
+                part_type_id=OuterRef('part_type_id'),
+                aircraft_type_id=OuterRef('aircraft_type_id')
+            )
+            .order_by()
+            .values('part_type_id')
+            .annotate(total=Sum('delta'))
+            .values('total')
+        )
+        return self.annotate(
+            current_quantity=F('quantity') + Coalesce(Subquery(pending), 0)
+        )
 
 
 class Inventory(models.Model):
+    class StockStatuses(models.TextChoices):
+        OK = 'ok', 'Yeterli'
+        CRITICAL = 'critical', 'Kritik Seviye'
+        OUT_OF_STOCK = 'out_of_stock', 'Stok Yok'
+
     part_type = models.ForeignKey(
         'PartType',
         on_delete=models.CASCADE,
@@ -26,16 +60,206 @@ class Inventory(models.Model):
         validators=[MinValueValidator(1)],
         verbose_name="Minimum Adet"
     )
+    # Envanter güncellenirken eşik geçişlerinde değişir, kritik liste tüm envanteri taramadan okunur
+    stock_status = models.CharField(
+        max_length=20,
+        choices=StockStatuses.choices,
+        default=StockStatuses.OK,
+        verbose_name="Stok Durumu"
+    )
     updated_at = models.DateTimeField(
         auto_now=True,
         verbose_name="Son Güncelleme"
     )
 
+    objects = InventoryQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Envanter"
         verbose_name_plural = "Envanter"
         unique_together = ['part_type', 'aircraft_type']
+        indexes = [
+            models.Index(
+                fields=['stock_status'],
+                condition=~Q(stock_status='ok'),
+                name='inventory_critical'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.aircraft_type} - {self.part_type} ({self.quantity})"
 
+
+class InventoryMovement(models.Model):
+    """
+    Envanter hareket defteri. Satırlar sadece eklenir, güncellenmez.
+    is_compacted=False olan hareketler henüz Inventory anlık görüntüsüne işlenmemiştir.
+    """
+    class Reasons(models.TextChoices):
+        PRODUCED = 'produced', 'Üretildi'
+        CONSUMED = 'consumed', 'Montajda Kullanıldı'
+        RESTORED = 'restored', 'Montaj İptalinde Geri Alındı'
+        DELETED = 'deleted', 'Silindi'
+        ADJUSTED = 'adjusted', 'Mutabakat Düzeltmesi'
+
+    part_type = models.ForeignKey(
+        'PartType',
+        on_delete=models.CASCADE,
+        related_name='inventory_movements',
+        verbose_name="Parça Tipi"
+    )
+    aircraft_type = models.ForeignKey(
+        'Aircraft',
+        on_delete=models.CASCADE,
+        related_name='inventory_movements',
+        verbose_name="Hava Aracı"
+    )
+    delta = models.IntegerField(
+        verbose_name="Miktar Değişimi"
+    )
+    reason = models.CharField(
+        max_length=20,
+        choices=Reasons.choices,
+        verbose_name="Sebep"
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='inventory_movements',
+        verbose_name="İşlemi Yapan"
+    )
+    # Montaj ve parça silinse de hareket geçmişinde referans kalsın diye veritabanı kısıtı kullanılmaz
+    assembly = models.ForeignKey(
+        'Assembly',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Montaj"
+    )
+    part = models.ForeignKey(
+        'Part',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Parça"
+    )
+    is_compacted = models.BooleanField(
+        default=False,
+        verbose_name="Anlık Görüntüye İşlendi mi?"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Oluşturulma Tarihi"
+    )
+
+    class Meta:
+        verbose_name = "Envanter Hareketi"
+        verbose_name_plural = "Envanter Hareketleri"
+        ordering = ['-created_at']
+        indexes = [
+            # Okumalarda ve sıkıştırmada sadece bekleyen hareketler taranır
+            models.Index(
+                fields=['part_type', 'aircraft_type'],
+                condition=Q(is_compacted=False),
+                name='inventory_movement_pending'
+            ),
+            # Belirli bir tarihteki stok sorguları için
+            models.Index(
+                fields=['part_type', 'aircraft_type', 'created_at'],
+                name='inventory_movement_history'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.aircraft_type} - {self.part_type} ({self.delta:+d}, {self.get_reason_display()})"
+
+
+register_postgres_indexes(InventoryMovement, [
+    # Artımlı mutabakat son çalışmadan bu yana hareket gören anahtarları bu indeksle bulur
+    models.Index(fields=['created_at'], name='inventory_movement_created_at'),
+])
+
+
+class InventoryAlert(models.Model):
+    """
+    Stok durumu eşik geçişi kaydı.
+    Miktar minimum seviyenin altına indiğinde, sıfırlandığında veya tekrar yeterli seviyeye çıktığında eklenir.
+    """
+    part_type = models.ForeignKey(
+        'PartType',
+        on_delete=models.CASCADE,
+        related_name='inventory_alerts',
+        verbose_name="Parça Tipi"
+    )
+    aircraft_type = models.ForeignKey(
+        'Aircraft',
+        on_delete=models.CASCADE,
+        related_name='inventory_alerts',
+        verbose_name="Hava Aracı"
+    )
+    previous_status = models.CharField(
+        max_length=20,
+        choices=Inventory.StockStatuses.choices,
+        verbose_name="Önceki Durum"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Inventory.StockStatuses.choices,
+        verbose_name="Yeni Durum"
+    )
+    quantity = models.IntegerField(
+        verbose_name="Miktar"
+    )
+    minimum_quantity = models.PositiveIntegerField(
+        verbose_name="Minimum Adet"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Oluşturulma Tarihi"
+    )
+
+    class Meta:
+        verbose_name = "Stok Uyarısı"
+        verbose_name_plural = "Stok Uyarıları"
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.aircraft_type} - {self.part_type}: {self.get_previous_status_display()} -> {self.get_status_display()}"
+
+
+class InventoryReconciliation(models.Model):
+    """Envanter mutabakat çalışmalarının kaydı, artımlı çalışmada başlangıç noktası olarak kullanılır"""
+    started_at = models.DateTimeField(
+        verbose_name="Başlangıç Tarihi"
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Bitiş Tarihi"
+    )
+    is_incremental = models.BooleanField(
+        default=False,
+        verbose_name="Artımlı mı?"
+    )
+    drift_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Fark Sayısı"
+    )
+    is_repaired = models.BooleanField(
+        default=False,
+        verbose_name="Düzeltildi mi?"
+    )
+
+    class Meta:
+        verbose_name = "Envanter Mutabakatı"
+        verbose_name_plural = "Envanter Mutabakatları"
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.started_at} ({self.drift_count} fark)"
@@ -1,10 +1,13 @@
-from django.db import models, transaction
+from django.db import models
+from django.db.models import Q
 from django.conf import settings
-from django.db.models import F
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from django.contrib.postgres.indexes import GinIndex
 
-from .inventory import Inventory
+from ..services.indexes import register_postgres_indexes
+from ..services.inventory import adjust_inventory, Reasons
+from ..services.search import search_vector
 
 
 class PartType(models.Model):
@@ -57,6 +60,10 @@ class Part(models.Model):
         default=False,
         verbose_name="Kullanıldı mı?"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Güncellenme Tarihi"
+    )
 
     class Meta:
         verbose_name = "Parça"
@@ -67,29 +74,49 @@ class Part(models.Model):
         return f"{self.name} - {self.aircraft_type}"
 
 
+register_postgres_indexes(Part, [
+    # Kullanılabilir parçalar (uçak tipi, parça tipi, is_used=False) ve FIFO sırası, sadece stoktaki parçaları içerir
+    models.Index(
+        fields=['aircraft_type', 'type', 'created_at', 'id'],
+        condition=Q(is_used=False),
+        name='part_available_fifo'
+    ),
+    # Liste ve imleçli sayfalama sırası (created_at, id), indeks her iki yönde de okunabilir
+    models.Index(fields=['created_at', 'id'], name='part_created_at'),
+    # Takım listeleri parça tipine göre filtrelenip aynı sırada okunur
+    models.Index(fields=['type', 'created_at', 'id'], name='part_type_created_at'),
+    # Artımlı mutabakat son kontrolden sonra değişen parçaları bu alanla bulur
+    models.Index(fields=['updated_at'], name='part_updated_at'),
+    # Liste aramasında kullanılan tsvector ifadesi ile aynı olmalı
+    GinIndex(search_vector('name'), name='part_name_search'),
+])
+
+
 
 
 # Yeni parça oluşturulduğunda veya güncellendiğinde envanteri günceller
 @receiver(post_save, sender=Part)
 def update_inventory_on_save(sender, instance, created, **kwargs):
-    with transaction.atomic():
-        if created:
-            # Yeni parça eklendiğinde envanteri güncelle
-            inventory, _ = Inventory.objects.get_or_create(
-                part_type=instance.type,
-                aircraft_type=instance.aircraft_type
-                )
-            inventory.quantity += 1
-            inventory.save()
-
-        elif instance.is_used:
-            # Parça kullanıldı olarak işaretlendiyse envanteri azalt
-            inventory = Inventory.objects.get(
-                part_type=instance.type,
-                aircraft_type=instance.aircraft_type
-                )
-            inventory.quantity -= 1
-            inventory.save()
+    if created:
+        # Yeni parça eklendiğinde envanteri tek sorguda artır
+        adjust_inventory(
+            instance.type_id,
+            instance.aircraft_type_id,
+            1,
+            reason=Reasons.PRODUCED,
+            actor=instance.created_by_id,
+            part=instance.pk
+        )
+
+    elif instance.is_used:
+        # Parça kullanıldı olarak işaretlendiyse envanteri tek sorguda azalt
+        adjust_inventory(
+            instance.type_id,
+            instance.aircraft_type_id,
+            -1,
+            reason=Reasons.CONSUMED,
+            part=instance.pk
+        )
 
 
 
@@ -98,15 +125,11 @@ def update_inventory_on_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=Part)
 def update_inventory_on_delete(sender, instance, **kwargs):
     if not instance.is_used:
-        with transaction.atomic():
-            # Kullanılmamış parça silindiğinde envanteri güncelle
-            inventory = Inventory.objects.get(
-                part_type=instance.type,
-                aircraft_type=instance.aircraft_type
-                )
-            inventory.quantity -= 1
-            inventory.save()
-
-
-
-
+        # Kullanılmamış parça silindiğinde envanteri tek sorguda azalt
+        adjust_inventory(
+            instance.type_id,
+            instance.aircraft_type_id,
+            -1,
+            reason=Reasons.DELETED,
+            part=instance.pk
+        )
@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class TableVersion(models.Model):
+    """
+    Önbelleğe alınan sonuçların (kayıt sayıları, ETag) geçersiz kılınması için tablo sürüm sayaçları.
+    Her yazma ilgili sayaçları commit sonrası tek UPDATE ile bir artırır, satırlar silinmez.
+    """
+    name = models.CharField(
+        max_length=100,
+        primary_key=True,
+        verbose_name="Sürüm Adı"
+    )
+    version = models.BigIntegerField(
+        default=0,
+        verbose_name="Sürüm"
+    )
+
+    class Meta:
+        verbose_name = "Tablo Sürümü"
+        verbose_name_plural = "Tablo Sürümleri"
+
+    def __str__(self):
+        return f"{self.name} ({self.version})"
@@ -0,0 +1,173 @@
+# core/pagination.py
+import base64
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import ParseError
+
+# Sıralama değeri bu isimle annotate edilir, imleç bu değer ve id üzerinden kurulur
+CURSOR_KEY = 'cursor_key'
+
+
+def paginate(request, queryset, order_by):
+    """
+    Datatable listeleri için sayfalama.
+    İstekte 'cursor' parametresi yoksa mevcut start/length (OFFSET) sayfalaması kullanılır.
+    'cursor' verilirse (ilk sayfa için boş) sayfalama (sıralama değeri, id) üzerinden yapılır,
+    sayfa derinliğinden bağımsız olarak indeks üzerinde sabit maliyetle çalışır.
+    Returns:
+        tuple: (sayfadaki kayıtlar, sonraki sayfa imleci, önceki sayfa imleci)
+    """
+    length = int(request.GET.get('length', 10))
+
+    if 'cursor' not in request.GET:
+        start = int(request.GET.get('start', 0))
+        return queryset[start:start + length], None, None
+
+    field = order_by.lstrip('-')
+    descending = order_by.startswith('-')
+    cursor = decode_cursor(request.GET['cursor'], order_by)
+
+    nullable = is_nullable(queryset, field)
+    queryset = queryset.annotate(**{CURSOR_KEY: F(field)})
+    backwards = cursor is not None and cursor['direction'] == 'prev'
+    if cursor is not None:
+        queryset = queryset.filter(
+            keyset_filter(cursor['value'], cursor['id'], descending != backwards, nullable)
+        )
+
+    # Geri giderken sıralama ters çevrilir, sonuç listesi tekrar düz sıraya alınır
+    ordering_descending = descending != backwards
+    queryset = queryset.order_by(*keyset_ordering(ordering_descending))
+
+    rows = list(queryset[:length + 1])
+    has_more = len(rows) > length
+    rows = rows[:length]
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+
+    if backwards:
+        next_cursor = encode_cursor(rows[-1], order_by, 'next')
+        prev_cursor = encode_cursor(rows[0], order_by, 'prev') if has_more else None
+    else:
+        next_cursor = encode_cursor(rows[-1], order_by, 'next') if has_more else None
+        prev_cursor = encode_cursor(rows[0], order_by, 'prev') if cursor is not None else None
+
+    return rows, next_cursor, prev_cursor
+
+
+def seek(queryset, field, cursor, limit):
+    """
+    NULL içermeyen artan bir alan üzerinde sadece ileri yönlü imleçli sayfa (FIFO listeleri için).
+    Koşuldaki 'alan >= değer' kısmı indeks aralığı olarak kullanılır, (alan, id) indeksi ile maliyet
+    kayıt sayısından bağımsız olarak sadece limit ile orantılıdır.
+    Returns:
+        tuple: (sayfadaki kayıtlar, sonraki sayfa imleci)
+    """
+    cursor = decode_cursor(cursor, field)
+    queryset = queryset.annotate(**{CURSOR_KEY: F(field)})
+    if cursor is not None:
+        if cursor['direction'] != 'next':
+            raise ParseError("Geçersiz sayfa imleci.")
+        value = cursor['value']
+        queryset = queryset.filter(
+            Q(**{f'{field}__gte': value}) & (Q(**{f'{field}__gt': value}) | Q(id__gt=cursor['id']))
+        )
+
+    rows = list(queryset.order_by(field, 'id')[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1], field, 'next') if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def keyset_ordering(descending):
+    # Postgres'te NULL değerler artan sıralamada sonda, azalan sıralamada başta yer alır
+    if descending:
+        return [F(CURSOR_KEY).desc(nulls_first=True), '-id']
+    return [F(CURSOR_KEY).asc(nulls_last=True), 'id']
+
+
+def is_nullable(queryset, field):
+    """
+    Sıralama alanının NULL olup olamayacağı. Annotasyonlar ve null=True ilişki yolları üzerinden
+    (LEFT JOIN) gelen alanlar NULL olabilir kabul edilir.
+    """
+    if field in queryset.query.annotations:
+        return True
+    model = queryset.model
+    for name in field.split('__'):
+        model_field = model._meta.get_field(name)
+        if model_field.null or model_field.many_to_many or model_field.one_to_many:
+            return True
+        if not model_field.is_relation:
+            return False
+        model = model_field.related_model
+    return False
+
+
+def keyset_filter(value, pk, descending, nullable=True):
+    """
+    Verilen (sıralama değeri, id) konumundan sonra gelen satırların koşulu.
+    NULL sıralama değerleri keyset_ordering ile aynı konumda kabul edilir.
+    Dolu değer için koşul seek() ile aynı şekilde 'değer <= v AND (değer < v OR id < pk)' biçimindedir,
+    ilk kısım (değer, id) indeksinde aralık olarak kullanılır. NULL olamayan alanlarda NULL dalı eklenmez.
+    """
+    after_id = Q(id__lt=pk) if descending else Q(id__gt=pk)
+    null = Q(**{f'{CURSOR_KEY}__isnull': True})
+
+    if value is None:
+        if descending:
+            # NULL'lar başta, NULL'ların kalanı ve tüm dolu değerler sonra gelir
+            return (null & after_id) | ~null
+        return null & after_id
+
+    lookup = 'lt' if descending else 'gt'
+    within = Q(**{f'{CURSOR_KEY}__{lookup}e': value})
+    beyond = Q(**{f'{CURSOR_KEY}__{lookup}': value})
+    condition = within & (beyond | after_id)
+    if descending or not nullable:
+        return condition
+    # Artan sıralamada NULL'lar sonda yer alır
+    return condition | null
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder tarihleri milisaniyeye yuvarlar, imleçte mikrosaniye kaybı aynı satırın tekrar gelmesine yol açar
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(row, order_by, direction):
+    # Satır model nesnesi veya .values() sözlüğü olabilir
+    if isinstance(row, dict):
+        value, pk = row[CURSOR_KEY], row['id']
+    else:
+        value, pk = getattr(row, CURSOR_KEY), row.id
+    payload = {
+        'order': order_by,
+        'direction': direction,
+        'value': value,
+        'id': pk
+    }
+    data = json.dumps(payload, cls=CursorEncoder).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(cursor, order_by):
+    # Boş imleç ilk sayfa demektir
+    if not cursor:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if payload['order'] != order_by or payload['direction'] not in ('next', 'prev'):
+            raise ValueError
+        int(payload['id'])
+    except (ValueError, KeyError, TypeError):
+        raise ParseError("Geçersiz sayfa imleci.")
+    return payload
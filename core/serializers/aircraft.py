@@ -9,8 +9,9 @@ class AircraftSerializer(serializers.ModelSerializer):
 
 
 from rest_framework import serializers
-from ..models.aircraft import Aircraft, AircraftRequirement
+from ..models.aircraft import Aircraft, AircraftRequirement, AircraftBuildability
 from ..models.part import Part
+from .fields import ReferenceRelatedField
 
 class AircraftRequirementSerializer(serializers.ModelSerializer):
     """Hava aracı için gerekli parça serializer"""
@@ -38,4 +39,33 @@ class AvailablePartSerializer(serializers.ModelSerializer):
         return {
             'id': obj.type.id,
             'name': obj.type.name
-        }
\ No newline at end of file
+        }
+
+
+class AircraftBuildabilitySerializer(serializers.ModelSerializer):
+    """Uçak tipi başına üretilebilir uçak sayısı serializer"""
+    aircraft_type = AircraftSerializer(read_only=True)
+    updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M", read_only=True)
+
+    class Meta:
+        model = AircraftBuildability
+        fields = ['aircraft_type', 'buildable_count', 'updated_at']
+
+
+class ProductionTargetSerializer(serializers.Serializer):
+    """Üretim planında bir uçak tipinin hedef adedi"""
+    aircraft_type = ReferenceRelatedField('aircrafts', queryset=Aircraft.objects.all())
+    count = serializers.IntegerField(min_value=0)
+
+
+class ProductionPlanSerializer(serializers.Serializer):
+    """Üretim planı (MRP) isteği için serializer, hedef verilmezse sadece üretilebilir adetler hesaplanır"""
+    targets = ProductionTargetSerializer(many=True, required=False, default=list)
+
+    def validate_targets(self, targets):
+        # Aynı uçak tipi birden fazla verilirse hedefler toplanır
+        result = {}
+        for target in targets:
+            aircraft_id = target['aircraft_type'].id
+            result[aircraft_id] = result.get(aircraft_id, 0) + target['count']
+        return result
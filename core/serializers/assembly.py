@@ -1,19 +1,25 @@
+from collections import Counter
+
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
 from ..models.aircraft import Aircraft
 from ..models.assembly import Assembly
 from ..models.part import Part
+from ..services.reference import get_requirements
 from .aircraft import AircraftSerializer
+from .fields import BulkPrimaryKeyRelatedField, ReferenceRelatedField
 from .part import PartSerializer
 
 class AssemblyCreateSerializer(serializers.ModelSerializer):
-    # Montaj için gerekli parçaları validasyon için kullanmak için
-    parts = serializers.PrimaryKeyRelatedField(
+    # Parçalar tek sorguda çözülür, bulunamayan ve kullanılmış parçalar birlikte raporlanır
+    parts = BulkPrimaryKeyRelatedField(
         many=True,
-        queryset=Part.objects.select_related(
-            'type', 
-            'aircraft_type'
-        ).filter(is_used=False)
+        queryset=Part.objects.select_related('aircraft_type'),
+        available=Q(is_used=False)
     )
+    # Uçak tipi ve gereksinimleri referans önbelleğinden okunur
+    aircraft_type = ReferenceRelatedField('aircrafts', queryset=Aircraft.objects.all())
 
     class Meta:
         model = Assembly
@@ -22,45 +28,26 @@ class AssemblyCreateSerializer(serializers.ModelSerializer):
     def validate(self, data):
         request = self.context.get('request')
         if not request or not request.user:
-            return serializers.ValidationError("Kullanıcı bilgisi bulunamadı.")
-        
-        
+            raise serializers.ValidationError("Kullanıcı bilgisi bulunamadı.")
+
         if not request.user.team:
-            raise PermissionError("Kullanıcının takımı bulunamadı!")
+            raise serializers.ValidationError("Kullanıcının takımı bulunamadı!")
 
         # Montaj takımı kontrolü
-        if not request.user.can_assemble: 
-            raise PermissionError("Sadece montaj takımı montaj yapabilir.")
+        if not request.user.can_assemble():
+            raise PermissionDenied("Sadece montaj takımı montaj yapabilir.")
 
 
         # Aircraft için gerekli parçaları kontrol et
         aircraft = data['aircraft_type']
-        requirements = aircraft.requirements.all()
-        
-        required_parts = {}
-        for req in requirements:
-            required_parts[req.part_type_id] = req.quantity
-
-        # Seçilen parçaları kontrol et
-        selected_parts = {}
-        # Parçaların varlığını ve kullanılabilirliğini toplu kontrol et
-        part_ids = [part.id for part in data['parts']]
-        existing_parts = Part.objects.filter(
-            id__in=part_ids, 
-            is_used=False
-        ).select_related('type', 'aircraft_type')
-        
-        if len(existing_parts) != len(part_ids):
-            raise serializers.ValidationError("Bazı parçalar bulunamadı veya daha önce kullanılmış!")
-
-        for part in existing_parts:
-            if part.is_used:
-                raise serializers.ValidationError(f"{part} daha önce kullanılmış!")
-            if part.aircraft_type != aircraft:
+        required_parts = {requirement.part_type_id: requirement.quantity for requirement in get_requirements(aircraft.id)}
+
+        # Seçilen parçaları kontrol et, parçalar alan tarafından yüklendiği için tekrar sorgulanmaz
+        selected_parts = Counter()
+        for part in data['parts']:
+            if part.aircraft_type_id != aircraft.id:
                 raise serializers.ValidationError(f"{part} bu uçak tipi için uygun değil!")
-            
-            part_type_id = part.type_id
-            selected_parts[part_type_id] = selected_parts.get(part_type_id, 0) + 1
+            selected_parts[part.type_id] += 1
 
         # Gerekli parça sayılarını kontrol et
         for part_type_id, required_quantity in required_parts.items():
@@ -73,6 +60,55 @@ class AssemblyCreateSerializer(serializers.ModelSerializer):
 
         return data
 
+class AssemblyAllocateSerializer(serializers.Serializer):
+    """Parçaları sunucu tarafında seçilen montaj isteği için serializer"""
+    aircraft_type = ReferenceRelatedField('aircrafts', queryset=Aircraft.objects.all())
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, data):
+        request = self.context.get('request')
+        if not request.user.can_assemble():
+            raise PermissionDenied("Sadece montaj takımı montaj yapabilir.")
+
+        if not get_requirements(data['aircraft_type'].id):
+            raise serializers.ValidationError("Bu uçak tipi için parça gereksinimi tanımlanmamış.")
+        return data
+
+
+class AssemblyBatchSerializer(AssemblyAllocateSerializer):
+    """Aynı uçak tipinden birden fazla montaj isteği için serializer"""
+    MAX_COUNT = 100
+
+    count = serializers.IntegerField(min_value=1, max_value=MAX_COUNT)
+
+
+class AssemblySummarySerializer(serializers.ModelSerializer):
+    """
+    Montaj listesi için özet serializer.
+    Parçalar yerine parça sayısı, parça tipi ve takım dağılımını gösterir.
+    Özet alanları services.assembly.get_assembly_summaries ile doldurulur.
+    """
+    aircraft_type = AircraftSerializer(read_only=True)
+    assembled_by = serializers.StringRelatedField(read_only=True)
+    assembled_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M", read_only=True)
+    part_count = serializers.IntegerField(read_only=True)
+    part_types = serializers.ListField(read_only=True)
+    teams = serializers.ListField(read_only=True)
+
+    class Meta:
+        model = Assembly
+        fields = [
+            'id',
+            'aircraft_type',
+            'assembled_by',
+            'assembled_at',
+            'is_complete',
+            'part_count',
+            'part_types',
+            'teams'
+        ]
+
+
 class AssemblySerializer(serializers.ModelSerializer):
     aircraft_type = AircraftSerializer(read_only=True)
     parts = PartSerializer(many=True, read_only=True)
@@ -0,0 +1,115 @@
+# core/serializers/fields.py
+from collections import Counter
+
+from django.db.models import BooleanField, ExpressionWrapper
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+from ..services.reference import get_reference_data
+
+# Kullanılabilirlik koşulu bu isimle annotate edilir
+AVAILABLE_FIELD = 'is_available'
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    many=True ile kullanıldığında id listesini tek sorguda çözen PrimaryKeyRelatedField.
+    DRF'in id başına queryset.get() çağrısı yerine tüm id'ler in_bulk ile okunur, bulunamayan ve
+    kullanılamayan id'ler tek hata mesajında birlikte raporlanır. Çözülen nesneler validated_data'da
+    istek sırasıyla döner, validate() içinde tekrar sorgulanmaları gerekmez.
+    available: kaydın seçilebilir olması için Q koşulu (ör. Q(is_used=False)), sağlamayan kayıtlar reddedilir
+    """
+
+    def __init__(self, available=None, **kwargs):
+        self.available = available
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+
+class BulkManyRelatedField(ManyRelatedField):
+    default_error_messages = {
+        **ManyRelatedField.default_error_messages,
+        'does_not_exist': 'Bulunamayan kayıtlar: {pk_values}.',
+        'unavailable': 'Kullanılamayan kayıtlar: {pk_values}.',
+        'duplicate': 'Birden fazla seçilen kayıtlar: {pk_values}.',
+        'incorrect_type': 'Geçersiz id değerleri: {pk_values}.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        pks = []
+        invalid = []
+        for item in data:
+            if isinstance(item, bool):
+                invalid.append(item)
+                continue
+            try:
+                pks.append(int(item))
+            except (TypeError, ValueError):
+                invalid.append(item)
+        if invalid:
+            self.fail('incorrect_type', pk_values=format_pks(invalid))
+
+        queryset = child.get_queryset()
+        if child.available is not None:
+            queryset = queryset.annotate(
+                **{AVAILABLE_FIELD: ExpressionWrapper(child.available, output_field=BooleanField())}
+            )
+        instances = queryset.in_bulk(pks)
+
+        # Tüm hatalar birlikte raporlanır
+        errors = []
+        missing = [pk for pk in pks if pk not in instances]
+        if missing:
+            errors.append(self.error_messages['does_not_exist'].format(pk_values=format_pks(missing)))
+        if child.available is not None:
+            unavailable = [pk for pk in pks if pk in instances and not getattr(instances[pk], AVAILABLE_FIELD)]
+            if unavailable:
+                errors.append(self.error_messages['unavailable'].format(pk_values=format_pks(unavailable)))
+        duplicates = sorted(pk for pk, count in Counter(pks).items() if count > 1)
+        if duplicates:
+            errors.append(self.error_messages['duplicate'].format(pk_values=format_pks(duplicates)))
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return [instances[pk] for pk in pks]
+
+
+class ReferenceRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Referans tablolarına (uçak, parça tipi) id ile bağlanan PrimaryKeyRelatedField.
+    Kayıt veritabanı yerine süreç içi referans önbelleğinden okunur, kararlı durumda sorgu çalışmaz.
+    table: ReferenceData alanı ('aircrafts', 'part_types'), queryset şema ve seçenekler için kullanılır
+    """
+
+    def __init__(self, table, **kwargs):
+        self.table = table
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        instance = getattr(get_reference_data(), self.table).get(pk)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+
+def format_pks(pks):
+    return ', '.join(str(pk) for pk in pks)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from ..models.inventory import Inventory
+from ..models.inventory import Inventory, InventoryAlert
 from .part import PartSerializer,PartTypeSerializer
 from .aircraft import AircraftSerializer
 
@@ -10,6 +10,7 @@ class InventorySerializer(serializers.ModelSerializer):
     """
     part_type = PartTypeSerializer(read_only=True)
     aircraft_type = AircraftSerializer(read_only=True)
+    quantity = serializers.SerializerMethodField()
     updated_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M", read_only=True)
 
     class Meta:
@@ -22,6 +23,13 @@ class InventorySerializer(serializers.ModelSerializer):
             'minimum_quantity',
             'updated_at'
         ]
+    def get_quantity(self, obj) -> int:
+        """
+        Bekleyen hareketler dahil güncel miktarı döndürür.
+        Queryset with_current_quantity ile annotate edilmediyse anlık görüntüdeki miktar kullanılır.
+        """
+        return getattr(obj, 'current_quantity', obj.quantity)
+
     def get_part_type(self, obj) -> dict:
         return {
             'id': obj.part_type.id,
@@ -57,8 +65,50 @@ class InventoryPatchSerializer(serializers.ModelSerializer):
         fields = ['minimum_quantity']
 
 
+class ShortageSerializer(serializers.Serializer):
+    """
+    Eksik parça satırı için serializer.
+    Gereksinim, mevcut ve eksik adetleri gösterir.
+    """
+    aircraft_type = serializers.SerializerMethodField()
+    part_type = serializers.SerializerMethodField()
+    required = serializers.IntegerField(source='quantity')
+    available = serializers.IntegerField()
+    missing = serializers.IntegerField()
+
+    def get_aircraft_type(self, obj) -> dict:
+        return {
+            'id': obj['aircraft_type_id'],
+            'name': obj['aircraft_type__name']
+        }
 
+    def get_part_type(self, obj) -> dict:
+        return {
+            'id': obj['part_type_id'],
+            'name': obj['part_type__name']
+        }
 
 
 
+class InventoryAlertSerializer(serializers.ModelSerializer):
+    """
+    Stok uyarısı (eşik geçişi) için serializer.
+    """
+    part_type = PartTypeSerializer(read_only=True)
+    aircraft_type = AircraftSerializer(read_only=True)
+    previous_status = serializers.CharField(source='get_previous_status_display')
+    status = serializers.CharField(source='get_status_display')
+    created_at = serializers.DateTimeField(format="%d.%m.%Y %H:%M", read_only=True)
 
+    class Meta:
+        model = InventoryAlert
+        fields = [
+            'id',
+            'part_type',
+            'aircraft_type',
+            'previous_status',
+            'status',
+            'quantity',
+            'minimum_quantity',
+            'created_at'
+        ]
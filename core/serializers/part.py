@@ -1,5 +1,8 @@
 from rest_framework import serializers
+from ..models.aircraft import Aircraft
 from ..models.part import Part, PartType
+from ..services.part import produce_parts
+from ..services.reference import get_reference_data
 from .aircraft import AircraftSerializer
 
 class PartTypeSerializer(serializers.ModelSerializer):
@@ -97,4 +100,93 @@ class PartCreateSerializer(serializers.ModelSerializer):
         created_by alanını otomatik doldurur
         """
         validated_data['created_by'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+
+class PartBulkItemSerializer(serializers.Serializer):
+    """Toplu üretimde tek bir parça satırı"""
+    name = serializers.CharField(max_length=100)
+    type = serializers.IntegerField()
+    aircraft_type = serializers.IntegerField()
+
+
+class PartBulkCreateSerializer(serializers.Serializer):
+    """
+    Toplu parça üretimi için serializer.
+    Ya 'parts' listesi ya da {type, aircraft_type, count} tanımı alır.
+    İlişkili kayıtlar ve yetkiler parti başına bir kez kontrol edilir.
+    """
+    MAX_BATCH_SIZE = 1000
+
+    parts = PartBulkItemSerializer(many=True, required=False)
+    type = serializers.IntegerField(required=False)
+    aircraft_type = serializers.IntegerField(required=False)
+    count = serializers.IntegerField(required=False, min_value=1, max_value=MAX_BATCH_SIZE)
+    name = serializers.CharField(required=False, max_length=90)
+
+    def validate(self, data):
+        """
+        Toplu üretim validasyonları
+        """
+
+        # Kullanıcı bilgisi kontrolü
+        request = self.context.get('request')
+        if not request or not request.user:
+            raise serializers.ValidationError("Kullanıcı bilgisi bulunamadı.")
+
+        # Takım kontrolü
+        if not request.user.team:
+            raise serializers.ValidationError("Kullanıcının takımı bulunamadı!")
+
+        # Montaj takımı kontrolü
+        if request.user.team.is_assembly_team:
+            raise serializers.ValidationError("Montaj takımı parça üretemez.")
+
+        if data.get('parts'):
+            items = data['parts']
+        elif all(data.get(field) for field in ('type', 'aircraft_type', 'count')):
+            items = [
+                {'name': None, 'type': data['type'], 'aircraft_type': data['aircraft_type']}
+                for _ in range(data['count'])
+            ]
+        else:
+            raise serializers.ValidationError("'parts' listesi veya 'type', 'aircraft_type', 'count' alanları gerekli.")
+
+        if len(items) > self.MAX_BATCH_SIZE:
+            raise serializers.ValidationError(f"Tek seferde en fazla {self.MAX_BATCH_SIZE} parça üretilebilir.")
+
+        # İlişkili kayıtlar referans önbelleğinden okunur
+        reference = get_reference_data()
+        part_types = {pk: reference.part_types[pk] for pk in {item['type'] for item in items} if pk in reference.part_types}
+        aircrafts = {pk: reference.aircrafts[pk] for pk in {item['aircraft_type'] for item in items} if pk in reference.aircrafts}
+
+        missing_types = {item['type'] for item in items} - part_types.keys()
+        if missing_types:
+            raise serializers.ValidationError(f"Geçersiz parça tipi: {sorted(missing_types)}")
+        missing_aircrafts = {item['aircraft_type'] for item in items} - aircrafts.keys()
+        if missing_aircrafts:
+            raise serializers.ValidationError(f"Geçersiz hava aracı: {sorted(missing_aircrafts)}")
+
+        # Parça tipi yetkisi kontrolü, her parça için değil parti içindeki her tip için bir kez
+        for part_type in part_types.values():
+            if not request.user.can_produce_part(part_type):
+                raise serializers.ValidationError(f"Bu tip parça ({part_type.name}) üretme yetkiniz yok.")
+
+        # İsimsiz parçaların son eki üretimde parça id'sinden verilir, partiler arasında tekrar etmez
+        data['items'] = [
+            {
+                'name': item['name'],
+                'name_prefix': data.get('name') or part_types[item['type']].name,
+                'type_id': item['type'],
+                'aircraft_type_id': item['aircraft_type']
+            }
+            for item in items
+        ]
+        return data
+
+    def create(self, validated_data):
+        """
+        Parçaları toplu olarak oluşturur
+        created_by alanını otomatik doldurur
+        """
+        return produce_parts(self.context['request'].user, validated_data['items'])
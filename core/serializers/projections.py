@@ -0,0 +1,302 @@
+# core/serializers/projections.py
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from accounts.serializers import UserSerializer
+from .assembly import AssemblySummarySerializer
+from .inventory import InventorySerializer
+from .part import PartSerializer
+
+# Veritabanından gelen değeri değiştirmeyen to_representation'lar, bu alanların değeri satırdan aynen alınır
+IDENTITY_REPRESENTATIONS = {
+    serializers.CharField.to_representation,
+    serializers.IntegerField.to_representation,
+    serializers.BooleanField.to_representation,
+}
+
+
+class Column:
+    """
+    Projeksiyondaki tek bir JSON alanı.
+    key: çıktıdaki alan adı
+    paths: .values() ile okunacak alanlar
+    build: paths değerlerinden JSON değerini üreten fonksiyon, verilmezse ilk alan aynen kullanılır
+    query: False ise alan sorguda okunmaz, değeri serialize'dan önce satır sözlüğüne çağıran ekler
+        (sayfa için ayrı sorguda hesaplanan özetler gibi)
+    timezone: True ise build'e son argüman olarak aktif saat dilimi de verilir
+    """
+    __slots__ = ('key', 'paths', 'build', 'query', 'timezone')
+
+    def __init__(self, key, paths=None, build=None, query=True, timezone=False):
+        self.key = key
+        self.paths = paths or [key]
+        self.build = build
+        self.query = query
+        self.timezone = timezone
+
+
+class Projection:
+    """
+    Liste sorgularını model nesnesi oluşturmadan .values() ile çalıştırır ve satırları
+    doğrudan JSON sözlüklerine çevirir. Çıktı, karşılık gelen serializer ile birebir aynıdır.
+    Tüm liste uç noktaları (parça, envanter, montaj, kullanıcı) bu yolla serileştirilir.
+    keys verilirse sadece bu alanlar okunur ve döndürülür (id her zaman dahildir).
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        # {seçilen alanlar: satır fonksiyonu}, fonksiyon alan seçimi başına bir kez üretilir
+        self._rows = {}
+
+    @classmethod
+    def from_serializer(cls, serializer_class, columns=()):
+        """
+        Projeksiyonu serializer'ın alan tanımlarından üretir, alan sırası ve çıktı serializer ile aynıdır.
+        Model alanlarından (iç içe serializer'lar dahil) okunan alanlar otomatik çevrilir. Metot alanları,
+        StringRelatedField gibi çevrilemeyen alanlar columns ile verilmelidir; verilmezse veya serializer'da
+        olmayan bir alan verilirse ImproperlyConfigured hatası verilir, böylece serializer'a eklenen veya
+        çıkarılan alan projeksiyonda sessizce eksik kalmaz.
+        """
+        serializer = serializer_class()
+        return cls(derive_columns(serializer, serializer.Meta.model, {column.key: column for column in columns}))
+
+    def select(self, keys=None):
+        if not keys:
+            return self.columns
+        keys = set(keys) | {'id'}
+        return [column for column in self.columns if column.key in keys]
+
+    def values(self, queryset, keys=None):
+        paths = ['id']
+        for column in self.select(keys):
+            if column.query:
+                paths.extend(path for path in column.paths if path not in paths)
+        return queryset.values(*paths)
+
+    def serialize(self, rows, keys=None):
+        columns = self.select(keys)
+        selection = tuple(column.key for column in columns)
+        row_function = self._rows.get(selection)
+        if row_function is None:
+            row_function = self._rows[selection] = compile_function(
+                ['row'], columns, lambda path: f"row[{path!r}]"
+            )
+        # Tarih alanlarının kullandığı saat dilimi satır başına değil, çağrı başına bir kez okunur
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        return [row_function(row, tz) for row in rows]
+
+
+def compile_function(params, columns, read, none_check=None):
+    """
+    Sütunlardan tek satırı sözlüğe çeviren düz bir fonksiyon üretir, fonksiyon params ve tz argümanlarını alır.
+    read: path için değeri okuyan ifadeyi döndürür. none_check verilirse bu parametre None olduğunda
+    fonksiyon None döndürür (boş yabancı anahtarlı iç içe serializer gibi).
+    """
+    namespace = {}
+    items = []
+    for index, column in enumerate(columns):
+        if column.build is None:
+            expression = read(column.paths[0])
+        else:
+            namespace[f'_build{index}'] = column.build
+            args = [read(path) for path in column.paths] + (['tz'] if column.timezone else [])
+            expression = f"_build{index}({', '.join(args)})"
+        items.append(f"{column.key!r}: {expression}")
+
+    body = '{' + ', '.join(items) + '}'
+    if none_check is not None:
+        body = f"None if {none_check} is None else {body}"
+    exec(f"def function({', '.join([*params, 'tz'])}):\n    return {body}\n", namespace)
+    return namespace['function']
+
+
+def derive_columns(serializer, model, overrides, attrs=()):
+    # attrs: kök modelden iç içe serializer'ın kaynağına giden nitelikler
+    unknown = set(overrides) - set(serializer.fields)
+    if unknown:
+        raise ImproperlyConfigured(f"{type(serializer).__name__} serializer'ında olmayan alanlar: {sorted(unknown)}")
+
+    columns = []
+    for field in serializer._readable_fields:
+        column = overrides.get(field.field_name) or derive_column(field, model, attrs)
+        if column is None:
+            raise ImproperlyConfigured(
+                f"{type(serializer).__name__}.{field.field_name} alanı projeksiyona çevrilemiyor, Column tanımı verilmelidir"
+            )
+        columns.append(column)
+    return columns
+
+
+def derive_column(field, model, attrs):
+    # Model alanından okunmayan (metot, '*' kaynak, liste) alanlar için None döner
+    if isinstance(field, serializers.ListSerializer) or not field.source_attrs:
+        return None
+    resolved = model_path(model, [*attrs, *field.source_attrs])
+    if resolved is None:
+        return None
+    path, model_field = resolved
+
+    if isinstance(field, serializers.BaseSerializer):
+        if not model_field.is_relation:
+            return None
+        return nested_column(field, model, [*attrs, *field.source_attrs], path)
+
+    if isinstance(field, serializers.RelatedField):
+        # Sadece birincil anahtar döndüren ilişki alanı yabancı anahtar sütunundan okunabilir
+        if type(field) is not serializers.PrimaryKeyRelatedField or field.pk_field is not None:
+            return None
+        return Column(field.field_name, [path])
+    if model_field.is_relation:
+        return None
+    if is_identity(field):
+        return Column(field.field_name, [path])
+    if is_formatted_datetime(field):
+        return Column(field.field_name, [path], datetime_formatter(field), timezone=True)
+
+    to_representation = field.to_representation
+    return Column(field.field_name, [path], lambda value: None if value is None else to_representation(value))
+
+
+def nested_column(serializer, model, attrs, key_path):
+    # İç içe serializer'ın alanları kök sorguya eklenir, yabancı anahtar boşsa değer None olur
+    columns = derive_columns(serializer, model, {}, attrs)
+    paths = [key_path]
+    for column in columns:
+        paths.extend(path for path in column.paths if path not in paths)
+    names = {path: f"value{index}" for index, path in enumerate(paths)}
+    build = compile_function(list(names.values()), columns, names.__getitem__, none_check=names[key_path])
+    return Column(serializer.field_name, paths, build, timezone=True)
+
+
+def model_path(model, attrs):
+    """
+    Nitelikler modelden ileri yönlü tekil ilişkiler üzerinden bir alana gidiyorsa (.values() yolu, alan) döndürür.
+    İlişkili modelin birincil anahtarı ve ilişki alanının kendisi yabancı anahtar sütunundan okunur, JOIN yapılmaz.
+    """
+    parts, field, previous = [], None, None
+    for attr in attrs:
+        if field is not None:
+            if not (field.many_to_one or field.one_to_one) or not field.concrete:
+                return None
+            model, previous = field.related_model, field
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete:
+            return None
+        parts.append(attr)
+
+    if field.primary_key and previous is not None:
+        parts.pop()
+        parts[-1] = previous.attname
+    elif field.is_relation:
+        parts[-1] = field.attname
+    return '__'.join(parts), field
+
+
+def is_formatted_datetime(field):
+    # Alan kendi saat dilimini tanımlıyorsa veya ISO formatı kullanıyorsa DRF'in kendi dönüşümü kullanılır
+    return (
+        settings.USE_TZ
+        and type(field) is serializers.DateTimeField
+        and not hasattr(field, 'timezone')
+        and isinstance(getattr(field, 'format', None), str)
+        and field.format.lower() != ISO_8601
+    )
+
+
+def is_identity(field):
+    representation = type(field).to_representation
+    if representation in IDENTITY_REPRESENTATIONS:
+        return True
+    # BigIntegerField (DRF 3.15+) COERCE_BIGINT_TO_STRING kapalıysa IntegerField gibi davranır
+    big_integer = getattr(serializers, 'BigIntegerField', None)
+    return (
+        big_integer is not None
+        and representation is big_integer.to_representation
+        and not getattr(field, 'coerce_to_string', getattr(api_settings, 'COERCE_BIGINT_TO_STRING', False))
+    )
+
+
+def datetime_formatter(field):
+    # DateTimeField.to_representation'ın saat dilimli değerler için kısa yolu, diğer değerler DRF'e bırakılır
+    output_format, to_representation = field.format, field.to_representation
+
+    def format_datetime(value, tz):
+        if value is None:
+            return None
+        if isinstance(value, datetime.datetime) and value.utcoffset() is not None:
+            return value.astimezone(tz).strftime(output_format)
+        return to_representation(value)
+    return format_datetime
+
+
+def parse_columns(request):
+    """
+    İstekteki 'columns' parametresini (virgülle ayrılmış alan adları) listeye çevirir.
+    Parametre yoksa None döner ve tüm alanlar kullanılır.
+    """
+    columns = request.GET.get('columns')
+    if not columns:
+        return None
+    return [column.strip() for column in columns.split(',') if column.strip()]
+
+
+def user_display(first_name, last_name, team_name, is_assembly_team):
+    # CustomUser.__str__ ve Team.__str__ ile aynı metin
+    full_name = f"{first_name} {last_name}".strip()
+    if team_name is None:
+        team_info = "Takım Atanmamış"
+    else:
+        team_info = "Montaj Takımı" if is_assembly_team else f"{team_name}"
+    return f"{full_name} - {team_info}"
+
+
+def full_name(first_name, last_name):
+    # AbstractUser.get_full_name ile aynı metin
+    return f"{first_name} {last_name}".strip()
+
+
+# Serializer'dan üretilemeyen alanlar (StringRelatedField, SerializerMethodField, sayfa özetleri) elle tanımlanır
+
+PART_PROJECTION = Projection.from_serializer(PartSerializer, [
+    Column(
+        'created_by',
+        ['created_by__first_name', 'created_by__last_name', 'created_by__team__name', 'created_by__team__is_assembly_team'],
+        user_display
+    ),
+    Column('status', ['is_used'], lambda is_used: "Kullanıldı" if is_used else "Stokta"),
+])
+
+# Güncel miktar Inventory.objects.with_current_quantity() ile eklenir
+INVENTORY_PROJECTION = Projection.from_serializer(InventorySerializer, [
+    Column('quantity', ['current_quantity']),
+])
+
+# Özet alanları services.assembly.get_assembly_summaries ile eklenir
+ASSEMBLY_SUMMARY_PROJECTION = Projection.from_serializer(AssemblySummarySerializer, [
+    Column(
+        'assembled_by',
+        ['assembled_by__first_name', 'assembled_by__last_name', 'assembled_by__team__name', 'assembled_by__team__is_assembly_team'],
+        user_display
+    ),
+    Column('part_count', query=False),
+    Column('part_types', query=False),
+    Column('teams', query=False),
+])
+
+# Takım yetkileri sayfa için tek sorguda okunup eklenir
+USER_PROJECTION = Projection.from_serializer(UserSerializer, [
+    Column('full_name', ['first_name', 'last_name'], full_name),
+    Column('permissions', query=False),
+    Column(
+        'can_assemble',
+        ['is_superuser', 'team__is_assembly_team'],
+        lambda is_superuser, is_assembly_team: bool(is_superuser or is_assembly_team)
+    ),
+])
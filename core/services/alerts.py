@@ -0,0 +1,80 @@
+# core/services/alerts.py
+from django.db import connection
+from django.utils import timezone
+
+from ..models.inventory import Inventory, InventoryAlert
+from .post_commit import execute_ctes, post_commit_task
+from .stock import stock_totals_sql
+
+StockStatuses = Inventory.StockStatuses
+
+# Commit sonrası stok eşik kontrolü görevi, değerler (parça tipi, uçak tipi) anahtarlarıdır
+STOCK_ALERTS = 'stock_alerts'
+
+
+def evaluate_stock_alerts(keys=None):
+    """
+    Verilen (parça tipi, uçak tipi) anahtarlarının stok durumunu güncel miktara göre yeniden hesaplar.
+    Durumu değişen (eşik geçişi olan) envanter satırları güncellenir ve her geçiş için InventoryAlert eklenir.
+    Güncelleme ve uyarı kaydı tek SQL ifadesinde yapılır, durumu değişmeyen satırlar kilitlenmez.
+    keys verilmezse tüm envanter kontrol edilir.
+    """
+    if keys is not None:
+        keys = sorted(set(keys))
+        if not keys:
+            return
+    execute_ctes(*stock_alert_ctes(keys))
+
+
+@post_commit_task(STOCK_ALERTS)
+def stock_alert_ctes(keys):
+    """evaluate_stock_alerts ifadesinin CTE'leri, commit sonrası diğer işlerle aynı ifadede çalışabilir"""
+    quote = connection.ops.quote_name
+    inventory_table = quote(Inventory._meta.db_table)
+    alert_table = quote(InventoryAlert._meta.db_table)
+
+    key_filter = inventory_filter = ''
+    key_params = []
+    if keys is not None:
+        keys = sorted(keys)
+        key_list = ', '.join(['(%s, %s)'] * len(keys))
+        key_params = [value for key in keys for value in key]
+        key_filter = f"(part_type_id, aircraft_type_id) IN ({key_list})"
+        inventory_filter = f"WHERE (inv.part_type_id, inv.aircraft_type_id) IN ({key_list})"
+
+    # Eşzamanlı iki yazma aynı geçişi görürse, ikinci UPDATE satırın son halini tekrar kontrol eder
+    # (inv.stock_status = e.previous_status) ve uyarı iki kez eklenmez
+    ctes = [
+        ('alert_evaluated', (
+            f"SELECT inv.id, inv.stock_status AS previous_status, t.quantity, "
+            f"CASE WHEN t.quantity <= 0 THEN %s WHEN t.quantity < inv.minimum_quantity THEN %s ELSE %s END AS status "
+            f"FROM {inventory_table} inv "
+            f"JOIN {stock_totals_sql(key_filter)} t "
+            f"ON t.part_type_id = inv.part_type_id AND t.aircraft_type_id = inv.aircraft_type_id "
+            f"{inventory_filter}"
+        )),
+        ('alert_changed', (
+            f"UPDATE {inventory_table} inv SET stock_status = e.status FROM alert_evaluated e "
+            f"WHERE inv.id = e.id AND e.status <> e.previous_status AND inv.stock_status = e.previous_status "
+            f"RETURNING inv.part_type_id, inv.aircraft_type_id, e.previous_status, e.status, e.quantity, inv.minimum_quantity"
+        )),
+        ('alert_inserted', (
+            f"INSERT INTO {alert_table} "
+            f"(part_type_id, aircraft_type_id, previous_status, status, quantity, minimum_quantity, created_at) "
+            f"SELECT part_type_id, aircraft_type_id, previous_status, status, quantity, minimum_quantity, %s FROM alert_changed"
+        )),
+    ]
+    params = [
+        StockStatuses.OUT_OF_STOCK, StockStatuses.CRITICAL, StockStatuses.OK,
+        *key_params, *key_params,
+        connection.ops.adapt_datetimefield_value(timezone.now())
+    ]
+    return ctes, params
+
+
+def get_critical_inventory():
+    """
+    Kritik seviyedeki veya stoğu biten envanter satırları.
+    Kısmi indeks (inventory_critical) üzerinden okunur, maliyeti kritik satır sayısıyla orantılıdır.
+    """
+    return Inventory.objects.exclude(stock_status=StockStatuses.OK)
@@ -0,0 +1,210 @@
+# core/services/assembly.py
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from ..models.assembly import Assembly
+from ..models.part import Part
+from .inventory import apply_inventory_deltas, Reasons
+from .reference import get_requirements
+from .versions import bump_versions, scoped_versions, ASSEMBLY, PART
+
+
+class PartsUnavailableError(Exception):
+    """Seçilen parçaların bir kısmı artık kullanılabilir değilse fırlatılır"""
+
+
+class InsufficientPartsError(PartsUnavailableError):
+    """
+    Otomatik parça ayırmada stok gereksinimi karşılamıyorsa fırlatılır.
+    missing: [{'part_type_id', 'part_type', 'required', 'allocated'}]
+    """
+
+    def __init__(self, missing):
+        self.missing = missing
+        super().__init__("Gerekli parçalar stokta yok: " + ", ".join(
+            f"{item['part_type']} ({item['required']} gerekli, {item['allocated']} bulundu)" for item in missing
+        ))
+
+
+def consume_parts(parts, assembly=None, actor=None):
+    """
+    Parçaları tek UPDATE ile kullanıldı olarak işaretler ve envanteri parça tipi başına bir kez azaltır.
+    Kit büyüklüğünden bağımsız olarak iki sorgu çalışır, transaction içinde çağrılmalıdır.
+    """
+    part_ids = {part.id for part in parts}
+
+    # Sadece hala kullanılmamış parçalar güncellenir, eksik satır başka bir montajın parçayı aldığını gösterir
+    updated = Part.objects.filter(id__in=part_ids, is_used=False).update(is_used=True, updated_at=timezone.now())
+    if updated != len(part_ids):
+        raise PartsUnavailableError("Bazı parçalar başka bir montajda kullanılmış!")
+    bump_versions(*scoped_versions(PART, [part.type_id for part in parts]))
+
+    counts = Counter((part.type_id, part.aircraft_type_id) for part in parts)
+    apply_inventory_deltas(
+        {key: -count for key, count in counts.items()},
+        reason=Reasons.CONSUMED,
+        actor=actor,
+        assembly=assembly
+    )
+
+
+def claim_parts(aircraft_type_id, requirements):
+    """
+    Gereksinimler için stoktaki en eski parçaları SELECT ... FOR UPDATE SKIP LOCKED ile kilitler.
+    Başka bir işlemin kilitlediği parçalar beklenmeden atlanır, eşzamanlı montajlar aynı parçayı almaz
+    ve birbirini beklemez. Kilitler parça tipi, sonra (created_at, id) sırasıyla alınır.
+    Transaction içinde çağrılmalıdır, kilitler transaction sonunda bırakılır.
+    requirements: [(part_type_id, adet)]
+    Returns:
+        dict: {part_type_id: [kilitlenen parçalar]}, stok yetmezse liste istenenden kısadır
+    """
+    claimed = {}
+    for part_type_id, quantity in sorted(requirements):
+        claimed[part_type_id] = list(
+            Part.objects
+            .filter(aircraft_type_id=aircraft_type_id, type_id=part_type_id, is_used=False)
+            .order_by('created_at', 'id')
+            .select_for_update(skip_locked=True)
+            .only('id', 'type_id', 'aircraft_type_id')[:quantity]
+        )
+    return claimed
+
+
+def build_assemblies(aircraft, user, count, notes=''):
+    """
+    Uçak tipinin gereksinim listesine (AircraftRequirement) göre count adet montajı tek transaction içinde oluşturur.
+    Parçalar FIFO sırasıyla ve kilitli satırlar atlanarak ayrılır; montajlar ve parça bağlantıları bulk_create ile
+    eklenir, envanter parça tipi başına bir kez azaltılır. Sorgu sayısı montaj sayısından bağımsızdır.
+    Stok yetmezse tamamlanabilen kadar montaj oluşturulur.
+    Returns:
+        tuple: (oluşturulan montajlar, eksikler [{'part_type_id', 'part_type', 'required', 'allocated'}])
+    """
+    # Gereksinimler referans önbelleğinden okunur, adedi 0 olan gereksinimler için parça ayrılmaz
+    requirements = [
+        (requirement.part_type_id, requirement.quantity, requirement.part_type.name)
+        for requirement in get_requirements(aircraft.id) if requirement.quantity > 0
+    ]
+    if not requirements:
+        return [], []
+
+    with transaction.atomic():
+        claimed = claim_parts(aircraft.id, [(part_type_id, quantity * count) for part_type_id, quantity, _ in requirements])
+        missing = [
+            {
+                'part_type_id': part_type_id,
+                'part_type': name,
+                'required': quantity * count,
+                'allocated': len(claimed[part_type_id])
+            }
+            for part_type_id, quantity, name in requirements if len(claimed[part_type_id]) < quantity * count
+        ]
+        built = min(len(claimed[part_type_id]) // quantity for part_type_id, quantity, _ in requirements)
+        if not built:
+            return [], missing
+
+        assemblies = Assembly.objects.bulk_create([
+            Assembly(aircraft_type=aircraft, assembled_by=user, notes=notes, is_complete=True)
+            for _ in range(built)
+        ])
+
+        # Her montaja her parça tipinden gereken adet sırayla verilir, fazla kilitlenen parçalar stokta kalır
+        parts = []
+        links = []
+        for index, assembly in enumerate(assemblies):
+            for part_type_id, quantity, _ in requirements:
+                kit = claimed[part_type_id][index * quantity:(index + 1) * quantity]
+                parts.extend(kit)
+                links.extend(Assembly.parts.through(assembly_id=assembly.id, part_id=part.id) for part in kit)
+        Assembly.parts.through.objects.bulk_create(links)
+
+        consume_parts(parts, assembly=assemblies[0] if built == 1 else None, actor=user)
+        # bulk_create post_save sinyali göndermez
+        bump_versions(ASSEMBLY)
+    return assemblies, missing
+
+
+def allocate_assembly(aircraft, user, notes=''):
+    """
+    Tek montaj için parçaları sunucu tarafında seçip montajı oluşturur.
+    Stok yetmezse hiçbir değişiklik yapılmadan InsufficientPartsError fırlatılır.
+    """
+    assemblies, missing = build_assemblies(aircraft, user, 1, notes=notes)
+    if missing or not assemblies:
+        raise InsufficientPartsError(missing)
+    return assemblies[0]
+
+
+def cancel_assembly(assembly, actor=None):
+    """
+    Montajı iptal eder: parçaları tek UPDATE ile serbest bırakır, envanteri parça tipi başına
+    bir kez artırır ve montajı siler. Kit büyüklüğünden bağımsız olarak sabit sayıda sorgu çalışır,
+    transaction içinde çağrılmalıdır.
+    """
+    parts = list(
+        assembly.parts.filter(is_used=True).order_by().values_list('id', 'type_id', 'aircraft_type_id')
+    )
+
+    Part.objects.filter(id__in=[part_id for part_id, _, _ in parts]).update(is_used=False, updated_at=timezone.now())
+    bump_versions(*scoped_versions(PART, [type_id for _, type_id, _ in parts]))
+
+    counts = Counter((type_id, aircraft_type_id) for _, type_id, aircraft_type_id in parts)
+    apply_inventory_deltas(counts, reason=Reasons.RESTORED, actor=actor, assembly=assembly)
+
+    assembly.delete()
+
+
+def get_assembly_summaries(assembly_ids):
+    """
+    Montajların parça sayısı, parça tipi dağılımı ve parçaları üreten takım dağılımını tek GROUP BY sorgusu ile hesaplar.
+    Returns:
+        dict: {montaj id: {'part_count': int, 'part_types': [{'id', 'name', 'count'}], 'teams': [{'name', 'count'}]}}
+    """
+    summaries = {
+        assembly_id: {'part_count': 0, 'part_types': {}, 'teams': {}}
+        for assembly_id in assembly_ids
+    }
+    if not summaries:
+        return summaries
+
+    rows = (
+        Assembly.parts.through.objects
+        .filter(assembly_id__in=summaries)
+        .values(
+            'assembly_id',
+            'part__type_id',
+            'part__type__name',
+            'part__created_by__team_id',
+            'part__created_by__team__name',
+            'part__created_by__team__is_assembly_team'
+        )
+        .annotate(count=Count('id'))
+        .order_by('assembly_id', 'part__type__name', 'part__created_by__team__name')
+    )
+
+    for row in rows:
+        summary = summaries[row['assembly_id']]
+        summary['part_count'] += row['count']
+
+        part_type = summary['part_types'].setdefault(
+            row['part__type_id'],
+            {'id': row['part__type_id'], 'name': row['part__type__name'], 'count': 0}
+        )
+        part_type['count'] += row['count']
+
+        # Takım adı Team.__str__ ile aynı gösterilir
+        if row['part__created_by__team_id'] is None:
+            team_name = "Takım Atanmamış"
+        elif row['part__created_by__team__is_assembly_team']:
+            team_name = "Montaj Takımı"
+        else:
+            team_name = row['part__created_by__team__name']
+        team = summary['teams'].setdefault(team_name, {'name': team_name, 'count': 0})
+        team['count'] += row['count']
+
+    for summary in summaries.values():
+        summary['part_types'] = list(summary['part_types'].values())
+        summary['teams'] = list(summary['teams'].values())
+    return summaries
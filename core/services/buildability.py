@@ -0,0 +1,75 @@
+# core/services/buildability.py
+from django.db import connection
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ..models.aircraft import AircraftBuildability, AircraftRequirement
+from .post_commit import execute_ctes, post_commit_task, run_on_commit
+from .stock import stock_totals_sql
+
+# Commit sonrası üretilebilir uçak sayısı yenileme görevi, değerler uçak tipi id'leridir
+BUILDABLE_COUNTS = 'buildable_counts'
+
+
+def refresh_buildable_counts(aircraft_type_ids):
+    """
+    Verilen uçak tipleri için üretilebilir uçak sayısını tek sorguda yeniden hesaplar.
+    Üretilebilir adet = gereksinimler üzerinden min(floor(mevcut / gerekli)), mevcut miktar
+    anlık görüntü ve bekleyen hareketlerin toplamıdır.
+    """
+    aircraft_type_ids = sorted(set(aircraft_type_ids))
+    if aircraft_type_ids:
+        execute_ctes(*buildable_count_ctes(aircraft_type_ids))
+
+
+@post_commit_task(BUILDABLE_COUNTS)
+def buildable_count_ctes(aircraft_type_ids):
+    """refresh_buildable_counts ifadesinin CTE'si, commit sonrası diğer işlerle aynı ifadede çalışabilir"""
+    aircraft_type_ids = sorted(aircraft_type_ids)
+    quote = connection.ops.quote_name
+    buildability_table = quote(AircraftBuildability._meta.db_table)
+    requirement_table = quote(AircraftRequirement._meta.db_table)
+    id_list = ', '.join(['%s'] * len(aircraft_type_ids))
+
+    sql = (
+        f"INSERT INTO {buildability_table} (aircraft_type_id, buildable_count, updated_at) "
+        f"SELECT r.aircraft_type_id, MIN(GREATEST(COALESCE(i.quantity, 0), 0) / r.quantity), %s "
+        f"FROM {requirement_table} r "
+        f"LEFT JOIN {stock_totals_sql(f'aircraft_type_id IN ({id_list})')} i "
+        f"ON i.part_type_id = r.part_type_id AND i.aircraft_type_id = r.aircraft_type_id "
+        f"WHERE r.aircraft_type_id IN ({id_list}) AND r.quantity > 0 "
+        f"GROUP BY r.aircraft_type_id "
+        # Satırlar uçak tipi sırasıyla yazılır, eşzamanlı yenilemeler kilitleri aynı sırada alır
+        f"ORDER BY r.aircraft_type_id "
+        f"ON CONFLICT (aircraft_type_id) DO UPDATE "
+        f"SET buildable_count = EXCLUDED.buildable_count, updated_at = EXCLUDED.updated_at "
+        # Eşzamanlı iki yenilemeden daha önce başlayanı, sonrakinin sonucunu ezmez
+        f"WHERE {buildability_table}.updated_at <= EXCLUDED.updated_at"
+    )
+    params = [connection.ops.adapt_datetimefield_value(timezone.now()), *aircraft_type_ids, *aircraft_type_ids]
+    return [('buildable_counts', sql)], params
+
+
+def refresh_buildable_counts_on_commit(aircraft_type_ids):
+    """
+    Üretilebilir uçak sayısını transaction commit edildikten sonra kendi kısa transaction'ında yeniler.
+    Envanter yazmaları aynı uçak tipinin sayaç satırını kilitleyip birbirini beklemez; ertelenmiş modda
+    da sayaç bekleyen hareketlerle birlikte hesaplandığı için sıkıştırmayı beklemez.
+    Yenileme commit sonrası diğer işlerle (stok uyarısı, tablo sürümü) aynı ifadede çalışır.
+    """
+    aircraft_type_ids = set(aircraft_type_ids)
+    if aircraft_type_ids:
+        run_on_commit(**{BUILDABLE_COUNTS: aircraft_type_ids})
+
+
+# Gereksinim eklendiğinde, güncellendiğinde veya silindiğinde ilgili uçak tipinin sayacını yeniler
+@receiver(post_save, sender=AircraftRequirement)
+@receiver(post_delete, sender=AircraftRequirement)
+def update_buildability_on_requirement_change(sender, instance, **kwargs):
+    aircraft_type_id = instance.aircraft_type_id
+    if not AircraftRequirement.objects.filter(aircraft_type_id=aircraft_type_id).exists():
+        # Gereksinimi kalmayan uçak tipi için sayaç anlamsızdır
+        AircraftBuildability.objects.filter(aircraft_type_id=aircraft_type_id).delete()
+        return
+    refresh_buildable_counts([aircraft_type_id])
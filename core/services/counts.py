@@ -0,0 +1,76 @@
+# core/services/counts.py
+import hashlib
+
+from django.core.cache import cache
+from django.db import connection
+
+from .versions import get_versions
+
+COUNT_CACHE_TIMEOUT = 300
+# Arama metni başına anahtar sayısı sınırsız olduğu için aramalı sayılar kısa süre tutulur
+SEARCH_COUNT_CACHE_TIMEOUT = 30
+
+# Bu sayının üzerindeki tablolarda filtresiz toplam için Postgres istatistiği (reltuples) kullanılır
+ESTIMATE_THRESHOLD = 100000
+
+ALL_SCOPE = 'all'
+
+
+def get_team_scope(user):
+    """
+    Kullanıcının listelerde gördüğü veri kapsamı.
+    Süper kullanıcı ve montaj takımı tüm kayıtları, diğer takımlar sadece kendi parça tiplerini görür.
+    """
+    if user.is_superuser or not user.team or user.team.is_assembly_team:
+        return ALL_SCOPE
+    return f'part_type:{user.team.part_type_id}'
+
+
+def count_records(endpoint, queryset, base_queryset, scope, search, tables):
+    """
+    Datatable için (recordsTotal, recordsFiltered) döndürür, her sayı istek başına en fazla bir kez hesaplanır.
+    Sayılar (endpoint, kapsam, arama) için önbelleğe alınır, anahtar ilgili tabloların sürümünü içerdiği için
+    bu tablolara yazıldığında önbellek kendiliğinden geçersiz olur. Aramalı sayılar SEARCH_COUNT_CACHE_TIMEOUT
+    kadar tutulur, sayfalama sırasındaki tekrar istekleri karşılar ve önbellekte birikmez.
+    queryset: arama filtresi uygulanmış sorgu
+    base_queryset: sadece yetki kapsamı uygulanmış sorgu
+    tables: sayıyı etkileyen tablo sürümleri (versions modülündeki isimler)
+    """
+    version = get_versions(*tables)
+    total = _cached_count(
+        endpoint, scope, '', version, base_queryset,
+        estimate=scope == ALL_SCOPE
+    )
+    if not search:
+        return total, total
+
+    filtered = _cached_count(endpoint, scope, search, version, queryset, estimate=False)
+    return total, filtered
+
+
+def estimate_row_count(model):
+    """
+    Postgres planlayıcı istatistiğinden tablo satır sayısı tahmini.
+    Tablo hiç analiz edilmediyse -1 döner.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    return row[0] if row else -1
+
+
+def _cached_count(endpoint, scope, search, version, queryset, estimate):
+    search_hash = hashlib.md5(search.encode()).hexdigest()
+    key = f'count:{endpoint}:{scope}:{search_hash}:{version}'
+
+    count = cache.get(key)
+    if count is None:
+        count = estimate_row_count(queryset.model) if estimate else -1
+        # Küçük tablolarda tahmin yanıltıcı olabilir, gerçek sayı zaten ucuzdur
+        if count < ESTIMATE_THRESHOLD:
+            count = queryset.count()
+        cache.set(key, count, SEARCH_COUNT_CACHE_TIMEOUT if search else COUNT_CACHE_TIMEOUT)
+    return count
@@ -0,0 +1,139 @@
+# core/services/export.py
+import csv
+import datetime
+import json
+from collections import namedtuple
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.exceptions import PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, Value
+
+from ..models.assembly import Assembly
+from ..models.inventory import Inventory
+from ..models.part import Part
+
+EXPORT_CHUNK_SIZE = 2000
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+# columns: [(çıktıdaki alan adı, .values_list() yolu)]
+# team_field: takım kapsamı için parça tipi alanı, None ise tüm kayıtlar görünür
+ExportSpec = namedtuple('ExportSpec', ['queryset', 'columns', 'team_field'])
+
+
+def part_queryset():
+    return Part.objects.all()
+
+
+def assembly_queryset():
+    return Assembly.objects.annotate(
+        part_ids=ArrayAgg(
+            'parts__id', filter=Q(parts__isnull=False), ordering='parts__id', default=Value([])
+        )
+    )
+
+
+def inventory_queryset():
+    return Inventory.objects.with_current_quantity()
+
+
+EXPORTS = {
+    'part': ExportSpec(
+        queryset=part_queryset,
+        columns=[
+            ('id', 'id'),
+            ('name', 'name'),
+            ('part_type', 'type__name'),
+            ('aircraft_type', 'aircraft_type__name'),
+            ('created_by', 'created_by__username'),
+            ('created_at', 'created_at'),
+            ('is_used', 'is_used'),
+        ],
+        team_field='type_id'
+    ),
+    'assembly': ExportSpec(
+        queryset=assembly_queryset,
+        columns=[
+            ('id', 'id'),
+            ('aircraft_type', 'aircraft_type__name'),
+            ('assembled_by', 'assembled_by__username'),
+            ('assembled_at', 'assembled_at'),
+            ('is_complete', 'is_complete'),
+            ('notes', 'notes'),
+            ('part_ids', 'part_ids'),
+        ],
+        team_field=None
+    ),
+    'inventory': ExportSpec(
+        queryset=inventory_queryset,
+        columns=[
+            ('id', 'id'),
+            ('part_type', 'part_type__name'),
+            ('aircraft_type', 'aircraft_type__name'),
+            ('quantity', 'current_quantity'),
+            ('minimum_quantity', 'minimum_quantity'),
+            ('stock_status', 'stock_status'),
+            ('updated_at', 'updated_at'),
+        ],
+        team_field='part_type_id'
+    ),
+}
+
+
+def get_export_rows(name, user=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Dışa aktarılacak satırları sunucu taraflı imleç (iterator) ile parça parça okur.
+    user verilirse liste ekranlarındaki takım kapsamı uygulanır.
+    Bellek kullanımı satır sayısından bağımsızdır, sadece chunk_size kadar satır bellekte tutulur.
+    """
+    spec = EXPORTS[name]
+    queryset = spec.queryset()
+
+    if user is not None and not user.is_superuser:
+        if not user.team:
+            raise PermissionDenied("Kullanıcının takımı bulunmuyor.")
+        if spec.team_field and not user.team.is_assembly_team:
+            queryset = queryset.filter(**{spec.team_field: user.team.part_type_id})
+
+    return queryset.order_by('id').values_list(
+        *[path for _, path in spec.columns]
+    ).iterator(chunk_size=chunk_size)
+
+
+def render_export(name, rows, export_format):
+    """
+    Satırları CSV veya NDJSON satırlarına çeviren üreteç.
+    Her satır ayrı bir metin olarak üretilir, StreamingHttpResponse ve dosyaya yazma için kullanılır.
+    """
+    headers = [header for header, _ in EXPORTS[name].columns]
+
+    if export_format == 'ndjson':
+        for row in rows:
+            yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+        return
+
+    buffer = EchoBuffer()
+    writer = csv.writer(buffer)
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([csv_value(value) for value in row])
+
+
+def csv_value(value):
+    # Tarihler NDJSON çıktısı ile aynı ISO formatında, id listeleri ';' ile ayrılarak yazılır
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ';'.join(map(str, value))
+    return value
+
+
+class EchoBuffer:
+    """csv.writer'ın yazdığı satırı saklamadan geri döndürür"""
+
+    def write(self, value):
+        return value
@@ -0,0 +1,46 @@
+# core/services/indexes.py
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+# {model: [Index]} Meta.indexes yerine migrate sonrasında oluşturulan Postgres indeksleri
+POSTGRES_INDEXES = {}
+
+
+def register_postgres_indexes(model, indexes):
+    """
+    Indeksleri Meta.indexes yerine migrate sonrasında sadece Postgres'te oluşturulmak üzere kaydeder.
+    Migrasyonlar dağıtımda makemigrations ile üretildiği için Meta.indexes'teki indeksler CREATE INDEX ile
+    tabloyu yazmaya kilitler; Postgres'e özgü ifadeler (tsvector) ise SQLite'ta migrate'i bozar.
+    """
+    POSTGRES_INDEXES.setdefault(model, []).extend(indexes)
+
+
+def create_postgres_indexes(app_config, using='default', **kwargs):
+    """
+    Eksik indeksleri CREATE INDEX CONCURRENTLY ile tabloyu kilitlemeden oluşturur.
+    Yarıda kalmış (geçersiz) bir eşzamanlı oluşturma indeksi önce silinip yeniden oluşturulur.
+    """
+    connection = connections[using]
+    if app_config.name != 'core' or connection.vendor != 'postgresql':
+        return
+
+    for model, indexes in POSTGRES_INDEXES.items():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.relname, i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE i.indrelid = %s::regclass",
+                [model._meta.db_table]
+            )
+            existing = dict(cursor.fetchall())
+
+        for index in indexes:
+            if existing.get(index.name):
+                continue
+            # CONCURRENTLY transaction içinde çalışmaz
+            with connection.schema_editor(atomic=False) as editor:
+                if index.name in existing:
+                    editor.remove_index(model, index, concurrently=True)
+                editor.add_index(model, index, concurrently=True)
+
+
+post_migrate.connect(create_postgres_indexes, dispatch_uid='core_create_postgres_indexes')
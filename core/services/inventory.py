@@ -0,0 +1,235 @@
+# core/services/inventory.py
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from ..models.inventory import Inventory, InventoryMovement
+from .alerts import evaluate_stock_alerts, STOCK_ALERTS
+from .buildability import BUILDABLE_COUNTS
+from .post_commit import run_on_commit
+from .versions import bump_versions, scoped_versions, INVENTORY, TABLE_VERSIONS
+
+Reasons = InventoryMovement.Reasons
+
+
+def snapshots_are_deferred():
+    """
+    INVENTORY_DEFERRED_SNAPSHOTS açıksa yazma işlemleri sadece hareket defterine ekleme yapar,
+    Inventory satırları compact_inventory_movements ile periyodik olarak güncellenir.
+    """
+    return getattr(settings, 'INVENTORY_DEFERRED_SNAPSHOTS', False)
+
+
+def adjust_inventory(part_type_id, aircraft_type_id, delta, reason=Reasons.ADJUSTED, actor=None, assembly=None, part=None):
+    """
+    Tek bir (parça tipi, uçak tipi) envanter sayacına işaretli delta uygular.
+    Üretimde +n, kullanım ve silmede -n, iade durumunda +n verilir.
+    """
+    apply_inventory_deltas(
+        {(part_type_id, aircraft_type_id): delta},
+        reason=reason,
+        actor=actor,
+        assembly=assembly,
+        part=part
+    )
+
+
+def apply_inventory_deltas(deltas, reason=Reasons.ADJUSTED, actor=None, assembly=None, part=None):
+    """
+    {(part_type_id, aircraft_type_id): delta} sözlüğündeki değişiklikleri envantere uygular.
+
+    Hareket defteri satırları sayaç yazması ile aynı ifadede (WITH ... INSERT) eklenir:
+    artışlar tek bir INSERT ... ON CONFLICT DO UPDATE, azalışlar tek bir UPDATE ile işlenir. Tek anahtarlı
+    değişiklik (adjust_inventory) transaction içinde tek sorgu çalıştırır.
+    Ertelenmiş modda hareket eklenir ve ilk kez yazılan anahtar için boş Inventory satırı (ON CONFLICT DO NOTHING,
+    var olan satır kilitlenmez) oluşturulur; bekleyen stok liste, eksik parça ve uyarı sorgularında görünür.
+    Stok eşik kontrolü, üretilebilir uçak sayısı ve tablo sürümleri commit sonrası transaction'daki diğer
+    yazmaların işleriyle birlikte tek ifadede güncellenir; ertelenmiş modda eşik kontrolü sıkıştırmada çalışır.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    deferred = snapshots_are_deferred()
+    movement = _movement_insert(deltas, reason, actor, assembly, part, is_compacted=not deferred)
+    if deferred:
+        ensure_inventory_rows(deltas, timezone.now(), movement)
+    else:
+        _write_snapshots(deltas, movement)
+    run_on_commit(**{
+        STOCK_ALERTS: () if deferred else deltas.keys(),
+        BUILDABLE_COUNTS: [aircraft_type_id for _, aircraft_type_id in deltas],
+        TABLE_VERSIONS: scoped_versions(INVENTORY, [part_type_id for part_type_id, _ in deltas]),
+    })
+
+
+def compact_inventory_movements(batch_size=10000):
+    """
+    Bekleyen hareketleri Inventory anlık görüntülerine işler.
+    Satırlar SKIP LOCKED ile kilitlendiği için aynı anda çalışan sıkıştırma işleri aynı hareketi iki kez işlemez.
+    Ertelenmiş modda yazmalar eşik kontrolü yapmadığı için işlenen anahtarların stok uyarıları burada değerlendirilir.
+    Returns:
+        int: İşlenen hareket sayısı
+    """
+    with transaction.atomic():
+        movements = list(
+            InventoryMovement.objects
+            .filter(is_compacted=False)
+            .order_by('id')
+            .select_for_update(skip_locked=True)
+            .values_list('id', 'part_type_id', 'aircraft_type_id', 'delta')[:batch_size]
+        )
+        if not movements:
+            return 0
+
+        deltas = {}
+        for _, part_type_id, aircraft_type_id, delta in movements:
+            key = (part_type_id, aircraft_type_id)
+            deltas[key] = deltas.get(key, 0) + delta
+
+        _write_snapshots({key: delta for key, delta in deltas.items() if delta})
+        InventoryMovement.objects.filter(
+            id__in=[movement_id for movement_id, _, _, _ in movements]
+        ).update(is_compacted=True)
+        # Hareketler işlendi olarak işaretlendikten sonra, aksi halde miktar iki kez sayılır
+        evaluate_stock_alerts(deltas)
+        bump_versions(*scoped_versions(INVENTORY, [part_type_id for part_type_id, _ in deltas]))
+
+    return len(movements)
+
+
+def get_stock_at(part_type_id, aircraft_type_id, at):
+    """
+    Verilen tarihteki stok miktarını döndürür.
+    Güncel miktardan (anlık görüntü + bekleyen hareketler) o tarihten sonraki hareketler çıkarılır.
+    """
+    current = (
+        Inventory.objects
+        .with_current_quantity()
+        .filter(part_type_id=part_type_id, aircraft_type_id=aircraft_type_id)
+        .values_list('current_quantity', flat=True)
+        .first()
+    )
+    if current is None:
+        current = InventoryMovement.objects.filter(
+            is_compacted=False,
+            part_type_id=part_type_id,
+            aircraft_type_id=aircraft_type_id
+        ).aggregate(total=Sum('delta'))['total'] or 0
+
+    later = InventoryMovement.objects.filter(
+        part_type_id=part_type_id,
+        aircraft_type_id=aircraft_type_id,
+        created_at__gt=at
+    ).aggregate(total=Sum('delta'))['total'] or 0
+
+    return max(current - later, 0)
+
+
+def _movement_insert(deltas, reason, actor, assembly, part, is_compacted):
+    # Her anahtar için bir hareket satırı, sayaç yazan ifadeye WITH ile eklenir
+    # actor, assembly ve part model nesnesi veya id olarak verilebilir
+    table = connection.ops.quote_name(InventoryMovement._meta.db_table)
+    created_at = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    params = []
+    for (part_type_id, aircraft_type_id), delta in sorted(deltas.items()):
+        params.extend([
+            part_type_id, aircraft_type_id, delta, reason,
+            getattr(actor, 'pk', actor), getattr(assembly, 'pk', assembly), getattr(part, 'pk', part),
+            is_compacted, created_at
+        ])
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(deltas))
+
+    sql = (
+        f"INSERT INTO {table} "
+        f"(part_type_id, aircraft_type_id, delta, reason, actor_id, assembly_id, part_id, is_compacted, created_at) "
+        f"VALUES {values}"
+    )
+    return sql, params
+
+
+def _execute(sql, params, movement=None):
+    # movement (hareket INSERT'ü) verilirse ifadenin başına WITH ile eklenir, iki yazma tek sorguda yapılır
+    if movement is not None:
+        movement_sql, movement_params = movement
+        sql = f"WITH movement AS ({movement_sql}) {sql}"
+        params = [*movement_params, *params]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _write_snapshots(deltas, movement=None):
+    # movement verilirse ilk ifadeye eklenir
+    increments = {key: delta for key, delta in deltas.items() if delta > 0}
+    decrements = {key: delta for key, delta in deltas.items() if delta < 0}
+
+    now = timezone.now()
+    if increments:
+        _upsert_increments(increments, now, movement)
+        movement = None
+    if decrements:
+        _apply_decrements(decrements, now, movement)
+
+
+def _upsert_increments(increments, now, movement=None):
+    # Satır yoksa oluşturur, varsa mevcut miktarın üzerine ekler
+    # Anahtarlar sıralı gönderilir, eşzamanlı toplu işlemler satır kilitlerini aynı sırada alır
+    table = connection.ops.quote_name(Inventory._meta.db_table)
+    minimum_quantity = Inventory._meta.get_field('minimum_quantity').get_default()
+    stock_status = Inventory._meta.get_field('stock_status').get_default()
+    updated_at = connection.ops.adapt_datetimefield_value(now)
+
+    params = []
+    for (part_type_id, aircraft_type_id), delta in sorted(increments.items()):
+        params.extend([part_type_id, aircraft_type_id, delta, minimum_quantity, stock_status, updated_at])
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(increments))
+
+    sql = (
+        f"INSERT INTO {table} (part_type_id, aircraft_type_id, quantity, minimum_quantity, stock_status, updated_at) "
+        f"VALUES {values} "
+        f"ON CONFLICT (part_type_id, aircraft_type_id) DO UPDATE "
+        f"SET quantity = {table}.quantity + EXCLUDED.quantity, updated_at = EXCLUDED.updated_at"
+    )
+    _execute(sql, params, movement)
+
+
+def _apply_decrements(decrements, now, movement=None):
+    # Tüm azalışlar tek UPDATE ile yapılır, sayaç sıfırın altına düşürülmez
+    table = connection.ops.quote_name(Inventory._meta.db_table)
+
+    params = [connection.ops.adapt_datetimefield_value(now)]
+    for (part_type_id, aircraft_type_id), delta in sorted(decrements.items()):
+        params.extend([part_type_id, aircraft_type_id, delta])
+    values = ', '.join(['(%s, %s, %s)'] * len(decrements))
+
+    sql = (
+        f"UPDATE {table} inv SET quantity = GREATEST(inv.quantity + d.delta, 0), updated_at = %s "
+        f"FROM (VALUES {values}) AS d (part_type_id, aircraft_type_id, delta) "
+        f"WHERE inv.part_type_id = d.part_type_id AND inv.aircraft_type_id = d.aircraft_type_id"
+    )
+    _execute(sql, params, movement)
+
+
+def ensure_inventory_rows(keys, now, movement=None):
+    """
+    Verilen anahtarlar için eksik Inventory satırlarını boş olarak oluşturur.
+    Var olan satıra dokunmaz, ON CONFLICT DO NOTHING satır kilidi almaz.
+    """
+    table = connection.ops.quote_name(Inventory._meta.db_table)
+    minimum_quantity = Inventory._meta.get_field('minimum_quantity').get_default()
+    stock_status = Inventory._meta.get_field('stock_status').get_default()
+    updated_at = connection.ops.adapt_datetimefield_value(now)
+
+    params = []
+    for part_type_id, aircraft_type_id in sorted(keys):
+        params.extend([part_type_id, aircraft_type_id, 0, minimum_quantity, stock_status, updated_at])
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(keys))
+
+    sql = (
+        f"INSERT INTO {table} (part_type_id, aircraft_type_id, quantity, minimum_quantity, stock_status, updated_at) "
+        f"VALUES {values} "
+        f"ON CONFLICT (part_type_id, aircraft_type_id) DO NOTHING"
+    )
+    _execute(sql, params, movement)
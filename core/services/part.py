@@ -0,0 +1,74 @@
+# core/services/part.py
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Cast, Concat
+
+from ..models.part import Part
+from .inventory import apply_inventory_deltas, Reasons
+from .versions import bump_versions, scoped_versions, PART
+
+BULK_CREATE_BATCH_SIZE = 500
+
+
+def reserve_part_ids(count):
+    """
+    Parça id dizisinden (sequence) count adet id ayırır.
+    Ayrılan id'ler başka bir eklemede kullanılmaz, eşzamanlı partiler aynı id'yi alamaz.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [Part._meta.db_table, count]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def produce_parts(user, items):
+    """
+    Parçaları toplu olarak üretir.
+    items: [{'name': str, 'type_id': int, 'aircraft_type_id': int}, ...]
+    İsmi boş olan kalemler için 'name_prefix' verilir, isim '<name_prefix>-<id>' olur. Son ek parçanın id'si
+    olduğu için partiler arasında tekrar etmez.
+
+    Parçalar bulk_create ile eklenir (post_save sinyali çalışmaz), envanter
+    her (parça tipi, uçak tipi) grubu için tek bir delta ile güncellenir.
+    """
+    parts = [
+        Part(
+            name=item.get('name') or '',
+            type_id=item['type_id'],
+            aircraft_type_id=item['aircraft_type_id'],
+            created_by=user
+        )
+        for item in items
+    ]
+    unnamed = [(part, item['name_prefix']) for part, item in zip(parts, items) if not item.get('name')]
+
+    with transaction.atomic():
+        # Postgres'te id'ler eklemeden önce ayrılır, isim tek yazmada oluşur
+        reserved = connection.vendor == 'postgresql' and unnamed
+        if reserved:
+            for (part, prefix), part_id in zip(unnamed, reserve_part_ids(len(unnamed))):
+                part.id = part_id
+                part.name = f"{prefix}-{part_id}"
+
+        parts = Part.objects.bulk_create(parts, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        if unnamed and not reserved:
+            for prefix in {prefix for _, prefix in unnamed}:
+                ids = [part.id for part, part_prefix in unnamed if part_prefix == prefix]
+                Part.objects.filter(id__in=ids).update(
+                    name=Concat(Value(f"{prefix}-"), Cast(F('id'), CharField()))
+                )
+            for part, prefix in unnamed:
+                part.name = f"{prefix}-{part.id}"
+
+        apply_inventory_deltas(
+            Counter((part.type_id, part.aircraft_type_id) for part in parts),
+            reason=Reasons.PRODUCED,
+            actor=user
+        )
+        bump_versions(*scoped_versions(PART, [part.type_id for part in parts]))
+    return parts
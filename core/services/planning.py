@@ -0,0 +1,192 @@
+# core/services/planning.py
+from collections import namedtuple
+
+import numpy as np
+
+from ..models.inventory import Inventory
+from .reference import get_reference_data
+
+# aircrafts, part_types: satır ve sütun sırasındaki kayıtlar (referans sırası), aircraft_ids, part_type_ids: id dizileri
+# bom: uçak tipi x parça tipi gereksinim adetleri
+# producers: parça tipi başına üreten takım (yoksa None)
+PlanningMatrices = namedtuple(
+    'PlanningMatrices', ['aircrafts', 'part_types', 'aircraft_ids', 'part_type_ids', 'bom', 'producers']
+)
+# Tümü uçak tipi x parça tipi matrisleri, buildable uçak tipi başına vektör
+PlanResult = namedtuple('PlanResult', ['gross', 'net', 'buildable', 'bottleneck'])
+
+# Sütunlardan birine gereksinimi olmayan uçak tipi için üretilebilir adet hesaplanmaz
+UNLIMITED = np.iinfo(np.int64).max
+
+_bom_cache = (None, None)
+
+
+def index_of(ids, values):
+    """
+    values içindeki id'lerin ids dizisindeki konumlarını döndürür, bulunamayanlar -1 olur.
+    Sıralı kopya üzerinde searchsorted ile çalışır, döngü kullanılmaz.
+    """
+    if not len(ids):
+        return np.full(len(values), -1, dtype=np.int64)
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    positions = np.minimum(np.searchsorted(sorted_ids, values), len(ids) - 1)
+    return np.where(sorted_ids[positions] == values, order[positions], -1)
+
+
+def get_planning_matrices():
+    """
+    Gereksinim matrisini (BOM) referans önbelleğinden kurar.
+    Matris referans verisi yeniden yüklenene kadar tekrar kullanılır, kararlı durumda sorgu çalışmaz.
+    """
+    global _bom_cache
+    reference = get_reference_data()
+    if _bom_cache[0] is reference:
+        return _bom_cache[1]
+
+    aircraft_ids = np.fromiter(reference.aircrafts, dtype=np.int64, count=len(reference.aircrafts))
+    part_type_ids = np.fromiter(reference.part_types, dtype=np.int64, count=len(reference.part_types))
+
+    rows = [
+        (requirement.aircraft_type_id, requirement.part_type_id, requirement.quantity)
+        for requirements in reference.requirements.values() for requirement in requirements
+    ]
+    requirements = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    bom = np.zeros((len(aircraft_ids), len(part_type_ids)), dtype=np.int64)
+    bom[index_of(aircraft_ids, requirements[:, 0]), index_of(part_type_ids, requirements[:, 1])] = requirements[:, 2]
+
+    # Parça tipi başına en fazla bir üretim takımı vardır (unique_together)
+    producers = [None] * len(part_type_ids)
+    teams = [team for team in reference.teams if not team.is_assembly_team and team.part_type_id in reference.part_types]
+    if teams:
+        columns = index_of(part_type_ids, np.array([team.part_type_id for team in teams], dtype=np.int64))
+        for column, team in zip(columns.tolist(), teams):
+            producers[column] = team
+
+    matrices = PlanningMatrices(
+        list(reference.aircrafts.values()), list(reference.part_types.values()),
+        aircraft_ids, part_type_ids, bom, producers
+    )
+    _bom_cache = (reference, matrices)
+    return matrices
+
+
+def get_stock_matrix(matrices):
+    """Kullanılmamış parça adetlerini BOM ile aynı boyutta matris olarak tek sorguda okur"""
+    rows = list(
+        Inventory.objects.with_current_quantity()
+        .order_by()
+        .values_list('aircraft_type_id', 'part_type_id', 'current_quantity')
+    )
+    inventory = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    stock = np.zeros(matrices.bom.shape, dtype=np.int64)
+
+    aircraft_index = index_of(matrices.aircraft_ids, inventory[:, 0])
+    part_type_index = index_of(matrices.part_type_ids, inventory[:, 1])
+    known = (aircraft_index >= 0) & (part_type_index >= 0)
+    stock[aircraft_index[known], part_type_index[known]] = np.maximum(inventory[known, 2], 0)
+    return stock
+
+
+def max_buildable(bom, stock):
+    """Her uçak tipi için stokla tamamlanabilecek montaj sayısı (gereksinimi olmayan tipler için 0)"""
+    required = bom > 0
+    ratios = np.full(bom.shape, UNLIMITED, dtype=np.int64)
+    np.floor_divide(stock, bom, out=ratios, where=required)
+    buildable = ratios.min(axis=1, initial=UNLIMITED)
+    buildable[buildable == UNLIMITED] = 0
+    return buildable, ratios
+
+
+def compute_plan(bom, stock, target):
+    """
+    MRP hesabı, sadece dizi işlemleri kullanır.
+    Brüt ihtiyaç = gereksinim x hedef, net ihtiyaç = brüt ihtiyaç - kullanılmamış stok (uçak tipi ve parça tipi bazında,
+    parçalar uçak tipine özel olduğu için tipler arası stok kullanılmaz).
+    Darboğaz: uçak tipinin üretilebilir adedini belirleyen (en az tamamlanabilen) parça tipleri.
+    """
+    gross = bom * target[:, None]
+    net = np.maximum(gross - stock, 0)
+    buildable, ratios = max_buildable(bom, stock)
+    bottleneck = (bom > 0) & (ratios == buildable[:, None])
+    return PlanResult(gross, net, buildable, bottleneck)
+
+
+def plan_production(targets, matrices=None, stock=None):
+    """
+    Hedef üretim planı için net parça ihtiyacını hesaplar (MRP).
+    BOM referans önbelleğinden, stok tek sorguda okunur; hesaplar compute_plan ile matris işlemleriyle yapılır.
+    Args:
+        targets: {uçak tipi id: hedef adet}, boşsa tüm uçak tipleri için sadece üretilebilir adet hesaplanır
+    Returns:
+        dict: aircrafts (hedef, üretilebilir adet, darboğaz parça tipleri), part_types ve teams (brüt / stok / net ihtiyaç),
+        lines (net ihtiyacı olan uçak tipi / parça tipi satırları)
+    """
+    matrices = get_planning_matrices() if matrices is None else matrices
+    stock = get_stock_matrix(matrices) if stock is None else stock
+
+    target = np.zeros(len(matrices.aircraft_ids), dtype=np.int64)
+    if targets:
+        ids = np.fromiter(targets.keys(), dtype=np.int64, count=len(targets))
+        rows = index_of(matrices.aircraft_ids, ids)
+        known = rows >= 0
+        target[rows[known]] = np.fromiter(targets.values(), dtype=np.int64, count=len(targets))[known]
+
+    gross, net, buildable, bottleneck = compute_plan(matrices.bom, stock, target)
+    # Hedefi karşılayan stok, net ihtiyaçtan ayrı raporlanır
+    allocated = gross - net
+
+    rows = np.flatnonzero(target) if targets else np.arange(len(matrices.aircraft_ids))
+    aircrafts = matrices.aircrafts
+    part_types = matrices.part_types
+
+    gross_by_part_type = gross.sum(axis=0)
+    net_by_part_type = net.sum(axis=0)
+    allocated_by_part_type = allocated.sum(axis=0)
+    columns = np.flatnonzero(gross_by_part_type)
+
+    line_rows, line_columns = np.nonzero(net)
+
+    return {
+        'aircrafts': [
+            {
+                'aircraft_type_id': aircrafts[row].id,
+                'aircraft_type': aircrafts[row].name,
+                'target': int(target[row]),
+                'max_buildable': int(buildable[row]),
+                'shortfall': max(int(target[row] - buildable[row]), 0),
+                'bottlenecks': [part_types[column].name for column in np.flatnonzero(bottleneck[row])],
+            }
+            for row in rows.tolist()
+        ],
+        'part_types': [
+            {
+                'part_type_id': part_types[column].id,
+                'part_type': part_types[column].name,
+                'team': matrices.producers[column].name if matrices.producers[column] else None,
+                'gross': int(gross_by_part_type[column]),
+                'allocated': int(allocated_by_part_type[column]),
+                'net': int(net_by_part_type[column]),
+            }
+            for column in columns.tolist()
+        ],
+        'teams': [
+            {
+                'team_id': matrices.producers[column].id,
+                'team': matrices.producers[column].name,
+                'part_type': part_types[column].name,
+                'net': int(net_by_part_type[column]),
+            }
+            for column in columns.tolist() if matrices.producers[column] and net_by_part_type[column]
+        ],
+        'lines': [
+            {
+                'aircraft_type_id': aircrafts[row].id,
+                'part_type_id': part_types[column].id,
+                'gross': int(gross[row, column]),
+                'available': int(stock[row, column]),
+                'net': int(net[row, column]),
+            }
+            for row, column in zip(line_rows.tolist(), line_columns.tolist())
+        ],
+    }
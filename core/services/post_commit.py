@@ -0,0 +1,63 @@
+# core/services/post_commit.py
+import threading
+
+from django.db import connection, transaction
+
+# {görev adı: (değerler) -> ([(CTE adı, SQL)], parametreler)}
+_tasks = {}
+_local = threading.local()
+
+
+def post_commit_task(name):
+    """
+    Commit sonrası çalışacak bir işin SQL üreticisini kaydeder.
+    Üretici biriken değerleri alır ve veri değiştiren CTE listesi ile parametrelerini döndürür.
+    """
+    def decorator(builder):
+        _tasks[name] = builder
+        return builder
+    return decorator
+
+
+def run_on_commit(**values):
+    """
+    Verilen görevlere değer ekler, transaction commit edildikten sonra biriken tüm görevler tek SQL ifadesinde
+    (WITH ... veri değiştiren CTE'ler) çalışır. Aynı transaction'daki yazmalar (sayaç, stok uyarısı,
+    üretilebilirlik, tablo sürümü) commit sonrası tek sorgu çalıştırır.
+    Geri alınan transaction'da biriken değerler sonraki commit ile işlenir; görevler güncel durumu yeniden
+    hesapladığı için bu sadece fazladan iş demektir.
+    """
+    batch = getattr(_local, 'batch', None)
+    if batch is None:
+        batch = _local.batch = {}
+    for name, items in values.items():
+        batch.setdefault(name, set()).update(items)
+    transaction.on_commit(flush)
+
+
+def flush():
+    # Aynı batch için kaydedilen diğer callback'ler boş batch bulur ve sorgu çalıştırmaz
+    batch, _local.batch = getattr(_local, 'batch', None), None
+    if not batch:
+        return
+
+    ctes, params = [], []
+    # Görevler isim sırasıyla eklenir, eşzamanlı ifadeler tabloları aynı sırada kilitler
+    for name in sorted(batch):
+        if batch[name]:
+            task_ctes, task_params = _tasks[name](batch[name])
+            ctes.extend(task_ctes)
+            params.extend(task_params)
+    execute_ctes(ctes, params)
+
+
+def execute_ctes(ctes, params):
+    """
+    Veri değiştiren CTE'leri tek ifadede çalıştırır.
+    Postgres bu CTE'leri sonuçları okunmasa da sonuna kadar çalıştırır, hepsi aynı anlık görüntüyü görür.
+    """
+    if not ctes:
+        return
+    sql = 'WITH ' + ', '.join(f'{name} AS ({cte})' for name, cte in ctes) + ' SELECT 1'
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
@@ -0,0 +1,217 @@
+# core/services/reconciliation.py
+import logging
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models.inventory import Inventory, InventoryMovement, InventoryReconciliation
+from ..models.part import Part
+from .alerts import STOCK_ALERTS
+from .buildability import BUILDABLE_COUNTS
+from .inventory import ensure_inventory_rows
+from .post_commit import run_on_commit
+from .stock import stock_totals_sql
+from .versions import scoped_versions, INVENTORY, TABLE_VERSIONS
+
+logger = logging.getLogger("core")
+
+# Artımlı çalışmada önceki çalışma sırasında henüz commit edilmemiş işlemleri kaçırmamak için geriye bakılan süre
+INCREMENTAL_OVERLAP = timedelta(minutes=5)
+
+Drift = namedtuple('Drift', ['part_type_id', 'aircraft_type_id', 'recorded', 'actual'])
+
+
+def get_changed_keys(since):
+    """
+    Verilen tarihten sonra parçası, envanter satırı veya envanter hareketi değişen (parça tipi, uçak tipi)
+    anahtarlarını döndürür. Ertelenmiş moda yapılan yazmalar ile ORM üzerinden silinen parçalar
+    Inventory satırını değiştirmez, bunlar her yazmada eklenen hareket satırlarından bulunur.
+    Sinyal ve servisleri atlayan ham SQL silmeleri iz bırakmaz, bunlar için tam mutabakat çalıştırılmalıdır.
+    """
+    part_keys = (
+        Part.objects
+        .filter(updated_at__gte=since)
+        .order_by()
+        .values_list('type_id', 'aircraft_type_id')
+        .distinct()
+    )
+    inventory_keys = (
+        Inventory.objects
+        .filter(updated_at__gte=since)
+        .values_list('part_type_id', 'aircraft_type_id')
+    )
+    movement_keys = (
+        InventoryMovement.objects
+        .filter(created_at__gte=since)
+        .order_by()
+        .values_list('part_type_id', 'aircraft_type_id')
+        .distinct()
+    )
+    return set(part_keys) | set(inventory_keys) | set(movement_keys)
+
+
+def find_drift(keys=None):
+    """
+    Part tablosundan kullanılmamış parça sayılarını tek GROUP BY ile yeniden hesaplar ve
+    envanter sayaçlarıyla (anlık görüntü + bekleyen hareketler) karşılaştırır.
+    keys verilirse sadece bu anahtarlar kontrol edilir.
+    Sayım ve karşılaştırma tek SQL ifadesinde yapıldığı için iki tablo aynı anlık görüntüden okunur.
+    """
+    if keys is not None and not keys:
+        return []
+
+    part_table = connection.ops.quote_name(Part._meta.db_table)
+
+    part_filter = inventory_filter = ''
+    params = []
+    if keys is not None:
+        key_list = ', '.join(['(%s, %s)'] * len(keys))
+        key_params = [value for key in sorted(keys) for value in key]
+        part_filter = f"AND (type_id, aircraft_type_id) IN ({key_list})"
+        inventory_filter = f"(part_type_id, aircraft_type_id) IN ({key_list})"
+        params = key_params + key_params
+
+    sql = (
+        f"SELECT COALESCE(p.type_id, i.part_type_id), COALESCE(p.aircraft_type_id, i.aircraft_type_id), "
+        f"COALESCE(i.quantity, 0), COALESCE(p.available, 0) "
+        f"FROM (SELECT type_id, aircraft_type_id, COUNT(*) AS available FROM {part_table} "
+        f"WHERE NOT is_used {part_filter} GROUP BY type_id, aircraft_type_id) p "
+        f"FULL OUTER JOIN {stock_totals_sql(inventory_filter)} i "
+        f"ON p.type_id = i.part_type_id AND p.aircraft_type_id = i.aircraft_type_id "
+        f"WHERE COALESCE(i.quantity, 0) <> COALESCE(p.available, 0)"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [Drift(*row) for row in cursor.fetchall()]
+
+
+def repair_drift(drifts, chunk_size=500):
+    """
+    Farklı anahtarları parça parça düzeltir, her parça kendi transaction'ında çalışır.
+    Fark bulunduktan sonra stok değişmiş olabileceği için gerçek miktar, anahtarların envanter satırları ve
+    bekleyen hareketleri kilitlendikten sonra Part tablosundan yeniden hesaplanır ve Inventory satırına mutlak
+    değer olarak yazılır. Eksik envanter satırları oluşturulur, bekleyen hareketler işlendi olarak işaretlenir
+    ve düzeltme hareket defterine eklenir; hiçbir değer sıfırda kırpılmaz. Kilitten sonra commit edilen yazmalar yeni hesaba dahil olmadığı için ezilmez.
+    Returns:
+        list: Uygulanan düzeltmeler (düzeltme anındaki kayıtlı ve gerçek miktarlar)
+    """
+    keys = sorted({(drift.part_type_id, drift.aircraft_type_id) for drift in drifts})
+    repaired = []
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start:start + chunk_size]
+        with transaction.atomic():
+            ensure_inventory_rows(chunk, timezone.now())
+            _lock_stock_rows(chunk)
+            corrections = _write_actual_quantities(chunk)
+            if corrections:
+                run_on_commit(**{
+                    STOCK_ALERTS: [(row.part_type_id, row.aircraft_type_id) for row in corrections],
+                    BUILDABLE_COUNTS: [row.aircraft_type_id for row in corrections],
+                    TABLE_VERSIONS: scoped_versions(INVENTORY, [row.part_type_id for row in corrections]),
+                })
+        repaired.extend(corrections)
+
+    for drift in repaired:
+        logger.info(
+            'Envanter farki duzeltildi.',
+            extra={
+                'user': None,
+                'detail': f"{drift.part_type_id}/{drift.aircraft_type_id}: kayıtlı {drift.recorded}, gerçek {drift.actual}",
+                'path': 'reconcile_inventory'
+            }
+        )
+    return repaired
+
+
+def _key_filter(keys):
+    # (part_type_id, aircraft_type_id) IN (...) koşulu ve parametreleri
+    return (
+        f"(part_type_id, aircraft_type_id) IN ({', '.join(['(%s, %s)'] * len(keys))})",
+        [value for key in keys for value in key]
+    )
+
+
+def _lock_stock_rows(keys):
+    # Envanter satırları ve bekleyen hareketler anahtar sırasıyla kilitlenir.
+    # Kilitli satıra yazan işlemler düzeltme commit edilene kadar bekler; sıkıştırma bekleyen hareketleri
+    # SKIP LOCKED ile atlar. Kilitleri alan CTE'ler sonuç sayılarak sonuna kadar çalıştırılır.
+    quote = connection.ops.quote_name
+    where, params = _key_filter(keys)
+    sql = (
+        f"WITH inventory_rows AS (SELECT id FROM {quote(Inventory._meta.db_table)} WHERE {where} "
+        f"ORDER BY part_type_id, aircraft_type_id FOR UPDATE), "
+        f"movement_rows AS (SELECT id FROM {quote(InventoryMovement._meta.db_table)} WHERE NOT is_compacted AND {where} "
+        f"ORDER BY id FOR UPDATE) "
+        f"SELECT (SELECT COUNT(*) FROM inventory_rows) + (SELECT COUNT(*) FROM movement_rows)"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params * 2)
+
+
+def _write_actual_quantities(keys):
+    # Kilitlerden sonra başlayan tek ifade: gerçek ve kayıtlı miktarlar aynı anlık görüntüden hesaplanır,
+    # farklı anahtarların bekleyen hareketleri işlenir, anlık görüntüsü gerçek miktara ayarlanır ve fark (gerçek - kayıtlı) düzeltme hareketi olarak eklenir
+    quote = connection.ops.quote_name
+    part_table = quote(Part._meta.db_table)
+    inventory_table = quote(Inventory._meta.db_table)
+    movement_table = quote(InventoryMovement._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    key_values = ', '.join(['(%s, %s)'] * len(keys))
+    key_params = [value for key in keys for value in key]
+    where, where_params = _key_filter(keys)
+    match = "t.part_type_id = d.part_type_id AND t.aircraft_type_id = d.aircraft_type_id"
+
+    sql = (
+        f"WITH keys (part_type_id, aircraft_type_id) AS (VALUES {key_values}), "
+        f"drift AS (SELECT k.part_type_id, k.aircraft_type_id, COALESCE(i.quantity, 0) AS recorded, "
+        f"(SELECT COUNT(*) FROM {part_table} p WHERE NOT p.is_used "
+        f"AND p.type_id = k.part_type_id AND p.aircraft_type_id = k.aircraft_type_id) AS actual "
+        f"FROM keys k LEFT JOIN {stock_totals_sql(where)} i "
+        f"ON i.part_type_id = k.part_type_id AND i.aircraft_type_id = k.aircraft_type_id), "
+        f"changed AS (SELECT * FROM drift WHERE recorded <> actual), "
+        f"compacted AS (UPDATE {movement_table} t SET is_compacted = TRUE FROM changed d "
+        f"WHERE NOT t.is_compacted AND {match}), "
+        f"snapshots AS (UPDATE {inventory_table} t SET quantity = d.actual, updated_at = %s FROM changed d "
+        f"WHERE {match}), "
+        f"ledger AS (INSERT INTO {movement_table} "
+        f"(part_type_id, aircraft_type_id, delta, reason, actor_id, assembly_id, part_id, is_compacted, created_at) "
+        f"SELECT part_type_id, aircraft_type_id, actual - recorded, %s, NULL, NULL, NULL, TRUE, %s FROM changed) "
+        f"SELECT part_type_id, aircraft_type_id, recorded, actual FROM changed "
+        f"ORDER BY part_type_id, aircraft_type_id"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*key_params, *where_params, now, InventoryMovement.Reasons.ADJUSTED, now])
+        return [Drift(*row) for row in cursor.fetchall()]
+
+
+def reconcile_inventory(repair=False, incremental=False, since=None, chunk_size=500):
+    """
+    Envanter mutabakatını çalıştırır ve kaydeder.
+    incremental=True ise son başarılı çalışmadan (veya since tarihinden) bu yana değişen anahtarlar kontrol edilir.
+    Returns:
+        tuple: (InventoryReconciliation kaydı, fark listesi; repair=True ise uygulanan düzeltmeler)
+    """
+    run = InventoryReconciliation(started_at=timezone.now(), is_incremental=incremental or since is not None)
+
+    keys = None
+    if run.is_incremental:
+        if since is None:
+            last_run = InventoryReconciliation.objects.filter(finished_at__isnull=False).first()
+            since = last_run.started_at - INCREMENTAL_OVERLAP if last_run else None
+        if since is not None:
+            keys = get_changed_keys(since)
+
+    drifts = find_drift(keys)
+    if repair and drifts:
+        # Rapor, düzeltme anında yeniden hesaplanan ve uygulanan farkları gösterir
+        # Stok durumları sadece düzeltilen anahtarlar için commit sonrası yeniden değerlendirilir
+        drifts = repair_drift(drifts, chunk_size=chunk_size)
+
+    run.drift_count = len(drifts)
+    run.is_repaired = repair
+    run.finished_at = timezone.now()
+    run.save()
+    return run, drifts
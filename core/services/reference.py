@@ -0,0 +1,102 @@
+# core/services/reference.py
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete
+
+from .versions import get_versions, REFERENCE
+
+# aircrafts, part_types: {id: nesne} (model sıralamasıyla)
+# requirements: {uçak tipi id: [AircraftRequirement]} (part_type yüklenmiş)
+# teams: [Team]
+ReferenceData = namedtuple('ReferenceData', ['aircrafts', 'part_types', 'requirements', 'teams'])
+
+
+def check_interval():
+    # Paylaşılan sürüm anahtarı en fazla bu aralıkla (saniye) okunur, istek başına önbellek sorgusu yapılmaz
+    return getattr(settings, 'REFERENCE_CACHE_CHECK_INTERVAL', 1.0)
+
+
+def max_age():
+    # Geri alınan (rollback) bir transaction içinde yüklenen veri en fazla bu süre (saniye) kullanılır
+    return getattr(settings, 'REFERENCE_CACHE_MAX_AGE', 300)
+
+
+class ReferenceCache:
+    """
+    Uçak, parça tipi, uçak gereksinimi ve takım tablolarının süreç içi önbelleği.
+
+    Veriler süreç belleğinde tutulur, kararlı durumda okuma sorgu çalıştırmaz. Bu tablolara yazıldığında
+    sinyaller yerel önbelleği hemen boşaltır ve commit sonrası paylaşılan sürümü (versions.REFERENCE) değiştirir;
+    diğer gunicorn süreçleri sürümü en fazla check_interval aralıkla kontrol ederek veriyi yeniden yükler.
+    Önbellekteki model nesneleri süreç genelinde paylaşılır, değiştirilmemelidir.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._data = None
+        self._version = None
+        self._loaded_at = 0
+        self._checked_at = 0
+
+    def get(self):
+        now = time.monotonic()
+        if self._data is not None and now - self._checked_at < check_interval():
+            return self._data
+
+        # Sürüm yüklemeden önce okunur, yükleme sırasında gelen değişiklik bir sonraki kontrolde yakalanır
+        version = get_versions(REFERENCE)
+        if self._data is None or version != self._version or now - self._loaded_at >= max_age():
+            self._data = load_reference_data()
+            self._version = version
+            self._loaded_at = now
+        self._checked_at = now
+        return self._data
+
+
+def load_reference_data():
+    # Döngüsel import olmaması için modeller burada yüklenir
+    from accounts.models import Team
+    from ..models.aircraft import Aircraft, AircraftRequirement
+    from ..models.part import PartType
+
+    requirements = {}
+    for requirement in AircraftRequirement.objects.select_related('part_type').order_by('aircraft_type_id', 'part_type_id'):
+        requirements.setdefault(requirement.aircraft_type_id, []).append(requirement)
+
+    return ReferenceData(
+        aircrafts={aircraft.id: aircraft for aircraft in Aircraft.objects.all()},
+        part_types={part_type.id: part_type for part_type in PartType.objects.all()},
+        requirements=requirements,
+        teams=list(Team.objects.all()),
+    )
+
+
+reference_cache = ReferenceCache()
+
+
+def get_reference_data():
+    return reference_cache.get()
+
+
+def get_requirements(aircraft_type_id):
+    """Uçak tipinin gereksinim listesi (parça tipi sırasıyla)"""
+    return get_reference_data().requirements.get(aircraft_type_id, [])
+
+
+def invalidate_on_change(sender, signals=(post_save, post_delete)):
+    # Yazan süreçte yerel önbellek hemen, commit sonrası tekrar boşaltılır; commit öncesi yüklenen veri tutulmaz
+    def receiver(**kwargs):
+        reference_cache.clear()
+        transaction.on_commit(reference_cache.clear)
+    for signal in signals:
+        signal.connect(receiver, sender=sender, weak=False)
+
+
+for reference in ('core.Aircraft', 'core.PartType', 'core.AircraftRequirement', 'accounts.Team'):
+    invalidate_on_change(reference)
+invalidate_on_change('accounts.Team_permissions', signals=(m2m_changed,))
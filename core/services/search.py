@@ -0,0 +1,108 @@
+# core/services/search.py
+import re
+from collections import namedtuple
+from decimal import Decimal
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import DecimalField, F, Q, Value
+from django.db.models.functions import Round
+
+# Tam metin araması dil bağımsız 'simple' yapılandırması ile yapılır, kelimeler sadece küçük harfe çevrilir
+SEARCH_CONFIG = 'simple'
+
+# Sıralama sütunu verilmeden arama yapıldığında sonuçlar bu alana göre sıralanır
+RANK_FIELD = 'search_rank'
+# Puan bu kadar ondalık basamağa yuvarlanıp numeric olarak döner. Imleçte (puan, id) eşitlikle karşılaştırıldığı için
+# float puanın JSON gidiş dönüşünde değişmesi sayfa sınırında satır atlanmasına veya tekrarına yol açar
+RANK_PRECISION = 6
+
+# fields: modelin kendi metin alanları, related: {ilişki adı: ilişkili modeldeki metin alanı}
+SearchSpec = namedtuple('SearchSpec', ['fields', 'related'])
+
+PART_SEARCH = SearchSpec(fields=['name'], related={'type': 'name', 'aircraft_type': 'name'})
+ASSEMBLY_SEARCH = SearchSpec(fields=['notes'], related={'aircraft_type': 'name', 'assembled_by': 'username'})
+INVENTORY_SEARCH = SearchSpec(fields=[], related={'part_type': 'name', 'aircraft_type': 'name'})
+USER_SEARCH = SearchSpec(fields=['username', 'first_name', 'last_name'], related={'team': 'name'})
+
+
+def search_vector(*fields):
+    """
+    Model indekslerinde (GinIndex) ve sorgularda aynı ifadenin kullanılması için tek tanım.
+    İfade farklı olursa Postgres indeksi kullanamaz.
+    """
+    return SearchVector(*fields, config=SEARCH_CONFIG)
+
+
+def rank_field():
+    return DecimalField(max_digits=RANK_PRECISION + 4, decimal_places=RANK_PRECISION)
+
+
+def rank_value(expression=None):
+    # Sıralama puanı her zaman numeric döner, imleç değeri Decimal olarak tam karşılaştırılır.
+    # İfade verilmezse (eşleşme puanı hesaplanamayan aramalar) puan 0 olur
+    if expression is None:
+        return Value(Decimal(0), output_field=rank_field())
+    return Round(expression, RANK_PRECISION, output_field=rank_field())
+
+
+def build_search_query(search):
+    """
+    Arama metnini önek eşleşmeli tsquery'ye çevirir: 'kanat tb' -> 'kanat:* & tb:*'
+    Kelimeler başından eşleşir, kelime ortasındaki metin (icontains'teki gibi 'nat' -> 'kanat') bulunmaz.
+    Kullanıcı girdisindeki tsquery operatörleri atılır.
+    Returns:
+        SearchQuery veya aranacak kelime yoksa None
+    """
+    terms = re.findall(r'\w+', search)
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_queryset(queryset, search, spec):
+    """
+    Queryset'i arama metnine göre filtreler ve RANK_FIELD alanını ekler.
+
+    Postgres'te modelin kendi alanları GIN indeksli tsvector ifadesi ile, ilişkili alanlar ise küçük
+    tablolarda ayrı sorgu ile aranır. Büyük tabloda birleştirme (JOIN) üzerinden LIKE taraması yapılmaz.
+    Diğer veritabanlarında (yerel SQLite) icontains ile aranır ve sıralama puanı 0 olur.
+    Sıralama puanı RANK_PRECISION basamağa yuvarlanır, imleçli sayfalamada sayfa sınırı kaymaz.
+    """
+    if not search:
+        return queryset
+
+    if connection.vendor != 'postgresql':
+        condition = Q()
+        for field in spec.fields:
+            condition |= Q(**{f'{field}__icontains': search})
+        for relation, field in spec.related.items():
+            condition |= Q(**{f'{relation}__{field}__icontains': search})
+        return queryset.filter(condition).annotate(**{RANK_FIELD: rank_value()})
+
+    query = build_search_query(search)
+    if query is None:
+        return queryset.annotate(**{RANK_FIELD: rank_value()})
+
+    condition = Q()
+    if spec.fields:
+        queryset = queryset.annotate(search_document=search_vector(*spec.fields))
+        condition |= Q(search_document=query)
+
+    # İlişkili tablolardaki eşleşmeler önce id listesine çevrilir; alt sorgu ile OR'lanan koşul
+    # büyük tabloda indeks kullanımını engeller, sabit id listesi ise yabancı anahtar indeksiyle birleşir
+    for relation, field in spec.related.items():
+        related_model = queryset.model._meta.get_field(relation).related_model
+        matches = list(
+            related_model.objects.annotate(
+                search_document=search_vector(field)
+            ).filter(search_document=query).values_list('pk', flat=True)
+        )
+        if matches:
+            condition |= Q(**{f'{relation}__in': matches})
+
+    # Hiçbir alanda eşleşme olamıyorsa boş sonuç döner
+    queryset = queryset.filter(condition) if condition else queryset.none()
+    if spec.fields:
+        return queryset.annotate(**{RANK_FIELD: rank_value(SearchRank(F('search_document'), query))})
+    return queryset.annotate(**{RANK_FIELD: rank_value()})
@@ -0,0 +1,58 @@
+# core/services/shortage.py
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ..models.aircraft import AircraftRequirement
+from ..models.inventory import Inventory
+
+
+def get_shortages(aircraft_type_id=None, part_type_id=None):
+    """
+    Gereksinimleri envanter sayaçlarıyla tek sorguda birleştirip eksik olan satırları döndürür.
+    Sorgu Part tablosunu taramaz, maliyeti gereksinim sayısıyla orantılıdır.
+    aircraft_type_id / part_type_id verilirse sadece bu uçak tipi / parça tipi satırları döner.
+    """
+    available = Inventory.objects.with_current_quantity().filter(
+        part_type_id=OuterRef('part_type_id'),
+        aircraft_type_id=OuterRef('aircraft_type_id')
+    ).values('current_quantity')[:1]
+
+    queryset = (
+        AircraftRequirement.objects
+        .annotate(available=Coalesce(Subquery(available), 0))
+        .annotate(missing=F('quantity') - F('available'))
+        .filter(missing__gt=0)
+    )
+    if aircraft_type_id is not None:
+        queryset = queryset.filter(aircraft_type_id=aircraft_type_id)
+    if part_type_id is not None:
+        queryset = queryset.filter(part_type_id=part_type_id)
+
+    return list(
+        queryset
+        .order_by('aircraft_type__name', 'part_type__name')
+        .values(
+            'aircraft_type_id',
+            'aircraft_type__name',
+            'part_type_id',
+            'part_type__name',
+            'quantity',
+            'available',
+            'missing'
+        )
+    )
+
+
+def get_missing_parts():
+    """
+    Eksik parçaları uçak adına göre gruplar - HTML envanter sayfası için kullanılır
+    Returns:
+        dict: {uçak adı: [{'part': parça tipi adı, 'quantity': eksik adet}]}
+    """
+    result = {}
+    for row in get_shortages():
+        result.setdefault(row['aircraft_type__name'], []).append({
+            'part': row['part_type__name'],
+            'quantity': row['missing']
+        })
+    return result
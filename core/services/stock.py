@@ -0,0 +1,25 @@
+# core/services/stock.py
+from django.db import connection
+
+from ..models.inventory import Inventory, InventoryMovement
+
+
+def stock_totals_sql(where=''):
+    """
+    (part_type_id, aircraft_type_id, quantity) satırlarını döndüren türetilmiş tablo SQL'ini üretir.
+    Güncel miktar = Inventory anlık görüntüsü + bekleyen hareketler.
+    Ham SQL kullanan servisler (mutabakat, üretilebilirlik) bu tanımı ORM tarafındaki
+    Inventory.objects.with_current_quantity() ile aynı tutmak için kullanır.
+    where: birleşik kaynaklara uygulanacak koşul, parametreleri çağıran verir
+    """
+    quote = connection.ops.quote_name
+    inventory_table = quote(Inventory._meta.db_table)
+    movement_table = quote(InventoryMovement._meta.db_table)
+
+    return (
+        f"(SELECT part_type_id, aircraft_type_id, SUM(quantity) AS quantity FROM ("
+        f"SELECT part_type_id, aircraft_type_id, quantity FROM {inventory_table} "
+        f"UNION ALL SELECT part_type_id, aircraft_type_id, delta FROM {movement_table} WHERE NOT is_compacted"
+        f") stock {'WHERE ' + where if where else ''} "
+        f"GROUP BY part_type_id, aircraft_type_id)"
+    )
@@ -0,0 +1,133 @@
+# core/services/versions.py
+import random
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save, post_delete
+
+from ..models.version import TableVersion
+from .post_commit import execute_ctes, post_commit_task, run_on_commit
+
+# Tablo sürümleri, önbelleğe alınan sonuçların (kayıt sayıları, ETag) anahtarına eklenir.
+# Yazma işleminden sonra sürüm değiştiği için eski sonuçlar silinmeden geçersiz olur.
+# Sürümler TableVersion tablosundaki sayaçlardır, tüm gunicorn süreçleri aynı değeri okur.
+
+PART = 'part'
+ASSEMBLY = 'assembly'
+INVENTORY = 'inventory'
+USER = 'user'
+# Uçak, parça tipi, uçak gereksinimi ve takım gibi az değişen referans tabloları
+REFERENCE = 'reference'
+
+# Bu tablolar için tek bir tablo sayacı yerine parça tipi kapsamı başına sayaç tutulur, bir takımın listesi
+# başka parça tiplerine yazıldığında geçersiz olmaz. Tablo sürümü kapsam sayaçlarının toplamıdır;
+# yazmalar tablo genelindeki tek bir satırı artırmadığı için farklı parça tiplerine yazanlar birbirini beklemez
+SCOPED_TABLES = {PART, INVENTORY}
+ALL_SCOPES = '*'
+
+# Commit sonrası sürüm artırma görevi, değerler sürüm isimleridir
+TABLE_VERSIONS = 'table_versions'
+
+# Yeni sayaç rastgele bir değerden başlar, veritabanı geri yüklendiğinde eski sürümler tekrar üretilmez
+INITIAL_VERSION_BITS = 40
+
+
+def get_versions(*names):
+    """
+    Verilen sürümlerin güncel değerlerini tek sorguda okuyup tek bir metin olarak döndürür.
+    Kapsamlı tablonun adı ('part') verilirse tüm kapsam sayaçlarının toplamı kullanılır.
+    Sayacı henüz olmayan sürüm 0 kabul edilir, okuma yazma yapmaz.
+    """
+    condition = Q(name__in=[name for name in names if name not in SCOPED_TABLES])
+    for name in names:
+        if name in SCOPED_TABLES:
+            condition |= Q(name__startswith=f'{name}:')
+    counters = dict(TableVersion.objects.filter(condition).values_list('name', 'version'))
+
+    versions = []
+    for name in names:
+        if name in SCOPED_TABLES:
+            versions.append(sum(version for key, version in counters.items() if key.startswith(f'{name}:')))
+        else:
+            versions.append(counters.get(name, 0))
+    return ':'.join(str(version) for version in versions)
+
+
+def increment_versions(names):
+    """Sayaçları tek ifadede bir artırır, olmayan sayaç oluşturulur."""
+    names = sorted(set(names))
+    if names:
+        execute_ctes(*version_increment_ctes(names))
+
+
+@post_commit_task(TABLE_VERSIONS)
+def version_increment_ctes(names):
+    # İsimler sıralı yazılır, eşzamanlı iki yazma satır kilitlerini aynı sırada alır
+    names = sorted(names)
+    table = connection.ops.quote_name(TableVersion._meta.db_table)
+    params = []
+    for name in names:
+        params.extend([name, random.getrandbits(INITIAL_VERSION_BITS)])
+    values = ', '.join(['(%s, %s)'] * len(names))
+    sql = (
+        f"INSERT INTO {table} (name, version) VALUES {values} "
+        f"ON CONFLICT (name) DO UPDATE SET version = {table}.version + 1"
+    )
+    return [('version_increments', sql)], params
+
+
+def bump_versions(*names):
+    """
+    Sürümleri transaction commit edildikten sonra kendi kısa transaction'ında artırır.
+    Commit'ten önce değiştirmek, henüz görünmeyen veriyle hesaplanan sonucun yeni sürümle önbelleğe girmesine yol açar;
+    sayaç satırları da yazan transaction boyunca kilitli kalır.
+    Artırma commit sonrası diğer işlerle (stok uyarısı, üretilebilirlik) aynı ifadede çalışır.
+    """
+    if names:
+        run_on_commit(**{TABLE_VERSIONS: names})
+
+
+def scoped_versions(name, part_type_ids=None):
+    """
+    Değişiklikte artırılacak sürüm isimleri: kapsamlı tablolarda etkilenen parça tipi kapsamları,
+    diğer tablolarda tablo sürümü.
+    part_type_ids verilmezse (tekil kayıt sinyalleri) tüm kapsamlar geçersiz olur.
+    """
+    if name not in SCOPED_TABLES:
+        return [name]
+    if part_type_ids is None:
+        return [f'{name}:{ALL_SCOPES}']
+    return [f'{name}:part_type:{part_type_id}' for part_type_id in sorted(set(part_type_ids))]
+
+
+def version_names(tables, scope=None):
+    """
+    Okuma için sürüm isimleri. scope ('part_type:<id>') verilirse kapsamlı tablolarda tablo sürümü yerine
+    kapsam sürümü ve tüm kapsamları geçersiz kılan sürüm kullanılır.
+    """
+    names = []
+    for name in tables:
+        if scope is None or name not in SCOPED_TABLES:
+            names.append(name)
+        else:
+            names.extend([f'{name}:{scope}', f'{name}:{ALL_SCOPES}'])
+    return names
+
+
+def bump_on_change(name, sender, signals=(post_save, post_delete)):
+    # Tekil kayıt değişiklikleri sinyallerle yakalanır, toplu işlemler bump_versions'ı kendisi çağırır
+    def receiver(**kwargs):
+        bump_versions(*scoped_versions(name))
+    for signal in signals:
+        signal.connect(receiver, sender=sender, weak=False)
+
+
+bump_on_change(PART, 'core.Part')
+bump_on_change(ASSEMBLY, 'core.Assembly')
+bump_on_change(ASSEMBLY, 'core.Assembly_parts', signals=(m2m_changed,))
+bump_on_change(INVENTORY, 'core.Inventory')
+bump_on_change(USER, settings.AUTH_USER_MODEL)
+for reference in ('core.Aircraft', 'core.PartType', 'core.AircraftRequirement', 'accounts.Team'):
+    bump_on_change(REFERENCE, reference)
+bump_on_change(REFERENCE, 'accounts.Team_permissions', signals=(m2m_changed,))
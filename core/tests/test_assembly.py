@@ -1,12 +1,26 @@
 from django.urls import reverse
 from rest_framework.test import APITestCase
+from django.test import TransactionTestCase
+from django.db import connection, transaction
+import threading
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from ..models.assembly import Assembly
 from ..models.aircraft import Aircraft
 from ..models.part import Part,PartType
+from ..models.inventory import Inventory
+from ..services.assembly import consume_parts, cancel_assembly, allocate_assembly, build_assemblies, get_assembly_summaries, PartsUnavailableError
+from django.test.utils import CaptureQueriesContext
+from ..services.part import produce_parts
 from accounts.models import TeamPermission
 from accounts.models import Team
+from accounts.serializers import UserSerializer
+from accounts.views import get_team_permissions
+from rest_framework.renderers import JSONRenderer
+from ..serializers.assembly import AssemblyCreateSerializer, AssemblySummarySerializer
+from ..serializers.projections import ASSEMBLY_SUMMARY_PROJECTION, USER_PROJECTION
+from ..services.reference import get_reference_data, get_requirements
+from ..services.versions import bump_versions, REFERENCE
 
 class AssemblyTests(APITestCase):
     """
@@ -18,6 +32,13 @@ class AssemblyTests(APITestCase):
     - Montaj silme
     - İzin kontrolleri
     - Validasyon kuralları
+    - Liste projeksiyonlarının serializer çıktısıyla aynılığı
+    - FIFO sıralı, limitli kullanılabilir parça listesi
+    - Parçaların sunucu tarafında otomatik ayrılması
+    - Toplu montaj
+    - Montaj parçalarının toplu çözülmesi ve validasyon sorgu sayısı
+    - Referans verisi önbelleği ve sürüm ile geçersiz kılınması
+    - Üretim planı (MRP) servisi
     """
 
     def setUp(self):
@@ -187,6 +208,38 @@ class AssemblyTests(APITestCase):
             part.refresh_from_db()
             self.assertTrue(part.is_used)
 
+    def test_create_assembly_consumes_inventory(self):
+        """
+        Montaj oluşturulduğunda envanterin parça tipi başına azaldığını kontrol eder.
+        URL: /assembly/ (POST)
+        """
+        url = reverse('assembly')
+        data = {
+            'aircraft_type': self.aircraft.id,
+            'parts': [part.id for part in self.parts],
+            'notes': 'Test montajı'
+        }
+
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        for part_type in self.part_types.values():
+            inventory = Inventory.objects.get(part_type=part_type, aircraft_type=self.aircraft)
+            self.assertEqual(inventory.quantity, 0)
+
+    def test_consume_parts(self):
+        """
+        Parça kullanımının kit büyüklüğünden bağımsız sorgu sayısı ve çift kullanım kontrolü.
+        Sorgular: parça UPDATE, hareket defteri ile birlikte envanter sayacı, commit sonrası işler.
+        """
+        with self.assertNumQueries(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                consume_parts(self.parts[1:])
+
+        # Daha önce kullanılmış parça içeren kit reddedilir
+        with self.assertRaises(PartsUnavailableError):
+            consume_parts(self.parts)
+
     def test_list_assemblies(self):
         """
         Montaj listesi görüntüleme testi.
@@ -210,6 +263,16 @@ class AssemblyTests(APITestCase):
         self.assertEqual(response_with_datatable.status_code, status.HTTP_200_OK)
         self.assertEqual(response_with_html.status_code, status.HTTP_200_OK)
 
+        # Liste parçaları değil özet bilgileri döndürür
+        row = response_with_datatable.data['data'][0]
+        self.assertNotIn('parts', row)
+        self.assertEqual(row['part_count'], len(self.parts))
+        self.assertEqual(
+            {part_type['name']: part_type['count'] for part_type in row['part_types']},
+            {'Gövde': 2, 'Kanat': 2, 'Aviyonik': 1, 'Kuyruk': 1}
+        )
+        self.assertEqual(row['teams'], [{'name': 'Montaj Takımı', 'count': len(self.parts)}])
+
     
     def test_detail_assemblies(self):
         """
@@ -254,6 +317,33 @@ class AssemblyTests(APITestCase):
             part.refresh_from_db()
             self.assertFalse(part.is_used)
 
+    def test_cancel_assembly_restores_inventory(self):
+        """
+        Montaj iptalinde parçaların ve envanterin geri yüklendiğini kontrol eder.
+        URL: /assembly/{id}/ (DELETE)
+        """
+        data = {
+            'aircraft_type': self.aircraft.id,
+            'parts': [part.id for part in self.parts],
+            'notes': 'Test montajı'
+        }
+        response = self.client.post(reverse('assembly'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        assembly = Assembly.objects.get()
+        # Parça okuma ve UPDATE, hareket defteri ile birlikte envanter sayacı, montaj silme (2), commit sonrası işler
+        with self.assertNumQueries(6):
+            with self.captureOnCommitCallbacks(execute=True):
+                cancel_assembly(assembly)
+
+        self.assertFalse(Part.objects.filter(is_used=True).exists())
+        for part_type in self.part_types.values():
+            inventory = Inventory.objects.get(part_type=part_type, aircraft_type=self.aircraft)
+            self.assertEqual(
+                inventory.quantity,
+                Part.objects.filter(type=part_type, aircraft_type=self.aircraft, is_used=False).count()
+            )
+
     def test_validation_rules(self):
         """
         Montaj validasyon kuralları testi.
@@ -298,4 +388,319 @@ class AssemblyTests(APITestCase):
         response = self.client.post(url, data, format='json')
 
 
-        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_list_projections_match_drf(self):
+        """
+        Montaj ve kullanıcı listesi projeksiyonları DRF serializer'ları ile bayt bayt aynı çıktıyı üretir.
+        """
+        data = {
+            'aircraft_type': self.aircraft.id,
+            'parts': [part.id for part in self.parts],
+            'notes': 'Test montajı'
+        }
+        response = self.client.post(reverse('assembly'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        Assembly.objects.create(aircraft_type=self.aircraft, assembled_by=self.system_user, notes='')
+        renderer = JSONRenderer()
+
+        queryset = Assembly.objects.order_by('id')
+        assemblies = list(queryset)
+        rows = list(ASSEMBLY_SUMMARY_PROJECTION.values(queryset))
+        summaries = get_assembly_summaries([assembly.id for assembly in assemblies])
+        for assembly, row in zip(assemblies, rows):
+            for key, value in summaries[assembly.id].items():
+                setattr(assembly, key, value)
+            row.update(summaries[assembly.id])
+        self.assertEqual(
+            renderer.render(ASSEMBLY_SUMMARY_PROJECTION.serialize(rows)),
+            renderer.render(AssemblySummarySerializer(assemblies, many=True).data)
+        )
+
+        queryset = get_user_model().objects.order_by('id')
+        rows = list(USER_PROJECTION.values(queryset))
+        permissions = get_team_permissions({row['team_id'] for row in rows if row['team_id']})
+        for row in rows:
+            row['permissions'] = sorted(permissions.get(row['team_id'], ()))
+        expected = UserSerializer(queryset, many=True).data
+        for user in expected:
+            user['permissions'] = sorted(user['permissions'])
+        self.assertEqual(renderer.render(USER_PROJECTION.serialize(rows)), renderer.render(expected))
+
+    def test_available_parts_fifo(self):
+        """
+        limit verildiğinde en eski kullanılabilir parçalar imleç ve toplam adet başlığı ile döner.
+        URL: /aircraft/<id>/part_type/<id>/available_parts/ (GET)
+        """
+        wing = self.part_types['kanat']
+        produce_parts(self.user, [
+            {'name': f"KNT-{i}", 'type_id': wing.id, 'aircraft_type_id': self.aircraft.id}
+            for i in range(2, 7)
+        ])
+        consume_parts([Part.objects.get(name='KNT-1')])
+        url = reverse('available_parts', args=[self.aircraft.id, wing.id])
+
+        # Limit verilmezse tüm kullanılabilir parçalar döner
+        self.assertEqual(len(self.client.get(url).data), 6)
+
+        response = self.client.get(url, {'limit': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([part['name'] for part in response.data], ['KNT-0', 'KNT-2', 'KNT-3', 'KNT-4'])
+        # Toplam adet envanter sayacından okunur
+        self.assertEqual(response['X-Total-Count'], '6')
+
+        response = self.client.get(url, {'limit': 4, 'cursor': response['X-Next-Cursor']})
+        self.assertEqual([part['name'] for part in response.data], ['KNT-5', 'KNT-6'])
+        self.assertNotIn('X-Next-Cursor', response)
+
+        self.assertEqual(self.client.get(url, {'limit': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'limit': 2, 'cursor': 'bozuk'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_allocate_assembly(self):
+        """
+        Parçalar gereksinimlere göre en eskiden başlayarak ayrılır, stok yetmezse değişiklik yapılmaz.
+        URL: /assembly/allocate/ (POST)
+        """
+        url = reverse('assembly_allocate')
+        response = self.client.post(url, {'aircraft_type': self.aircraft.id, 'notes': 'Otomatik'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(sorted(part['id'] for part in response.data['parts']), sorted(part.id for part in self.parts))
+        self.assertFalse(Part.objects.filter(is_used=False).exists())
+        self.assertEqual(
+            Inventory.objects.with_current_quantity().get(part_type=self.part_types['kanat']).current_quantity, 0
+        )
+
+        # Sadece bir kanat üretilir, ikinci montaj için stok yetmez
+        produce_parts(self.user, [{'name': 'KNT-2', 'type_id': self.part_types['kanat'].id, 'aircraft_type_id': self.aircraft.id}])
+        response = self.client.post(url, {'aircraft_type': self.aircraft.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        missing = {item['part_type']: (item['required'], item['allocated']) for item in response.data['missing']}
+        self.assertEqual(missing, {'Gövde': (2, 0), 'Kanat': (2, 1), 'Aviyonik': (1, 0), 'Kuyruk': (1, 0)})
+        self.assertFalse(Part.objects.filter(is_used=True, name='KNT-2').exists())
+        self.assertEqual(Assembly.objects.count(), 1)
+
+    def test_batch_assembly_skips_zero_quantity_requirements(self):
+        """
+        Adedi 0 olan gereksinim montajı engellemez ve o parça tipinden parça ayrılmaz.
+        URL: /assembly/batch/ (POST)
+        """
+        optional = PartType.objects.create(name="Opsiyonel")
+        self.aircraft.requirements.create(part_type=optional, quantity=0)
+        produce_parts(self.user, [
+            {'name': 'OPS-1', 'type_id': optional.id, 'aircraft_type_id': self.aircraft.id}
+        ])
+
+        response = self.client.post(reverse('assembly_batch'), {'aircraft_type': self.aircraft.id, 'count': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['built'], 1)
+        self.assertEqual(response.data['missing'], [])
+        self.assertFalse(Part.objects.get(name='OPS-1').is_used)
+
+    def test_allocate_requires_assembly_team(self):
+        """
+        Montaj yetkisi olsa da montaj takımında olmayan kullanıcı otomatik ve toplu montaj yapamaz.
+        URL: /assembly/allocate/, /assembly/batch/ (POST)
+        """
+        wing_team = Team.objects.create(name="Kanat Takımı", part_type=self.part_types['kanat'])
+        wing_team.permissions.add(self.permissions['manage_assembly'])
+        self.user.team = wing_team
+        self.user.save()
+
+        response = self.client.post(reverse('assembly_allocate'), {'aircraft_type': self.aircraft.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post(reverse('assembly_batch'), {'aircraft_type': self.aircraft.id, 'count': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Assembly.objects.exists())
+        self.assertFalse(Part.objects.filter(is_used=True).exists())
+
+
+    def test_create_requires_assembly_team(self):
+        """
+        Montaj yetkisi olsa da montaj takımında olmayan kullanıcı parça seçerek montaj yapamaz.
+        URL: /assembly/ (POST)
+        """
+        wing_team = Team.objects.create(name="Kanat Takımı", part_type=self.part_types['kanat'])
+        wing_team.permissions.add(self.permissions['manage_assembly'])
+        self.user.team = wing_team
+        self.user.save()
+
+        data = {'aircraft_type': self.aircraft.id, 'parts': [part.id for part in self.parts]}
+        response = self.client.post(reverse('assembly'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Assembly.objects.exists())
+        self.assertFalse(Part.objects.filter(is_used=True).exists())
+
+    def test_batch_assembly(self):
+        """
+        Birden fazla montaj tek istekte oluşturulur, stok yetmezse tamamlanabilen kadar montaj yapılır.
+        Sorgu sayısı montaj sayısından bağımsızdır.
+        URL: /assembly/batch/ (POST)
+        """
+        def produce(counts):
+            produce_parts(self.user, [
+                {'name': f"{key}-{i}", 'type_id': self.part_types[key].id, 'aircraft_type_id': self.aircraft.id}
+                for key, count in counts.items() for i in range(count)
+            ])
+
+        # Kuyruk dışında 3 montajlık stok, kuyruk 2 montajlık
+        produce({'gövde': 4, 'kanat': 4, 'aviyonik': 2, 'kuyruk': 1})
+
+        response = self.client.post(reverse('assembly_batch'), {'aircraft_type': self.aircraft.id, 'count': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['built'], 2)
+        self.assertEqual(response.data['missing'], [{
+            'part_type_id': self.part_types['kuyruk'].id, 'part_type': 'Kuyruk', 'required': 3, 'allocated': 2
+        }])
+
+        assemblies = Assembly.objects.filter(id__in=response.data['assemblies'])
+        for assembly in assemblies:
+            self.assertEqual(assembly.parts.count(), 6)
+        self.assertEqual(Part.objects.filter(is_used=False).count(), 5)
+        quantities = dict(Inventory.objects.with_current_quantity().values_list('part_type__name', 'current_quantity'))
+        self.assertEqual(quantities, {'Gövde': 2, 'Kanat': 2, 'Aviyonik': 1, 'Kuyruk': 0})
+
+        # Hiç montaj yapılamıyorsa 409 döner
+        response = self.client.post(reverse('assembly_batch'), {'aircraft_type': self.aircraft.id, 'count': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['built'], 0)
+
+        def count_queries(count):
+            produce({key: requirement.quantity * count for key, requirement in self.requirements.items()})
+            with CaptureQueriesContext(connection) as queries:
+                assemblies, missing = build_assemblies(self.aircraft, self.user, count)
+            self.assertEqual((len(assemblies), missing), (count, []))
+            return len(queries)
+
+        self.assertEqual(count_queries(2), count_queries(10))
+
+    def test_create_serializer_resolves_parts_in_bulk(self):
+        """
+        Parça id'leri tek sorguda çözülür, uçak tipi ve gereksinimler referans önbelleğinden okunduğu için
+        validasyon kit büyüklüğünden bağımsız olarak tek sorgu çalıştırır.
+        Bulunamayan, kullanılmış ve tekrarlanan id'ler tek hatada birlikte raporlanır.
+        """
+        user = get_user_model().objects.select_related('team').get(pk=self.user.pk)
+        request = type('Request', (), {'user': user})()
+
+        data = {'aircraft_type': self.aircraft.id, 'parts': [part.id for part in self.parts], 'notes': ''}
+        serializer = AssemblyCreateSerializer(data=data, context={'request': request})
+        get_reference_data()
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['parts'], self.parts)
+
+        consume_parts(self.parts[:1])
+        data['parts'] = [part.id for part in self.parts] + [self.parts[1].id, 999999]
+        serializer = AssemblyCreateSerializer(data=data, context={'request': request})
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['parts'], [
+            'Bulunamayan kayıtlar: 999999.',
+            f'Kullanılamayan kayıtlar: {self.parts[0].id}.',
+            f'Birden fazla seçilen kayıtlar: {self.parts[1].id}.',
+        ])
+
+    def test_reference_cache(self):
+        """
+        Referans verisi kararlı durumda sorgu çalıştırmadan okunur. Yerel değişiklik önbelleği hemen boşaltır,
+        başka bir süreçteki değişiklik paylaşılan sürüm üzerinden kontrol aralığı sonunda yakalanır.
+        """
+        url = reverse('aircraft_requirements', args=[self.aircraft.id])
+        get_reference_data()
+        with self.assertNumQueries(0):
+            reference = get_reference_data()
+            requirements = get_requirements(self.aircraft.id)
+        self.assertIn(self.aircraft.id, reference.aircrafts)
+        self.assertEqual(
+            {requirement.part_type_id: requirement.quantity for requirement in requirements},
+            {requirement.part_type_id: requirement.quantity for requirement in self.requirements.values()}
+        )
+
+        # Aynı süreçte yapılan değişiklik sinyal ile önbelleği boşaltır
+        requirement = self.requirements['kuyruk']
+        requirement.quantity = 3
+        with self.captureOnCommitCallbacks(execute=True):
+            requirement.save()
+        response = self.client.get(url, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        quantities = {item['part_type']['id']: item['quantity'] for item in response.data}
+        self.assertEqual(quantities[self.part_types['kuyruk'].id], 3)
+
+        # Başka süreçte yapılan değişiklik: yerel sinyal çalışmaz, sadece paylaşılan sürüm değişir
+        Aircraft.objects.filter(pk=self.aircraft.pk).update(name="Yeni Uçak")
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(REFERENCE)
+        self.assertEqual(get_reference_data().aircrafts[self.aircraft.id].name, "Test Uçağı")
+        with self.settings(REFERENCE_CACHE_CHECK_INTERVAL=0):
+            self.assertEqual(get_reference_data().aircrafts[self.aircraft.id].name, "Yeni Uçak")
+
+        response = self.client.get(reverse('aircraft_requirements', args=[999999]), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_production_plan(self):
+        """Hedef adetler için net ihtiyaç ve üretilebilir adet döner, aynı uçak tipinin hedefleri toplanır."""
+        url = reverse('production_plan')
+        data = {'targets': [{'aircraft_type': self.aircraft.id, 'count': 1}, {'aircraft_type': self.aircraft.id, 'count': 1}]}
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        aircraft = response.data['aircrafts'][0]
+        self.assertEqual((aircraft['target'], aircraft['max_buildable'], aircraft['shortfall']), (2, 1, 1))
+        net = {row['part_type_id']: row['net'] for row in response.data['part_types']}
+        self.assertEqual(net, {
+            part_type.id: requirement.quantity
+            for part_type, requirement in zip(self.part_types.values(), self.requirements.values())
+        })
+
+        response = self.client.post(url, {'targets': [{'aircraft_type': 999999, 'count': 1}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class AllocationConcurrencyTests(TransactionTestCase):
+    """
+    Otomatik parça ayırmanın eşzamanlı işlemlerle davranışı için test suite'i.
+
+    Test edilen temel işlevler:
+    - Başka işlemin kilitlediği parçaların beklenmeden atlanması
+    """
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_superuser(username='admin', email='admin@example.com', password='admin123')
+        self.aircraft = Aircraft.objects.create(name="Test Uçağı")
+        self.wing = PartType.objects.create(name="Kanat")
+        self.aircraft.requirements.create(part_type=self.wing, quantity=1)
+        self.parts = produce_parts(self.user, [
+            {'name': f"KNT-{i}", 'type_id': self.wing.id, 'aircraft_type_id': self.aircraft.id}
+            for i in range(2)
+        ])
+
+    def test_locked_parts_are_skipped(self):
+        """
+        En eski parça başka bir transaction'da kilitliyken montaj beklemeden sonraki parçayı alır.
+        """
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    Part.objects.select_for_update().get(pk=self.parts[0].pk)
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        try:
+            self.assertTrue(locked.wait(10))
+            with transaction.atomic():
+                # Kilit beklenirse test askıda kalmadan hata verir
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL lock_timeout = '2s'")
+                assembly = allocate_assembly(self.aircraft, self.user)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(list(assembly.parts.values_list('id', flat=True)), [self.parts[1].id])
+        self.assertFalse(Part.objects.get(pk=self.parts[0].pk).is_used)
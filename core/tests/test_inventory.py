@@ -0,0 +1,469 @@
+import threading
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from ..models.aircraft import Aircraft, AircraftBuildability
+from ..models.inventory import Inventory, InventoryAlert, InventoryMovement
+from ..serializers.inventory import InventorySerializer
+from ..serializers.projections import INVENTORY_PROJECTION
+from ..models.part import Part, PartType
+from ..services.inventory import adjust_inventory, apply_inventory_deltas, compact_inventory_movements, get_stock_at
+from ..services.shortage import get_missing_parts, get_shortages
+from ..services.reconciliation import find_drift, reconcile_inventory, repair_drift
+from ..services.planning import get_planning_matrices, plan_production
+from accounts.models import Team, TeamPermission
+
+
+class InventoryCounterTests(TestCase):
+    """
+    Envanter sayaçları için test suite'i.
+
+    Test edilen temel işlevler:
+    - Parça üretimi, kullanımı ve silinmesinde sayaç güncellemesi
+    - Tek sorguluk delta uygulaması
+    - Eksik parça hesaplaması
+    - Envanter mutabakatı
+    - Liste projeksiyonu
+    - Üretilebilir uçak sayacı
+    - Hareket defteri ve sıkıştırma
+    - Stok eşik uyarıları
+    - Üretim planı (MRP) hesabı
+    """
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username='uretici', password='testpass123')
+        self.aircraft = Aircraft.objects.create(name="Test Uçağı")
+        self.wing = PartType.objects.create(name="Kanat")
+        self.body = PartType.objects.create(name="Gövde")
+
+    def get_quantity(self, part_type):
+        return Inventory.objects.get(part_type=part_type, aircraft_type=self.aircraft).quantity
+
+    def create_part(self, part_type):
+        # Commit sonrası işler (stok uyarısı, üretilebilirlik, sürümler) de çalıştırılır
+        with self.captureOnCommitCallbacks(execute=True):
+            return Part.objects.create(
+                name=f"{part_type.name}-parça",
+                type=part_type,
+                aircraft_type=self.aircraft,
+                created_by=self.user
+            )
+
+    def test_part_lifecycle_updates_inventory(self):
+        """Üretim sayacı artırır, kullanım ve silme azaltır."""
+        first = self.create_part(self.wing)
+        second = self.create_part(self.wing)
+        self.assertEqual(self.get_quantity(self.wing), 2)
+
+        first.is_used = True
+        first.save()
+        self.assertEqual(self.get_quantity(self.wing), 1)
+
+        second.delete()
+        self.assertEqual(self.get_quantity(self.wing), 0)
+
+    def test_adjust_inventory_is_single_query(self):
+        """
+        Var olan veya olmayan sayaç için delta, hareket defteri kaydı ile birlikte tek sorguda uygulanır.
+        Stok uyarı kontrolü, üretilebilir uçak sayacı ve tablo sürümleri commit sonrası tek sorguda güncellenir.
+        """
+        self.aircraft.requirements.create(part_type=self.wing, quantity=1)
+        for delta in (5, -2):
+            with self.assertNumQueries(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    adjust_inventory(self.wing.id, self.aircraft.id, delta)
+
+        # Aynı transaction'daki yazmaların commit sonrası işleri tek sorguda birleşir
+        with self.assertNumQueries(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                adjust_inventory(self.wing.id, self.aircraft.id, 1)
+                adjust_inventory(self.body.id, self.aircraft.id, 1)
+
+        # Parça kaydı, sayaç ve commit sonrası işler
+        with self.assertNumQueries(3):
+            self.create_part(self.wing)
+        self.assertEqual(AircraftBuildability.objects.get(aircraft_type=self.aircraft).buildable_count, 5)
+        self.assertEqual(self.get_quantity(self.wing), 5)
+
+    def test_apply_inventory_deltas_groups(self):
+        """Birden fazla anahtar için artış ve azalışlar yön başına tek sorguda uygulanır."""
+        apply_inventory_deltas({
+            (self.wing.id, self.aircraft.id): 4,
+            (self.body.id, self.aircraft.id): 1,
+        })
+        # Artış ve azalış ifadeleri, commit sonrası işler
+        with self.assertNumQueries(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                apply_inventory_deltas({
+                    (self.wing.id, self.aircraft.id): -10,
+                    (self.body.id, self.aircraft.id): 2,
+                })
+
+        # Sayaç sıfırın altına düşmez
+        self.assertEqual(self.get_quantity(self.wing), 0)
+        self.assertEqual(self.get_quantity(self.body), 3)
+
+    def test_shortages_single_query(self):
+        """Eksik parçalar gereksinim sayısından bağımsız olarak tek sorguda hesaplanır."""
+        self.aircraft.requirements.create(part_type=self.wing, quantity=2)
+        self.aircraft.requirements.create(part_type=self.body, quantity=1)
+        self.create_part(self.wing)
+        self.create_part(self.body)
+
+        with self.assertNumQueries(1):
+            shortages = get_shortages()
+
+        self.assertEqual(len(shortages), 1)
+        self.assertEqual(shortages[0]['part_type_id'], self.wing.id)
+        self.assertEqual(shortages[0]['missing'], 1)
+        self.assertEqual(get_missing_parts(), {'Test Uçağı': [{'part': 'Kanat', 'quantity': 1}]})
+
+    def test_reconcile_inventory(self):
+        """Sinyalleri atlayan toplu işlemlerden kaynaklanan farklar bulunur ve düzeltilir."""
+        self.create_part(self.wing)
+        self.create_part(self.wing)
+
+        # Sinyal çalıştırmayan işlemler envanteri kaydırır
+        Part.objects.filter(type=self.wing).update(is_used=True)
+        Part.objects.bulk_create([
+            Part(name="GVD-0", type=self.body, aircraft_type=self.aircraft, created_by=self.user)
+        ])
+
+        drifts = {(drift.part_type_id, drift.actual - drift.recorded) for drift in find_drift()}
+        self.assertEqual(drifts, {(self.wing.id, -2), (self.body.id, 1)})
+
+        run, _ = reconcile_inventory(repair=True)
+        self.assertEqual(run.drift_count, 2)
+        self.assertEqual(self.get_quantity(self.wing), 0)
+        self.assertEqual(self.get_quantity(self.body), 1)
+
+        # Artımlı çalışma sadece değişen anahtarları kontrol eder
+        run, drifts = reconcile_inventory(incremental=True)
+        self.assertTrue(run.is_incremental)
+        self.assertEqual(drifts, [])
+
+    @override_settings(INVENTORY_DEFERRED_SNAPSHOTS=True)
+    def test_incremental_reconcile_finds_deferred_writes(self):
+        """
+        Ertelenmiş yazmalar Inventory satırını değiştirmez, artımlı mutabakat bunları hareket defterinden bulur.
+        Stok uyarıları sadece düzeltilen anahtarlar için değerlendirilir.
+        """
+        self.create_part(self.wing)
+        # Stoğu olmayan ama durumu güncellenmemiş satır, farkı olmadığı için değerlendirilmez
+        Inventory.objects.create(part_type=self.body, aircraft_type=self.aircraft, quantity=0)
+        since = timezone.now()
+        # Parçası olmayan sayaç yazması sadece bekleyen hareket satırı bırakır
+        adjust_inventory(self.wing.id, self.aircraft.id, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            run, drifts = reconcile_inventory(repair=True, since=since)
+        self.assertEqual([(drift.part_type_id, drift.recorded, drift.actual) for drift in drifts], [(self.wing.id, 2, 1)])
+        current = Inventory.objects.with_current_quantity().get(part_type=self.wing, aircraft_type=self.aircraft)
+        self.assertEqual(current.current_quantity, 1)
+        self.assertFalse(InventoryAlert.objects.filter(part_type=self.body).exists())
+
+    def test_repair_writes_actual_quantities(self):
+        """
+        Düzeltme gerçek miktarı düzeltme anında yeniden hesaplar ve mutlak değer olarak yazar.
+        Eksik envanter satırı oluşturulur, bekleyen hareketteki stok anlık görüntüde sıfıra kırpılmaz.
+        """
+        Inventory.objects.create(part_type=self.wing, aircraft_type=self.aircraft, quantity=0)
+        InventoryMovement.objects.create(
+            part_type=self.wing, aircraft_type=self.aircraft, delta=3, reason=InventoryMovement.Reasons.PRODUCED
+        )
+        Part.objects.bulk_create([
+            Part(name="KNT-0", type=self.wing, aircraft_type=self.aircraft, created_by=self.user),
+            Part(name="GVD-0", type=self.body, aircraft_type=self.aircraft, created_by=self.user),
+        ])
+        drifts = find_drift()
+        # Fark bulunduktan sonra eklenen parça düzeltmeye dahil edilir
+        Part.objects.bulk_create([
+            Part(name="GVD-1", type=self.body, aircraft_type=self.aircraft, created_by=self.user)
+        ])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            repaired = repair_drift(drifts)
+        self.assertEqual(
+            sorted((drift.part_type_id, drift.recorded, drift.actual) for drift in repaired),
+            sorted([(self.wing.id, 3, 1), (self.body.id, 0, 2)])
+        )
+        self.assertEqual(self.get_quantity(self.wing), 1)
+        self.assertEqual(self.get_quantity(self.body), 2)
+        self.assertFalse(InventoryMovement.objects.filter(is_compacted=False).exists())
+        self.assertEqual(
+            set(InventoryMovement.objects.filter(reason=InventoryMovement.Reasons.ADJUSTED).values_list('part_type_id', 'delta')),
+            {(self.wing.id, -2), (self.body.id, 2)}
+        )
+        self.assertEqual(find_drift(), [])
+
+    def test_projection_matches_serializer(self):
+        """Envanter projeksiyonu bekleyen hareketler dahil InventorySerializer ile bayt bayt aynıdır."""
+        self.create_part(self.wing)
+        Inventory.objects.create(part_type=self.body, aircraft_type=self.aircraft, quantity=0, minimum_quantity=3)
+        InventoryMovement.objects.create(
+            part_type=self.body, aircraft_type=self.aircraft, delta=2, reason=InventoryMovement.Reasons.PRODUCED
+        )
+
+        queryset = Inventory.objects.select_related('part_type', 'aircraft_type').with_current_quantity().order_by('id')
+        expected = JSONRenderer().render(InventorySerializer(queryset, many=True).data)
+        with self.assertNumQueries(1):
+            rows = INVENTORY_PROJECTION.serialize(INVENTORY_PROJECTION.values(queryset))
+        self.assertEqual(JSONRenderer().render(rows), expected)
+
+    def test_buildable_count_follows_inventory(self):
+        """
+        Üretilebilir uçak sayısı envanter ve gereksinim değişikliklerinde güncellenir.
+        Envanter yazmalarında sayaç commit sonrası yenilenir, yazan transaction sayaç satırını kilitlemez.
+        """
+        self.aircraft.requirements.create(part_type=self.wing, quantity=2)
+        requirement = self.aircraft.requirements.create(part_type=self.body, quantity=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_inventory_deltas({
+                (self.wing.id, self.aircraft.id): 5,
+                (self.body.id, self.aircraft.id): 3,
+            })
+            self.assertEqual(AircraftBuildability.objects.get(aircraft_type=self.aircraft).buildable_count, 0)
+        self.assertEqual(AircraftBuildability.objects.get(aircraft_type=self.aircraft).buildable_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_inventory(self.body.id, self.aircraft.id, -2)
+        self.assertEqual(AircraftBuildability.objects.get(aircraft_type=self.aircraft).buildable_count, 1)
+
+        requirement.quantity = 2
+        requirement.save()
+        self.assertEqual(AircraftBuildability.objects.get(aircraft_type=self.aircraft).buildable_count, 0)
+
+    @override_settings(INVENTORY_DEFERRED_SNAPSHOTS=True)
+    def test_deferred_snapshots(self):
+        """
+        Ertelenmiş modda yazmalar deftere eklenir ve ilk yazmada boş envanter satırı oluşturulur, okumalar bekleyen
+        hareketleri içerir. Stok uyarıları yazmada değil sıkıştırmada değerlendirilir.
+        """
+        self.aircraft.requirements.create(part_type=self.wing, quantity=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            adjust_inventory(self.wing.id, self.aircraft.id, 3)
+        before = timezone.now()
+
+        # Hareket kaydı ve commit sonrası üretilebilirlik ve sürüm güncellemesi
+        with self.assertNumQueries(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                adjust_inventory(self.wing.id, self.aircraft.id, -1)
+
+        inventory = Inventory.objects.with_current_quantity().get(part_type=self.wing)
+        self.assertEqual((inventory.quantity, inventory.current_quantity), (0, 2))
+        self.assertEqual(get_shortages()[0]['available'], 2)
+        Inventory.objects.filter(part_type=self.wing).update(minimum_quantity=5)
+        self.assertFalse(InventoryAlert.objects.exists())
+        self.assertEqual(InventoryMovement.objects.filter(is_compacted=False).count(), 2)
+        self.assertEqual(get_stock_at(self.wing.id, self.aircraft.id, before), 3)
+
+        self.assertEqual(compact_inventory_movements(), 2)
+        inventory = Inventory.objects.with_current_quantity().get(part_type=self.wing)
+        self.assertEqual((inventory.quantity, inventory.current_quantity), (2, 2))
+        self.assertEqual(inventory.stock_status, Inventory.StockStatuses.CRITICAL)
+        self.assertEqual(InventoryAlert.objects.get().quantity, 2)
+        self.assertEqual(get_stock_at(self.wing.id, self.aircraft.id, before), 3)
+
+        # Bekleyen hareketler anlık görüntünün üzerine eklenir
+        adjust_inventory(self.wing.id, self.aircraft.id, 4)
+        inventory = Inventory.objects.with_current_quantity().get(part_type=self.wing)
+        self.assertEqual((inventory.quantity, inventory.current_quantity), (2, 6))
+
+    def test_stock_alerts_on_threshold_crossing(self):
+        """
+        Eşik geçişlerinde durum güncellenir ve uyarı eklenir, geçiş olmayan yazmalar uyarı üretmez.
+        Kontrol yazan transaction commit edildikten sonra çalışır.
+        """
+        Statuses = Inventory.StockStatuses
+
+        def adjust(delta):
+            with self.captureOnCommitCallbacks(execute=True):
+                adjust_inventory(self.wing.id, self.aircraft.id, delta)
+
+        adjust(3)
+        Inventory.objects.filter(part_type=self.wing).update(minimum_quantity=2)
+
+        adjust(-1)
+        self.assertFalse(InventoryAlert.objects.exists())
+
+        adjust(-1)
+        adjust(-1)
+        adjust(5)
+
+        transitions = list(
+            InventoryAlert.objects.order_by('id').values_list('previous_status', 'status', 'quantity')
+        )
+        self.assertEqual(transitions, [
+            (Statuses.OK, Statuses.CRITICAL, 1),
+            (Statuses.CRITICAL, Statuses.OUT_OF_STOCK, 0),
+            (Statuses.OUT_OF_STOCK, Statuses.OK, 5),
+        ])
+        self.assertEqual(Inventory.objects.get(part_type=self.wing).stock_status, Statuses.OK)
+
+    def test_production_plan(self):
+        """
+        Net ihtiyaç gereksinim x hedef - stok olarak uçak tipi ve parça tipi bazında hesaplanır.
+        BOM referans önbelleğinden okunduğu için plan sadece stok sorgusunu çalıştırır.
+        """
+        team = Team.objects.create(name="Kanat Takımı", part_type=self.wing)
+        self.aircraft.requirements.create(part_type=self.wing, quantity=2)
+        self.aircraft.requirements.create(part_type=self.body, quantity=1)
+        other = Aircraft.objects.create(name="Diğer Uçak")
+        for part_type in (self.wing, self.wing, self.wing, self.body, self.body):
+            self.create_part(part_type)
+
+        get_planning_matrices()
+        with self.assertNumQueries(1):
+            plan = plan_production({self.aircraft.id: 3})
+
+        self.assertEqual(plan['aircrafts'], [{
+            'aircraft_type_id': self.aircraft.id,
+            'aircraft_type': self.aircraft.name,
+            'target': 3,
+            'max_buildable': 1,
+            'shortfall': 2,
+            'bottlenecks': [self.wing.name],
+        }])
+        part_types = {row['part_type_id']: row for row in plan['part_types']}
+        self.assertEqual(
+            (part_types[self.wing.id]['gross'], part_types[self.wing.id]['allocated'], part_types[self.wing.id]['net']),
+            (6, 3, 3)
+        )
+        self.assertEqual(part_types[self.wing.id]['team'], team.name)
+        self.assertEqual(
+            (part_types[self.body.id]['gross'], part_types[self.body.id]['allocated'], part_types[self.body.id]['net']),
+            (3, 2, 1)
+        )
+        self.assertEqual(plan['teams'], [{'team_id': team.id, 'team': team.name, 'part_type': self.wing.name, 'net': 3}])
+        self.assertEqual(len(plan['lines']), 2)
+
+        # Hedef verilmezse tüm uçak tipleri için üretilebilir adet döner, gereksinimi olmayan tip için 0
+        buildable = {row['aircraft_type_id']: row['max_buildable'] for row in plan_production({})['aircrafts']}
+        self.assertEqual(buildable, {self.aircraft.id: 1, other.id: 0})
+
+
+class InventoryConcurrencyTests(TransactionTestCase):
+    """
+    Envanter yazmalarının eşzamanlı işlemlerle davranışı için test suite'i.
+
+    Test edilen temel işlevler:
+    - Aynı uçak tipinin farklı parça tiplerine yazan işlemlerin birbirini beklememesi
+    """
+
+    def setUp(self):
+        self.aircraft = Aircraft.objects.create(name="Test Uçağı")
+        self.wing = PartType.objects.create(name="Kanat")
+        self.body = PartType.objects.create(name="Gövde")
+        self.aircraft.requirements.create(part_type=self.wing, quantity=1)
+        self.aircraft.requirements.create(part_type=self.body, quantity=1)
+
+    def test_writers_do_not_wait_on_buildability(self):
+        """
+        Açık bir transaction'da kanat üretilirken aynı uçak tipi için gövde üretimi beklemeden tamamlanır.
+        Üretilebilir uçak sayısı iki transaction da commit edildikten sonra doğrudur.
+        """
+        written = threading.Event()
+        release = threading.Event()
+
+        def hold_transaction():
+            try:
+                with transaction.atomic():
+                    adjust_inventory(self.wing.id, self.aircraft.id, 1)
+                    written.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_transaction)
+        thread.start()
+        try:
+            self.assertTrue(written.wait(10))
+            with transaction.atomic():
+                # Kilit beklenirse test askıda kalmadan hata verir
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL lock_timeout = '2s'")
+                adjust_inventory(self.body.id, self.aircraft.id, 1)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(AircraftBuildability.objects.get(aircraft_type=self.aircraft).buildable_count, 1)
+
+
+class InventoryEndpointTests(APITestCase):
+    """
+    Envanter uç noktaları için test suite'i.
+
+    Test edilen temel işlevler:
+    - Stok uyarı akışında ve eksik parça listesinde parametre validasyonu
+    - Takım kapsamına göre filtreleme
+    """
+
+    def setUp(self):
+        User = get_user_model()
+        self.aircraft = Aircraft.objects.create(name="Test Uçağı")
+        self.wing = PartType.objects.create(name="Kanat")
+        self.body = PartType.objects.create(name="Gövde")
+
+        self.wing_team = Team.objects.create(name="Kanat Takımı", part_type=self.wing)
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.VIEW_INVENTORY,
+                description="Envanter Görüntüleme Yetkisi"
+            )
+        )
+        self.user_password = 'testpass123'
+        self.user = User.objects.create_user(username='kanatci', password=self.user_password, team=self.wing_team)
+
+        response = self.client.post(
+            reverse('login'),
+            {'username': self.user.username, 'password': self.user_password},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['tokens']['access']}")
+
+    def test_alert_parameters_are_validated(self):
+        """
+        Geçersiz veya negatif limit / after 400 döner, takım sadece kendi parça tipinin uyarılarını görür.
+        URL: /inventory/alerts/ (GET)
+        """
+        url = reverse('inventory_alerts')
+        for params in ({'limit': 'abc'}, {'limit': -1}, {'limit': 0}, {'after': 'abc'}, {'after': -5}):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+        for part_type in (self.wing, self.body):
+            InventoryAlert.objects.create(
+                part_type=part_type,
+                aircraft_type=self.aircraft,
+                previous_status=Inventory.StockStatuses.OK,
+                status=Inventory.StockStatuses.OUT_OF_STOCK,
+                quantity=0,
+                minimum_quantity=1
+            )
+        response = self.client.get(url, {'limit': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([alert['part_type']['id'] for alert in response.data], [self.wing.id])
+
+    def test_missing_parts_are_scoped_to_team(self):
+        """
+        Geçersiz uçak tipi 400 döner, takım sadece kendi parça tipinin eksiklerini görür.
+        URL: /inventory/missing_parts/ (GET)
+        """
+        url = reverse('missing_parts')
+        self.assertEqual(self.client.get(url, {'aircraft_type': 'abc'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.aircraft.requirements.create(part_type=self.wing, quantity=2)
+        self.aircraft.requirements.create(part_type=self.body, quantity=1)
+        response = self.client.get(url, {'aircraft_type': self.aircraft.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['part_type']['id'] for row in response.data], [self.wing.id])
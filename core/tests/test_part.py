@@ -0,0 +1,522 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from ..models.aircraft import Aircraft
+from ..models.inventory import Inventory
+from ..models.part import Part, PartType
+from ..services.part import produce_parts
+from ..serializers.part import PartSerializer
+from ..serializers.projections import Column, PART_PROJECTION, Projection
+from rest_framework.renderers import JSONRenderer
+from ..services.search import search_queryset, PART_SEARCH
+from ..services.versions import bump_versions, get_versions, scoped_versions, PART
+from django.db import connection
+from accounts.models import TeamPermission
+from accounts.models import Team
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+import base64
+import csv
+import io
+import json
+
+class PartBulkTests(APITestCase):
+    """
+    Toplu parça üretimi için test suite'i.
+
+    Test edilen temel işlevler:
+    - Tanım ({type, aircraft_type, count}) ile toplu üretim
+    - Partiler arasında tekrar etmeyen otomatik parça isimleri
+    - Liste ile toplu üretim
+    - Parça tipi yetki kontrolü
+    - İmleçli (keyset) parça listesi, eşleşme puanı sırasıyla imleçli sayfalama
+    - Önbelleğe alınan kayıt sayıları ve tablo sürüm sayaçları
+    - İndeksli arama
+    - Sütun projeksiyonu ile serializer çıktısının aynılığı
+    - CSV / NDJSON dışa aktarma
+    - ETag ile koşullu liste ve detay isteği
+    - Sık kullanılan parça sorgularının indeks kullanımı
+    """
+
+    def setUp(self):
+        """
+        Her test öncesi çalışacak hazırlık metodu.
+        Kanat takımı, kullanıcısı ve uçak tipini oluşturur.
+        """
+        User = get_user_model()
+        cache.clear()
+
+        self.aircraft = Aircraft.objects.create(name="Test Uçağı")
+        self.wing = PartType.objects.create(name="Kanat")
+        self.body = PartType.objects.create(name="Gövde")
+
+        self.wing_team = Team.objects.create(
+            name="Kanat Takımı",
+            is_assembly_team=False,
+            part_type=self.wing
+        )
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.CREATE_PART,
+                description="Parça Oluşturma Yetkisi"
+            )
+        )
+
+        self.user_password = 'testpass123'
+        self.user = User.objects.create_user(
+            username='kanatci',
+            password=self.user_password,
+            team=self.wing_team
+        )
+        self.login_user()
+
+    def login_user(self):
+        """
+        Test kullanıcısı için login işlemi yapar ve token alır.
+        """
+        response = self.client.post(
+            reverse('login'),
+            {'username': self.user.username, 'password': self.user_password},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['tokens']['access']}")
+
+    def test_bulk_create_with_spec(self):
+        """
+        Tanım ile toplu üretim testi.
+        URL: /part/bulk/ (POST)
+        """
+        data = {'type': self.wing.id, 'aircraft_type': self.aircraft.id, 'count': 25}
+        response = self.client.post(reverse('part_bulk'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 25)
+        self.assertEqual(Part.objects.filter(type=self.wing).count(), 25)
+        self.assertEqual(
+            Inventory.objects.get(part_type=self.wing, aircraft_type=self.aircraft).quantity,
+            25
+        )
+
+    def test_bulk_create_names_are_unique_across_batches(self):
+        """
+        Tanım ile üretilen parçaların isim son eki parça id'sinden verilir, ardışık partilerde tekrar etmez.
+        URL: /part/bulk/ (POST)
+        """
+        data = {'type': self.wing.id, 'aircraft_type': self.aircraft.id, 'count': 3}
+        for _ in range(2):
+            response = self.client.post(reverse('part_bulk'), data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        parts = Part.objects.filter(type=self.wing)
+        self.assertEqual(len({part.name for part in parts}), 6)
+        for part in parts:
+            self.assertEqual(part.name, f"{self.wing.name}-{part.id}")
+
+    def test_bulk_create_with_list(self):
+        """
+        Liste ile toplu üretim testi.
+        URL: /part/bulk/ (POST)
+        """
+        data = [
+            {'name': f"KNT-{i}", 'type': self.wing.id, 'aircraft_type': self.aircraft.id}
+            for i in range(3)
+        ]
+        response = self.client.post(reverse('part_bulk'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sorted(Part.objects.values_list('name', flat=True)),
+            ['KNT-0', 'KNT-1', 'KNT-2']
+        )
+
+    def test_bulk_create_permission(self):
+        """
+        Takımın sorumlu olmadığı parça tipi ile toplu üretim denemesi.
+        URL: /part/bulk/ (POST)
+        """
+        data = {'type': self.body.id, 'aircraft_type': self.aircraft.id, 'count': 2}
+        response = self.client.post(reverse('part_bulk'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Part.objects.exists())
+
+    def test_list_with_cursor(self):
+        """
+        İmleçli sayfalama ile parça listesi testi.
+        Sayfalar OFFSET sayfalaması ile aynı sırayı verir, önceki sayfa imleci aynı sayfaya geri döner.
+        URL: /part/ (GET)
+        """
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.VIEW_PART,
+                description="Parça Görüntüleme Yetkisi"
+            )
+        )
+        produce_parts(self.user, [
+            {'name': f"KNT-{i}", 'type_id': self.wing.id, 'aircraft_type_id': self.aircraft.id}
+            for i in range(25)
+        ])
+        params = {'order_column': 4, 'order_dir': 'desc', 'length': 10}
+
+        def get_page(**extra):
+            response = self.client.get(reverse('part'), {**params, **extra}, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return response.data
+
+        expected = [part['id'] for part in get_page(length=25)['data']]
+
+        pages = [get_page(cursor='')]
+        while pages[-1]['next_cursor']:
+            pages.append(get_page(cursor=pages[-1]['next_cursor']))
+
+        self.assertEqual([len(page['data']) for page in pages], [10, 10, 5])
+        self.assertEqual([part['id'] for page in pages for part in page['data']], expected)
+        self.assertIsNone(pages[0]['prev_cursor'])
+
+        previous = get_page(cursor=pages[2]['prev_cursor'])
+        self.assertEqual(previous['data'], pages[1]['data'])
+
+        response = self.client.get(reverse('part'), {**params, 'cursor': 'bozuk'}, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_uses_range_condition(self):
+        """
+        NULL olamayan sıralama alanında imleç koşulu aralık olarak kurulur, NULL dalı eklenmez.
+        URL: /part/ (GET)
+        """
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.VIEW_PART,
+                description="Parça Görüntüleme Yetkisi"
+            )
+        )
+        produce_parts(self.user, [
+            {'name': f"KNT-{i:02d}", 'type_id': self.wing.id, 'aircraft_type_id': self.aircraft.id}
+            for i in range(6)
+        ])
+        params = {'order_column': 0, 'order_dir': 'asc', 'length': 4}
+        first = self.client.get(reverse('part'), {**params, 'cursor': ''}, content_type='application/json').data
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('part'), {**params, 'cursor': first['next_cursor']}, content_type='application/json'
+            )
+
+        self.assertEqual([part['name'] for part in response.data['data']], ['KNT-04', 'KNT-05'])
+        page_sql = next(query['sql'] for query in queries.captured_queries if 'LIMIT 5' in query['sql'])
+        self.assertIn('>=', page_sql)
+        self.assertNotIn('IS NULL', page_sql)
+
+    def test_cursor_pages_by_search_rank(self):
+        """
+        Eşleşme puanına göre imleçli sayfalamada her parça bir kez gelir, imleçteki puan yuvarlanmış ondalık değerdir.
+        URL: /part/ (GET)
+        """
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.VIEW_PART,
+                description="Parça Görüntüleme Yetkisi"
+            )
+        )
+        names = [' '.join(['Panel'] * (i % 3 + 1) + [f"P{i}"]) for i in range(9)]
+        produce_parts(self.user, [
+            {'name': name, 'type_id': self.wing.id, 'aircraft_type_id': self.aircraft.id}
+            for name in names
+        ])
+        params = {'search_value': 'panel', 'length': 2}
+        seen, cursor = [], ''
+        while cursor is not None:
+            page = self.client.get(reverse('part'), {**params, 'cursor': cursor}, content_type='application/json').data
+            seen.extend(part['name'] for part in page['data'])
+            cursor = page['next_cursor']
+            if cursor:
+                value = json.loads(base64.urlsafe_b64decode(cursor))['value']
+                self.assertIsInstance(value, str)
+                self.assertLessEqual(len(value.partition('.')[2]), 6)
+
+        self.assertEqual(sorted(seen), sorted(names))
+        # Daha çok eşleşen parça önce gelir
+        matches = [name.count('Panel') for name in seen]
+        self.assertEqual(matches, sorted(matches, reverse=True))
+
+    def test_list_counts_are_cached(self):
+        """
+        Kayıt sayıları önbellekten okunur ve parça eklendiğinde geçersiz olur.
+        URL: /part/ (GET)
+        """
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.VIEW_PART,
+                description="Parça Görüntüleme Yetkisi"
+            )
+        )
+
+        def produce(count):
+            with self.captureOnCommitCallbacks(execute=True):
+                produce_parts(self.user, [
+                    {'name': f"KNT-{i}", 'type_id': self.wing.id, 'aircraft_type_id': self.aircraft.id}
+                    for i in range(count)
+                ])
+
+        def get_counts(search=''):
+            response = self.client.get(reverse('part'), {'search_value': search}, content_type='application/json')
+            return response.data['recordsTotal'], response.data['recordsFiltered']
+
+        produce(3)
+        self.assertEqual(get_counts(), (3, 3))
+
+        # Commit edilmeyen değişiklik sürümü değiştirmez, önbellekteki sayı kullanılır
+        Part.objects.filter(id=Part.objects.first().id).delete()
+        self.assertEqual(get_counts(), (3, 3))
+
+        produce(2)
+        self.assertEqual(get_counts(), (4, 4))
+        self.assertEqual(get_counts(search='yok'), (4, 0))
+
+        # Sürümler önbellekte değil sayaç tablosunda tutulur, önbellek temizlendiğinde (cull) değişmez
+        version = get_versions(PART)
+        cache.clear()
+        self.assertEqual(get_versions(PART), version)
+        self.assertEqual(get_counts(), (4, 4))
+
+    def test_version_counters(self):
+        """
+        Sürüm sayaçları commit sonrası tek ifadede artırılır. Tablo sürümü kapsam sayaçlarından hesaplanır,
+        bir parça tipine yazma diğer parça tipinin sürümünü değiştirmez.
+        """
+        wing_scope, body_scope = f'{PART}:part_type:{self.wing.id}', f'{PART}:part_type:{self.body.id}'
+        before = get_versions(PART), get_versions(wing_scope), get_versions(body_scope)
+
+        with self.assertNumQueries(1):
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_versions(*scoped_versions(PART, [self.wing.id, self.body.id]))
+
+        after = get_versions(PART), get_versions(wing_scope), get_versions(body_scope)
+        self.assertNotEqual(after[0], before[0])
+        self.assertNotEqual(after[1], before[1])
+        self.assertNotEqual(after[2], before[2])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(*scoped_versions(PART, [self.wing.id]))
+        self.assertEqual(get_versions(body_scope), after[2])
+        self.assertNotEqual(get_versions(PART), after[0])
+
+    def test_list_search(self):
+        """
+        Parça adı, tip ve uçak adı üzerinden önek eşleşmeli arama ve sıralama puanı testi.
+        URL: /part/ (GET)
+        """
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.VIEW_PART,
+                description="Parça Görüntüleme Yetkisi"
+            )
+        )
+        produce_parts(self.user, [
+            {'name': name, 'type_id': self.wing.id, 'aircraft_type_id': self.aircraft.id}
+            for name in ['Sol Panel', 'Sağ Panel', 'Panel Panel Ucu', 'Flap']
+        ])
+
+        def search(value):
+            response = self.client.get(reverse('part'), {'search_value': value}, content_type='application/json')
+            return [part['name'] for part in response.data['data']]
+
+        self.assertEqual(sorted(search('pan')), ['Panel Panel Ucu', 'Sağ Panel', 'Sol Panel'])
+        self.assertEqual(search('panel ucu'), ['Panel Panel Ucu'])
+        self.assertEqual(len(search('kanat')), 4)
+        self.assertEqual(len(search('test uçağı')), 4)
+        self.assertEqual(sorted(search('&|!')), sorted(search('')))
+        # Sıralama sütunu verilmediğinde en çok eşleşen parça ilk sırada gelir
+        self.assertEqual(search('panel')[0], 'Panel Panel Ucu')
+
+        # Parça adı araması GIN indeksini kullanır
+        queryset = search_queryset(Part.objects.all(), 'panel', PART_SEARCH)
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        self.assertIn('part_name_search', queryset.explain())
+
+    def test_projection_matches_serializer(self):
+        """
+        Projeksiyon çıktısı PartSerializer ile bayt bayt aynıdır ve tek sorguda okunur.
+        """
+        self.user.first_name, self.user.last_name = 'Ali', 'Kanatçı'
+        self.user.save()
+        User = get_user_model()
+        teamless = User.objects.create_user(username='takimsiz', password=self.user_password)
+        produce_parts(self.user, [
+            {'name': f"KNT-{i}", 'type_id': self.wing.id, 'aircraft_type_id': self.aircraft.id}
+            for i in range(3)
+        ])
+        produce_parts(teamless, [{'name': 'GVD-1', 'type_id': self.body.id, 'aircraft_type_id': self.aircraft.id}])
+        Part.objects.filter(name='KNT-0').update(is_used=True)
+
+        queryset = Part.objects.select_related('type', 'aircraft_type', 'created_by', 'created_by__team')
+        expected = JSONRenderer().render(PartSerializer(queryset, many=True).data)
+        with self.assertNumQueries(1):
+            rows = PART_PROJECTION.serialize(PART_PROJECTION.values(queryset))
+        self.assertEqual(JSONRenderer().render(rows), expected)
+
+        rows = PART_PROJECTION.serialize(PART_PROJECTION.values(queryset, ['name']), ['name'])
+        self.assertEqual(list(rows[0]), ['id', 'name'])
+
+        # Serializer'dan üretilemeyen alan tanımlanmazsa veya serializer'da olmayan alan verilirse hata verilir
+        with self.assertRaises(ImproperlyConfigured):
+            Projection.from_serializer(PartSerializer)
+        with self.assertRaises(ImproperlyConfigured):
+            Projection.from_serializer(PartSerializer, [
+                *[column for column in PART_PROJECTION.columns if column.key in ('created_by', 'status')],
+                Column('owner'),
+            ])
+
+    def test_export(self):
+        """
+        Parçaların takım kapsamında CSV ve NDJSON olarak akış halinde dışa aktarılması testi.
+        URL: /part/export/<format>/ (GET)
+        """
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.VIEW_PART,
+                description="Parça Görüntüleme Yetkisi"
+            )
+        )
+        produce_parts(self.user, [
+            {'name': f"KNT-{i}", 'type_id': self.wing.id, 'aircraft_type_id': self.aircraft.id}
+            for i in range(3)
+        ])
+        produce_parts(self.user, [{'name': 'GVD-1', 'type_id': self.body.id, 'aircraft_type_id': self.aircraft.id}])
+
+        response = self.client.get(reverse('part_export', args=['csv']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        # Kanat takımı sadece kendi parça tipini görür
+        self.assertEqual([row['name'] for row in rows], ['KNT-0', 'KNT-1', 'KNT-2'])
+        self.assertEqual(rows[0]['part_type'], 'Kanat')
+        self.assertEqual(rows[0]['is_used'], 'False')
+
+        response = self.client.get(reverse('part_export', args=['ndjson']))
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['aircraft_type'], 'Test Uçağı')
+        self.assertFalse(rows[0]['is_used'])
+
+        response = self.client.get(reverse('part_export', args=['xml']))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Komut takım kapsamı olmadan tüm parçaları aktarır
+        output = io.StringIO()
+        call_command('export_data', 'part', '--format', 'ndjson', '--chunk-size', '2', stdout=output)
+        self.assertEqual(len(output.getvalue().splitlines()), 4)
+
+    def test_conditional_get(self):
+        """
+        Liste ETag ile doğrulanır, veri değişmediyse sorgu çalıştırılmadan 304 döner.
+        Başka takımın parça tipine yapılan yazma kapsam dışında kaldığı için ETag'i değiştirmez.
+        URL: /part/ (GET)
+        """
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.VIEW_PART,
+                description="Parça Görüntüleme Yetkisi"
+            )
+        )
+
+        def produce(part_type):
+            with self.captureOnCommitCallbacks(execute=True):
+                produce_parts(self.user, [{'name': 'PRC', 'type_id': part_type.id, 'aircraft_type_id': self.aircraft.id}])
+
+        def get(draw, etag=None):
+            headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+            return self.client.get(reverse('part'), {'draw': draw, 'start': 0, 'length': 10}, content_type='application/json', **headers)
+
+        produce(self.wing)
+        response = get(1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        # draw parametresi değişse de veri aynı olduğu için 304 döner ve parça tablosu sorgulanmaz
+        with CaptureQueriesContext(connection) as queries:
+            response = get(2, etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse([query for query in queries if f'"{Part._meta.db_table}"' in query['sql']])
+
+        produce(self.body)
+        self.assertEqual(get(3, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        produce(self.wing)
+        response = get(4, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['recordsTotal'], 2)
+
+    def test_conditional_get_detail(self):
+        """
+        Parça detayı takım kapsamında döner ve ETag ile doğrulanır, kapsam dışındaki parça 404 döner.
+        URL: /part/<id>/ (GET)
+        """
+        self.wing_team.permissions.add(
+            TeamPermission.objects.create(
+                name=TeamPermission.PermissionTypes.VIEW_PART,
+                description="Parça Görüntüleme Yetkisi"
+            )
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            wing_part, body_part = produce_parts(self.user, [
+                {'name': 'KNT-1', 'type_id': self.wing.id, 'aircraft_type_id': self.aircraft.id},
+                {'name': 'GVD-1', 'type_id': self.body.id, 'aircraft_type_id': self.aircraft.id},
+            ])
+
+        def get(part, etag=None):
+            headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+            return self.client.get(reverse('part_detail', args=[part.id]), content_type='application/json', **headers)
+
+        response = get(wing_part)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'KNT-1')
+        etag = response['ETag']
+        self.assertEqual(get(wing_part, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(get(body_part).status_code, status.HTTP_404_NOT_FOUND)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            wing_part.name = 'KNT-2'
+            wing_part.save()
+        response = get(wing_part, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'KNT-2')
+
+    def test_hot_queries_use_indexes(self):
+        """
+        Kullanılabilir parça, liste sırası ve takım listesi sorgularının planlayıcı tarafından
+        ilgili indekslerle çalıştırıldığını doğrular. Veri çoğu parçanın kullanıldığı gerçekçi dağılımla oluşturulur.
+        """
+        other_aircraft = Aircraft.objects.create(name="Diğer Uçak")
+        part_types = [self.wing, self.body] + [PartType.objects.create(name=f"Tip {i}") for i in range(6)]
+        Part.objects.bulk_create([
+            Part(
+                name=f"PRC-{i}",
+                type=part_types[i % len(part_types)],
+                aircraft_type=self.aircraft if i % 2 else other_aircraft,
+                created_by=self.user,
+                is_used=i % 20 != 0
+            )
+            for i in range(20000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Part._meta.db_table}")
+
+        queries = {
+            'part_available_fifo': Part.objects.filter(
+                aircraft_type=self.aircraft, type=self.body, is_used=False
+            ).order_by('created_at', 'id')[:10],
+            'part_created_at': Part.objects.order_by('-created_at', '-id')[:25],
+            'part_type_created_at': Part.objects.filter(type=self.wing).order_by('-created_at', '-id')[:25],
+        }
+        for index, queryset in queries.items():
+            with self.subTest(index=index):
+                self.assertIn(index, queryset.explain())
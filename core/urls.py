@@ -1,24 +1,36 @@
 from django.urls import path
-from .views.inventory import InventoryView,InventoryDetailView
-from .views.part import PartView,PartDetailView
-from .views.assembly import AssemblyView,AssemblyDetailView
+from .views.inventory import InventoryView,InventoryDetailView,MissingPartsView,CriticalInventoryView,InventoryAlertView
+from .views.part import PartView,PartDetailView,PartBulkView
+from .views.assembly import AssemblyView,AssemblyDetailView,AssemblyAllocateView,AssemblyBatchView
 from .views.dashboard import DashboardView
 from .views.error import ErrorView
-from .views.aircraft import AircraftRequirementView, AvailablePartsView
+from .views.aircraft import AircraftRequirementView, AvailablePartsView, BuildableAircraftView, ProductionPlanView
+from .views.export import PartExportView, AssemblyExportView, InventoryExportView
 
 urlpatterns = [
     path("", DashboardView.as_view(), name="dashboard"),
     path('inventory/', InventoryView.as_view(), name='inventory'),
     path('inventory/<int:pk>/', InventoryDetailView.as_view(), name='inventory_detail'),
+    path('inventory/missing_parts/', MissingPartsView.as_view(), name='missing_parts'),
+    path('inventory/critical/', CriticalInventoryView.as_view(), name='critical_inventory'),
+    path('inventory/alerts/', InventoryAlertView.as_view(), name='inventory_alerts'),
+    path('inventory/export/<str:export_format>/', InventoryExportView.as_view(), name='inventory_export'),
 
     path('part/', PartView.as_view(), name='part'),
     path('part/<int:pk>/', PartDetailView.as_view(), name='part_detail'),
+    path('part/bulk/', PartBulkView.as_view(), name='part_bulk'),
+    path('part/export/<str:export_format>/', PartExportView.as_view(), name='part_export'),
 
     path('assembly/', AssemblyView.as_view(), name='assembly'),
     path('assembly/<int:pk>/', AssemblyDetailView.as_view(), name='assembly_detail'),
+    path('assembly/allocate/', AssemblyAllocateView.as_view(), name='assembly_allocate'),
+    path('assembly/batch/', AssemblyBatchView.as_view(), name='assembly_batch'),
+    path('assembly/export/<str:export_format>/', AssemblyExportView.as_view(), name='assembly_export'),
 
     path('aircraft/<int:aircraft_id>/requirements/', AircraftRequirementView.as_view(), name='aircraft_requirements'),
     path('aircraft/<int:aircraft_id>/part_type/<int:part_type_id>/available_parts/', AvailablePartsView.as_view(), name='available_parts'),
+    path('aircraft/buildable/', BuildableAircraftView.as_view(), name='buildable_aircrafts'),
+    path('aircraft/plan/', ProductionPlanView.as_view(), name='production_plan'),
 
 
     path('permission-denied/', ErrorView.access_denied, name='403'),
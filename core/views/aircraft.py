@@ -3,12 +3,18 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
-from django.shortcuts import get_object_or_404
+from drf_yasg import openapi
+from django.http import Http404
 from django.core.exceptions import PermissionDenied
-from ..models.aircraft import Aircraft
+from ..models.aircraft import Aircraft, AircraftBuildability
 from ..models.part import Part
-from ..serializers.aircraft import AircraftRequirementSerializer, AvailablePartSerializer
-from core.decorators import check_team_permission
+from ..models.inventory import Inventory
+from ..serializers.aircraft import AircraftRequirementSerializer, AvailablePartSerializer, AircraftBuildabilitySerializer, ProductionPlanSerializer
+from core.decorators import check_team_permission, conditional_response, part_type_scope
+from ..services.versions import PART, REFERENCE
+from ..services.reference import get_reference_data
+from ..services.planning import plan_production
+from ..pagination import seek
 
 
 import logging
@@ -23,26 +29,38 @@ class AircraftRequirementView(APIView):
         responses={200: AircraftRequirementSerializer(many=True)}
     )
     @check_team_permission('view_assembly')
+    @conditional_response(REFERENCE)
     def get(self, request, aircraft_id):
         """GET metodu - Uçak gereksinimlerini döndürür"""
         
         logger.info(f"Uçak gereksinimleri istendi",extra={'user': request.user.username,'detail': f"Aircraft : {aircraft_id}",'path': request.path} )
 
-        aircraft = get_object_or_404(Aircraft, pk=aircraft_id)
-        requirements = aircraft.requirements.all()
+        # Uçak ve gereksinimleri referans önbelleğinden okunur
+        reference = get_reference_data()
+        if aircraft_id not in reference.aircrafts:
+            raise Http404
+        requirements = reference.requirements.get(aircraft_id, [])
         serializer = AircraftRequirementSerializer(requirements, many=True)
         
         return Response(serializer.data)
 
 class AvailablePartsView(APIView):
-
+    MAX_LIMIT = 500
 
     @swagger_auto_schema(
         operation_summary="Kullanılabilir parçalar",
-        operation_description="Belirtilen uçak ve parça tipi için kullanılabilir parçaları döndürür",
+        operation_description=(
+            "Belirtilen uçak ve parça tipi için kullanılabilir parçaları döndürür. limit verilirse en eski "
+            "(FIFO) limit adet parça döner; X-Total-Count stoktaki toplam adedi, X-Next-Cursor sonraki sayfanın imlecini içerir"
+        ),
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Döndürülecek en fazla parça sayısı"),
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING, description="X-Next-Cursor ile dönen imleç"),
+        ],
         responses={200: AvailablePartSerializer(many=True)}
     )
     @check_team_permission('view_assembly')
+    @conditional_response(PART, REFERENCE, scope=part_type_scope('part_type_id'))
     def get(self, request, aircraft_id, part_type_id):
         """GET metodu - Kullanılabilir parçaları döndürür"""
         
@@ -52,7 +70,75 @@ class AvailablePartsView(APIView):
             aircraft_type_id=aircraft_id,
             type_id=part_type_id,
             is_used=False
-        )
-        
-        serializer = AvailablePartSerializer(available_parts, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        ).select_related('type')
+
+        if 'limit' not in request.GET:
+            serializer = AvailablePartSerializer(available_parts, many=True)
+            return Response(serializer.data)
+
+        try:
+            limit = min(int(request.GET['limit']), self.MAX_LIMIT)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return Response({"error": "limit pozitif bir sayı olmalıdır."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # En eski parçalar part_available_fifo indeksi üzerinden okunur, stok derinliği maliyeti etkilemez
+        parts, next_cursor = seek(available_parts, 'created_at', request.GET.get('cursor'), limit)
+        response = Response(AvailablePartSerializer(parts, many=True).data)
+
+        # Toplam adet parça tablosu sayılmadan envanter sayacından okunur
+        total = Inventory.objects.with_current_quantity().filter(
+            aircraft_type_id=aircraft_id,
+            part_type_id=part_type_id
+        ).values_list('current_quantity', flat=True).first()
+        response['X-Total-Count'] = str(total or 0)
+        if next_cursor:
+            response['X-Next-Cursor'] = next_cursor
+        return response
+
+
+class BuildableAircraftView(APIView):
+
+
+    @swagger_auto_schema(
+        operation_summary="Üretilebilir uçaklar",
+        operation_description="Mevcut envanterle her uçak tipinden kaç adet tam uçak üretilebileceğini döndürür",
+        responses={200: AircraftBuildabilitySerializer(many=True)}
+    )
+    @check_team_permission('view_assembly')
+    def get(self, request):
+        """GET metodu - Uçak tipi başına üretilebilir uçak sayısını döndürür"""
+
+        logger.info(f"Üretilebilir uçaklar istendi",extra={'user': request.user.username,'detail': request.method,'path': request.path} )
+
+        # Sayaçlar envanter değiştikçe güncellendiği için burada hesaplama yapılmaz
+        buildability = AircraftBuildability.objects.select_related('aircraft_type')
+        serializer = AircraftBuildabilitySerializer(buildability, many=True)
+        return Response(serializer.data)
+
+
+class ProductionPlanView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Üretim planı (MRP)",
+        operation_description=(
+            "Uçak tipi başına hedef adetler için gereksinim x hedef - kullanılmamış stok olarak net parça ihtiyacını "
+            "parça tipi ve üreten takım bazında döndürür. Uçak tipleri için üretilebilir adet ve darboğaz parça tipleri de hesaplanır. "
+            "Hedef verilmezse tüm uçak tipleri için sadece üretilebilir adetler döner"
+        ),
+        request_body=ProductionPlanSerializer,
+        responses={200: "aircrafts, part_types, teams ve lines listeleri"}
+    )
+    @check_team_permission('view_assembly')
+    def post(self, request):
+        """POST metodu - Hedef üretim planı için net parça ihtiyacını döndürür"""
+
+        serializer = ProductionPlanSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        targets = serializer.validated_data['targets']
+        logger.info(f"Üretim planı istendi",extra={'user': request.user.username,'detail': f"Hedefler : {targets}",'path': request.path} )
+
+        return Response(plan_production(targets))
@@ -4,18 +4,44 @@ from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from django.shortcuts import render, get_object_or_404,redirect
 from django.core.exceptions import PermissionDenied
-from ..models.aircraft import Aircraft
 from ..models.assembly import Assembly
-from ..serializers.assembly import AssemblySerializer, AssemblyCreateSerializer
+from ..serializers.assembly import AssemblySerializer, AssemblyCreateSerializer, AssemblySummarySerializer, AssemblyAllocateSerializer, AssemblyBatchSerializer
 from ..models.part import Part
+from ..services.assembly import consume_parts, cancel_assembly, get_assembly_summaries, allocate_assembly, build_assemblies, PartsUnavailableError, InsufficientPartsError
 from django.db.models import Q,Prefetch
 from django.db import transaction
 
-from core.decorators import check_team_permission
+from core.decorators import check_team_permission, conditional_response
+from ..pagination import paginate
+from ..serializers.projections import ASSEMBLY_SUMMARY_PROJECTION
+from ..services.search import search_queryset, ASSEMBLY_SEARCH, RANK_FIELD
+from ..services.counts import count_records, get_team_scope
+from ..services.versions import ASSEMBLY, PART, USER, REFERENCE
+from ..services.reference import get_reference_data
 
 import logging
 logger = logging.getLogger("core")
 
+
+def get_assembly_detail_queryset():
+    # Tüm ilişkili verileri sabit sayıda sorguda alır, sorgu optimizasyonu için önemli
+    return Assembly.objects.select_related(
+        'aircraft_type',
+        'assembled_by',
+        'assembled_by__team'
+    ).prefetch_related(
+        Prefetch(
+            'parts',
+            queryset=Part.objects.select_related(
+                'type',
+                'aircraft_type',
+                'created_by',
+                'created_by__team'
+            ).order_by('-created_at')
+        )
+    )
+
+
 class AssemblyView(APIView):
     template_name = 'core/assembly_list.html'
 
@@ -23,28 +49,14 @@ class AssemblyView(APIView):
         # Datatable için oluşturulan sorgu
 
         # İlişkili alanları tek sorguda alır, sorgu optimizasyonu için önemli
+        # Parçalar listede yüklenmez, özet bilgiler sayfa için tek GROUP BY sorgusu ile hesaplanır
         queryset = Assembly.objects.select_related(
             'aircraft_type',
             'assembled_by',
             'assembled_by__team'
-        ).prefetch_related(
-            Prefetch(
-                'parts',
-                queryset=Part.objects.select_related(
-                    'type',
-                    'aircraft_type',
-                    'created_by',
-                    'created_by__team'
-                ).order_by('-created_at')
-            )
-        )
+        ).defer('notes')
         
-        if search:
-            queryset = queryset.filter(
-                Q(aircraft_type__name__icontains=search) |
-                Q(assembled_by__username__icontains=search) |
-                Q(notes__icontains=search)
-            )
+        queryset = search_queryset(queryset, search, ASSEMBLY_SEARCH)
 
         if order_by:
             queryset = queryset.order_by(order_by)
@@ -53,10 +65,11 @@ class AssemblyView(APIView):
 
     @swagger_auto_schema(
         operation_summary="Montaj listesi görüntüleme",
-        operation_description="Montajların listesini döndürür",
-        responses={200: AssemblySerializer(many=True)}
+        operation_description="Montajların listesini parça sayısı, parça tipi ve takım dağılımı özetiyle döndürür. Parçaların tamamı detay servisinde döner",
+        responses={200: AssemblySummarySerializer(many=True)}
     )
     @check_team_permission('view_assembly')
+    @conditional_response(ASSEMBLY, PART, USER, REFERENCE)
     def get(self, request):
         """GET metodu - Montaj Listesini döndürür - Content-Type'a göre JSON veya HTML döner - Datatable için uygun"""
 
@@ -66,31 +79,42 @@ class AssemblyView(APIView):
             search = request.GET.get('search_value', '')
             order_column = request.GET.get('order_column', 0)
             order_dir = request.GET.get('order_dir', 'asc')
-            start = int(request.GET.get('start', 0))
-            length = int(request.GET.get('length', 10))
 
             columns = ['aircraft_type__name', 'assembled_by__username', 'assembled_at', 'is_complete']
             
             order_by = columns[int(order_column)] if int(order_column) < len(columns) else 'assembled_at'
             if order_dir == 'desc':
                 order_by = '-' + order_by
+            # Sıralama sütunu seçilmeden arama yapıldığında sonuçlar eşleşme puanına göre sıralanır
+            if search and 'order_column' not in request.GET:
+                order_by = '-' + RANK_FIELD
             
             queryset = self.get_queryset(search=search, order_by=order_by)
-            total_count = queryset.count()
+            records_total, records_filtered = count_records(
+                'assembly', queryset, self.get_queryset(), get_team_scope(request.user), search, [ASSEMBLY]
+            )
             
-            paginated_queryset = queryset[start:start + length]
-            serializer = AssemblySerializer(paginated_queryset, many=True)
+            # cursor parametresi verilirse OFFSET yerine (sıralama değeri, id) üzerinden sayfalanır
+            # Satırlar model nesnesi oluşturulmadan okunur, çıktı AssemblySummarySerializer ile aynıdır
+            rows, next_cursor, prev_cursor = paginate(request, ASSEMBLY_SUMMARY_PROJECTION.values(queryset), order_by)
+
+            rows = list(rows)
+            summaries = get_assembly_summaries([row['id'] for row in rows])
+            for row in rows:
+                row.update(summaries[row['id']])
             
             response_data = {
                 "draw": int(request.GET.get('draw', 1)),
-                "recordsTotal": total_count,
-                "recordsFiltered": total_count,
-                "data": serializer.data
+                "recordsTotal": records_total,
+                "recordsFiltered": records_filtered,
+                "data": ASSEMBLY_SUMMARY_PROJECTION.serialize(rows),
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             }
 
             return Response(response_data)
         else:
-            aircraft_types = Aircraft.objects.all()
+            aircraft_types = get_reference_data().aircrafts.values()
             return render(request, self.template_name, {'aircraft_types': aircraft_types})
         
 
@@ -116,14 +140,20 @@ class AssemblyView(APIView):
                         is_complete=True
                     )
 
-                    for part in serializer.validated_data['parts']:
-                        part.is_used = True
-                        part.save()
+                    # Parçalar tek UPDATE ile kullanıldı olarak işaretlenir, envanter parça tipi başına bir kez azaltılır
+                    consume_parts(serializer.validated_data['parts'], assembly=assembly, actor=request.user)
 
-                    return Response(
-                        AssemblySerializer(assembly).data,
-                        status=status.HTTP_201_CREATED
-                    )
+                assembly = get_assembly_detail_queryset().get(pk=assembly.pk)
+                return Response(
+                    AssemblySerializer(assembly).data,
+                    status=status.HTTP_201_CREATED
+                )
+            except PartsUnavailableError as e:
+                logger.warning(f"Montaj parçaları başka bir işlemde kullanılmış.",extra={'user': request.user.username,'detail': str(e),'path': request.path} )
+                return Response(
+                    {"error": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             except Exception as e:
                 logger.error(f"Montaj oluşturma işlemi sırasında hata oluştu.",extra={'user': request.user.username,'detail': str(e),'path': request.path} )
                 return Response(
@@ -132,6 +162,84 @@ class AssemblyView(APIView):
                 )
         return Response(serializer.errors, status=status.HTTP_403_FORBIDDEN)
 
+class AssemblyAllocateView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Parçaları otomatik seçerek montaj oluşturur",
+        operation_description=(
+            "Uçak tipinin gereksinimlerine göre stoktaki en eski parçaları ayırır ve montajı oluşturur. "
+            "Başka bir montajın kilitlediği parçalar beklenmeden atlanır"
+        ),
+        request_body=AssemblyAllocateSerializer,
+        responses={201: AssemblySerializer()}
+    )
+    @check_team_permission('manage_assembly')
+    def post(self, request):
+        serializer = AssemblyAllocateSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(f"Otomatik montaj isteği atıldı.",extra={'user': request.user.username,'detail': request.method,'path': request.path} )
+        try:
+            assembly = allocate_assembly(
+                serializer.validated_data['aircraft_type'],
+                request.user,
+                notes=serializer.validated_data['notes']
+            )
+        except InsufficientPartsError as e:
+            logger.warning(f"Otomatik montaj için stok yetersiz.",extra={'user': request.user.username,'detail': str(e),'path': request.path} )
+            return Response(
+                {"error": str(e), "missing": e.missing},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        assembly = get_assembly_detail_queryset().get(pk=assembly.pk)
+        return Response(
+            AssemblySerializer(assembly).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class AssemblyBatchView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Toplu montaj oluşturur",
+        operation_description=(
+            "Uçak tipinin gereksinimlerine göre count adet montajı tek istekte oluşturur. Stok yetmezse "
+            "tamamlanabilen kadar montaj oluşturulur, eksik parça tipleri missing alanında döner"
+        ),
+        request_body=AssemblyBatchSerializer,
+        responses={201: "Oluşturulan montajlar ve eksikler", 409: "Hiç montaj oluşturulamadı"}
+    )
+    @check_team_permission('manage_assembly')
+    def post(self, request):
+        serializer = AssemblyBatchSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        count = serializer.validated_data['count']
+        logger.info(f"Toplu montaj isteği atıldı.",extra={'user': request.user.username,'detail': f"Adet : {count}",'path': request.path} )
+
+        assemblies, missing = build_assemblies(
+            serializer.validated_data['aircraft_type'],
+            request.user,
+            count,
+            notes=serializer.validated_data['notes']
+        )
+        if missing:
+            logger.warning(f"Toplu montaj için stok yetersiz.",extra={'user': request.user.username,'detail': f"{len(assemblies)}/{count} montaj oluşturuldu",'path': request.path} )
+
+        return Response(
+            {
+                "requested": count,
+                "built": len(assemblies),
+                "assemblies": [assembly.id for assembly in assemblies],
+                "missing": missing
+            },
+            status=status.HTTP_201_CREATED if assemblies else status.HTTP_409_CONFLICT
+        )
+
+
 class AssemblyDetailView(APIView):
 
     @swagger_auto_schema(
@@ -140,32 +248,14 @@ class AssemblyDetailView(APIView):
         responses={200: AssemblySerializer()}
     )
     @check_team_permission('view_assembly')
+    @conditional_response(ASSEMBLY, PART, USER, REFERENCE)
     def get(self, request, pk):
         """GET metodu - Tekil kayıt döndürür"""
 
         logger.info(f"Montaj detay görüntüleme isteği atıldı.",extra={'user': request.user.username,'detail': request.method,'path': request.path} )
 
         # Tüm ilişkili verileri tek sorguda alır, sorgu optimizasyonu için önemli
-        assembly = get_object_or_404(
-            Assembly.objects
-            .select_related(
-                'aircraft_type',
-                'assembled_by',
-                'assembled_by__team'
-            )
-            .prefetch_related(
-                Prefetch(
-                    'parts',
-                    queryset=Part.objects.select_related(
-                        'type',
-                        'aircraft_type',
-                        'created_by',
-                        'created_by__team'
-                    ).order_by('-created_at')
-                )
-            ),
-            pk=pk
-        )
+        assembly = get_object_or_404(get_assembly_detail_queryset(), pk=pk)
         serializer = AssemblySerializer(assembly)
         return Response(serializer.data)
 
@@ -176,13 +266,12 @@ class AssemblyDetailView(APIView):
     )
     @check_team_permission('manage_assembly')
     def delete(self, request, pk):
-        assembly = get_object_or_404(Assembly, pk=pk)
-            
-        # Parçaları kullanılmamış olarak işaretle
-        for part in assembly.parts.all():
-            part.is_used = False
-            part.save()
-            
-        assembly.delete()
+        with transaction.atomic():
+            # Montaj satırı kilitlenir, aynı montajın iki kez iptal edilip envanterin iki kez artırılması engellenir
+            assembly = get_object_or_404(Assembly.objects.select_for_update(), pk=pk)
+
+            # Parçaları tek sorguda kullanılmamış olarak işaretle ve envantere geri ekle
+            cancel_assembly(assembly, actor=request.user)
+
         logger.info('Montaj silme işlemi başarılı.',extra={'user': request.user.username,'detail': f"Montaj id:{pk}",'path': request.path})
         return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
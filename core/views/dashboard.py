@@ -4,9 +4,10 @@ from rest_framework.response import Response
 
 from django.shortcuts import render
 from rest_framework.permissions import AllowAny
+from ..models.aircraft import AircraftBuildability
 from ..models.assembly import Assembly
 from ..models.part import Part
-from accounts.models import Team
+from ..services.reference import get_reference_data
 
 import logging
 logger = logging.getLogger("core")
@@ -17,7 +18,8 @@ class DashboardView(APIView):
         context = {
             'total_aircrafts': Assembly.objects.filter(is_complete=True).count(),
             'total_parts': Part.objects.count(),
-            'total_teams': Team.objects.count(),
+            'total_teams': len(get_reference_data().teams),
             'total_assemblies': Assembly.objects.count(),
+            'buildable_aircrafts': AircraftBuildability.objects.select_related('aircraft_type'),
         }
         return render(request, 'home.html' , context)
\ No newline at end of file
@@ -0,0 +1,65 @@
+# core/views/export.py
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.views import APIView
+
+from core.decorators import check_team_permission
+from ..services.export import FORMATS, get_export_rows, render_export
+
+import logging
+
+logger = logging.getLogger("core")
+
+
+def stream_export(request, name, export_format):
+    """
+    Kaydı CSV veya NDJSON olarak akış halinde döndürür.
+    Satırlar sunucu taraflı imleçle okunur ve yazıldıkça gönderilir, yanıt bellekte biriktirilmez.
+    """
+    if export_format not in FORMATS:
+        return JsonResponse({'error': f"Geçersiz format. Desteklenen formatlar: {', '.join(FORMATS)}"}, status=400)
+
+    logger.info(f'{name} dışa aktarma istegi atildi ({export_format}).', extra={'user': request.user.username, 'detail': request.method, 'path': request.path})
+
+    rows = get_export_rows(name, user=request.user)
+    response = StreamingHttpResponse(render_export(name, rows, export_format), content_type=FORMATS[export_format])
+    filename = f"{name}-{timezone.localtime().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+class PartExportView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Parçaları dışa aktarır",
+        operation_description="Kullanıcının görebildiği parçaları CSV veya NDJSON olarak akış halinde döndürür"
+    )
+    @check_team_permission('view_part')
+    def get(self, request, export_format):
+        """GET metodu - Parça listesini csv/ndjson dosyası olarak döndürür"""
+        return stream_export(request, 'part', export_format)
+
+
+class AssemblyExportView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Montajları dışa aktarır",
+        operation_description="Montajları kullanılan parça id'leri ile birlikte CSV veya NDJSON olarak akış halinde döndürür"
+    )
+    @check_team_permission('view_assembly')
+    def get(self, request, export_format):
+        """GET metodu - Montaj listesini csv/ndjson dosyası olarak döndürür"""
+        return stream_export(request, 'assembly', export_format)
+
+
+class InventoryExportView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Envanteri dışa aktarır",
+        operation_description="Kullanıcının görebildiği envanter kayıtlarını CSV veya NDJSON olarak akış halinde döndürür"
+    )
+    @check_team_permission('view_inventory')
+    def get(self, request, export_format):
+        """GET metodu - Envanter listesini csv/ndjson dosyası olarak döndürür"""
+        return stream_export(request, 'inventory', export_format)
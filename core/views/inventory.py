@@ -8,13 +8,20 @@ from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 from django.shortcuts import render, get_object_or_404
-from ..models.inventory import Inventory
+from ..models.inventory import Inventory, InventoryAlert
 from ..models.part import Part
 from ..models.aircraft import AircraftRequirement
-from ..serializers.inventory import InventorySerializer,InventoryPatchSerializer
+from ..serializers.inventory import InventorySerializer,InventoryPatchSerializer,ShortageSerializer,InventoryAlertSerializer
+from ..services.shortage import get_missing_parts, get_shortages
+from ..services.alerts import evaluate_stock_alerts, get_critical_inventory
 from django.db.models import Q
 from django.db import models
-from core.decorators import check_team_permission
+from core.decorators import check_team_permission, conditional_response, team_scope
+from ..pagination import paginate
+from ..serializers.projections import INVENTORY_PROJECTION, parse_columns
+from ..services.search import search_queryset, INVENTORY_SEARCH, RANK_FIELD
+from ..services.counts import count_records, get_team_scope
+from ..services.versions import INVENTORY, REFERENCE
 
 import logging
 
@@ -30,7 +37,7 @@ class InventoryView(APIView):
         queryset = Inventory.objects.select_related(
             'part_type',
             'aircraft_type'
-        )
+        ).with_current_quantity()
         
         # User kontrollerini middleware verisiyle yap (User için ekstra istek atmaması için)
         if user.is_superuser:
@@ -40,11 +47,7 @@ class InventoryView(APIView):
         elif not user.team.is_assembly_team:
             queryset = queryset.filter(part_type_id=user.team.part_type_id) 
 
-        if search:
-            queryset = queryset.filter(
-                Q(part_type__name__icontains=search) |
-                Q(aircraft_type__name__icontains=search)
-            )
+        queryset = search_queryset(queryset, search, INVENTORY_SEARCH)
 
         if order_by:
             queryset = queryset.order_by(order_by)
@@ -53,37 +56,8 @@ class InventoryView(APIView):
 
 
     def get_missing_parts(self):
-        requirements = (
-            AircraftRequirement.objects
-            .select_related('aircraft_type', 'part_type')
-            .values(
-                'aircraft_type__name', 
-                'part_type__name', 
-                'quantity', 
-                'aircraft_type_id', 
-                'part_type_id'
-            )
-        )
-
-        result = {}
-        for req in requirements:
-            aircraft = req['aircraft_type__name']
-            part_count = Part.objects.filter(
-                aircraft_type_id=req['aircraft_type_id'],
-                type_id=req['part_type_id'],
-                is_used=False
-            ).count()
-            
-            missing = req['quantity'] - part_count
-            if missing > 0:
-                if aircraft not in result:
-                    result[aircraft] = []
-                result[aircraft].append({
-                    'part': req['part_type__name'],
-                    'quantity': missing
-                })
-
-        return result
+        # Eksik parçalar tek bir gruplanmış sorgu ile hesaplanır
+        return get_missing_parts()
 
     @swagger_auto_schema(
         operation_summary="Envanter listesi  döndürür",
@@ -91,6 +65,7 @@ class InventoryView(APIView):
         responses={200: InventorySerializer(many=True)}
     )
     @check_team_permission('view_inventory')
+    @conditional_response(INVENTORY, REFERENCE, scope=team_scope)
     def get(self, request):
         """GET metodu - Envanter Listesini döndürür - Content-Type'a göre JSON veya HTML döner - Datatable için uygun"""
         
@@ -100,32 +75,40 @@ class InventoryView(APIView):
             search = request.GET.get('search_value', '')
             order_column = request.GET.get('order_column', 0)
             order_dir = request.GET.get('order_dir', 'asc')
-            start = int(request.GET.get('start', 0))
-            length = int(request.GET.get('length', 10))
 
-            columns = ['part_type', 'aircraft_type', 'quantity', 'minimum_quantity','updated_at']
+            columns = ['part_type', 'aircraft_type', 'current_quantity', 'minimum_quantity','updated_at']
             
 
             order_by = columns[int(order_column)] if int(order_column) < len(columns) else 'name'
             if order_dir == 'desc':
                 order_by = '-' + order_by
+            # Sıralama sütunu seçilmeden arama yapıldığında sonuçlar eşleşme puanına göre sıralanır
+            if search and 'order_column' not in request.GET:
+                order_by = '-' + RANK_FIELD
             
             queryset = self.get_queryset(search=search, order_by=order_by)
+            # Her sayı istek başına en fazla bir kez hesaplanır, sonuç tablo sürümüne göre önbelleğe alınır
+            records_total, records_filtered = count_records(
+                'inventory', queryset, self.get_queryset(), get_team_scope(request.user), search, [INVENTORY]
+            )
 
-            paginated_queryset = queryset[start:start + length]
-
-            serializer = InventorySerializer(paginated_queryset, many=True)
+            # Sadece gösterilen sütunlar .values() ile okunur, model nesnesi oluşturulmaz
+            # Çıktı InventorySerializer ile aynıdır
+            fields = parse_columns(request)
+            # cursor parametresi verilirse OFFSET yerine (sıralama değeri, id) üzerinden sayfalanır
+            rows, next_cursor, prev_cursor = paginate(request, INVENTORY_PROJECTION.values(queryset, fields), order_by)
             response_data = {
                 "draw": int(request.GET.get('draw', 1)),  
-                "recordsTotal": queryset.count(),  
-                "recordsFiltered": queryset.count(),  
-                "data": serializer.data 
+                "recordsTotal": records_total,
+                "recordsFiltered": records_filtered,
+                "data": INVENTORY_PROJECTION.serialize(rows, fields),
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             }
 
             return Response(response_data)
         else:
             missing_parts = self.get_missing_parts()
-            print(missing_parts)
             return render(request, self.template_name, {'missing_parts': missing_parts})
     
 
@@ -135,6 +118,114 @@ class InventoryView(APIView):
     
 
 
+class MissingPartsView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Eksik parçalar",
+        operation_description="Uçak gereksinimlerine göre envanterde eksik olan parçaları döndürür",
+        responses={200: ShortageSerializer(many=True)}
+    )
+    @check_team_permission('view_inventory')
+    def get(self, request):
+        """GET metodu - Eksik parça listesini döndürür"""
+
+        logger.info('Eksik parçalar istendi.',extra={'user': request.user.username,'detail': request.method,'path': request.path})
+
+        aircraft_type_id = request.GET.get('aircraft_type')
+        if aircraft_type_id:
+            try:
+                aircraft_type_id = int(aircraft_type_id)
+            except ValueError:
+                return Response({"error": "aircraft_type bir sayı olmalıdır."}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            aircraft_type_id = None
+
+        # Montaj takımı dışındaki takımlar sadece kendi parça tiplerinin eksiklerini görür
+        user = request.user
+        part_type_id = None
+        if user.is_superuser:
+            pass
+        elif not user.team:
+            raise PermissionDenied("Kullanıcının takımı bulunmuyor.")
+        elif not user.team.is_assembly_team:
+            part_type_id = user.team.part_type_id
+
+        shortages = get_shortages(aircraft_type_id, part_type_id)
+        serializer = ShortageSerializer(shortages, many=True)
+        return Response(serializer.data)
+
+
+class CriticalInventoryView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Kritik envanter",
+        operation_description="Kritik seviyedeki veya stoğu biten envanter satırlarını döndürür",
+        responses={200: InventorySerializer(many=True)}
+    )
+    @check_team_permission('view_inventory')
+    def get(self, request):
+        """GET metodu - Kritik envanter listesini döndürür"""
+
+        logger.info('Kritik envanter istendi.',extra={'user': request.user.username,'detail': request.method,'path': request.path})
+
+        queryset = get_critical_inventory().select_related(
+            'part_type',
+            'aircraft_type'
+        ).with_current_quantity().order_by('aircraft_type__name', 'part_type__name')
+
+        user = request.user
+        if user.is_superuser:
+            pass
+        elif not user.team:
+            raise PermissionDenied("Kullanıcının takımı bulunmuyor.")
+        elif not user.team.is_assembly_team:
+            queryset = queryset.filter(part_type_id=user.team.part_type_id)
+
+        serializer = InventorySerializer(queryset, many=True)
+        return Response(serializer.data)
+
+
+class InventoryAlertView(APIView):
+    MAX_LIMIT = 500
+
+    @swagger_auto_schema(
+        operation_summary="Stok uyarıları",
+        operation_description="Stok eşik geçişlerini yeniden eskiye döndürür. after verilirse sadece bu id'den sonraki uyarılar döner",
+        responses={200: InventoryAlertSerializer(many=True)}
+    )
+    @check_team_permission('view_inventory')
+    def get(self, request):
+        """GET metodu - Stok uyarı akışını döndürür"""
+
+        logger.info('Stok uyarıları istendi.',extra={'user': request.user.username,'detail': request.method,'path': request.path})
+
+        try:
+            limit = min(int(request.GET.get('limit', 50)), self.MAX_LIMIT)
+            after = int(request.GET.get('after') or 0)
+        except ValueError:
+            limit = after = -1
+        if limit < 1 or after < 0:
+            return Response(
+                {"error": "limit pozitif, after negatif olmayan bir sayı olmalıdır."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = InventoryAlert.objects.select_related('part_type', 'aircraft_type')
+        if after:
+            queryset = queryset.filter(id__gt=after)
+
+        user = request.user
+        if user.is_superuser:
+            pass
+        elif not user.team:
+            raise PermissionDenied("Kullanıcının takımı bulunmuyor.")
+        elif not user.team.is_assembly_team:
+            queryset = queryset.filter(part_type_id=user.team.part_type_id)
+
+        serializer = InventoryAlertSerializer(queryset[:limit], many=True)
+        return Response(serializer.data)
+
+
 class InventoryDetailView(APIView):
 
     @swagger_auto_schema(
@@ -142,9 +233,10 @@ class InventoryDetailView(APIView):
         operation_description="Envanter detayını döndürür",
         responses={200: InventorySerializer}
     )
+    @conditional_response(INVENTORY, REFERENCE)
     def get(self, request, pk):
         """GET metodu - Tekil kayıt döndürür"""
-        inventory = get_object_or_404(Inventory, pk=pk)
+        inventory = get_object_or_404(Inventory.objects.with_current_quantity(), pk=pk)
         serializer = InventorySerializer(inventory)
         return Response(serializer.data)
 
@@ -166,6 +258,8 @@ class InventoryDetailView(APIView):
         
         if serializer.is_valid(raise_exception=True):
             serializer.save()
+            # Minimum adet değişince stok durumu da değişebilir
+            evaluate_stock_alerts([(inventory.part_type_id, inventory.aircraft_type_id)])
             logger.info('Envanter güncelleme işlemi tamamlandı.',extra={'user': request.user.username,'detail': json.dumps(InventorySerializer(inventory).data),'path': request.path})
             return Response(serializer.data, status=status.HTTP_200_OK)
         
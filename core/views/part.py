@@ -9,8 +9,14 @@ from ..models.aircraft import Aircraft
 from django.db.models import Q
 
 
-from ..serializers.part import PartSerializer, PartCreateSerializer
-from core.decorators import check_team_permission
+from ..serializers.part import PartSerializer, PartCreateSerializer, PartBulkCreateSerializer
+from core.decorators import check_team_permission, conditional_response, team_scope
+from ..pagination import paginate
+from ..serializers.projections import PART_PROJECTION, parse_columns
+from ..services.search import search_queryset, PART_SEARCH, RANK_FIELD
+from ..services.counts import count_records, get_team_scope
+from ..services.versions import PART, USER, REFERENCE
+from ..services.reference import get_reference_data
 
 
 from django.core.exceptions import PermissionDenied
@@ -19,6 +25,29 @@ import json
 import logging
 logger = logging.getLogger("core")
 
+def get_team_parts(user):
+    """
+    Kullanıcının görebildiği parçalar: süper kullanıcı ve montaj takımı tüm parçaları,
+    diğer takımlar sadece kendi parça tiplerini görür.
+    """
+    # İlişkili alanları tek sorguda alır, sorgu optimizasyonu için önemli
+    queryset = Part.objects.select_related(
+        'type',
+        'aircraft_type',
+        'created_by',
+        'created_by__team'
+    )
+
+    # Kullanıcının yetkisine göre parça getirmesi için gerekli kontroller yapılır
+    if user.is_superuser:
+        return queryset
+    if not user.team:
+        raise PermissionDenied("Kullanıcının takımı bulunmuyor.")
+    if not user.team.is_assembly_team:
+        queryset = queryset.filter(type_id=user.team.part_type_id)
+    return queryset
+
+
 class PartView(APIView):
     template_name = 'core/part_list.html'
 
@@ -26,30 +55,10 @@ class PartView(APIView):
     def get_queryset(self, search=None, order_by=None):
         # Datatable için oluşturulan sorgu
 
-        user = self.request.user
-        
-        # İlişkili alanları tek sorguda alır, sorgu optimizasyonu için önemli
-        queryset = Part.objects.select_related(
-            'type',
-            'aircraft_type',
-            'created_by',
-            'created_by__team'
-        )
-        
-        # Kullanıcının yetkisine göre parça getirmesi için gerekli kontroller yapılır
-        if user.is_superuser:
-            pass 
-        elif not user.team:
-            raise PermissionDenied("Kullanıcının takımı bulunmuyor.")
-        elif not user.team.is_assembly_team:
-            queryset = queryset.filter(type_id=user.team.part_type_id) 
-        
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(type__name__icontains=search) |
-                Q(aircraft_type__name__icontains=search)
-            )
+        queryset = get_team_parts(self.request.user)
+
+        # Parça adı indeksli tam metin araması ile, tip ve uçak adları küçük tablolarda aranır
+        queryset = search_queryset(queryset, search, PART_SEARCH)
 
         if order_by:
             queryset = queryset.order_by(order_by)
@@ -62,6 +71,7 @@ class PartView(APIView):
         responses={200: PartSerializer(many=True)}
     )
     @check_team_permission('view_part')
+    @conditional_response(PART, USER, REFERENCE, scope=team_scope)
     def get(self, request):
         """GET metodu - Parça Listesini döndürür - Content-Type'a göre JSON veya HTML döner - Datatable için uygun"""
         logger.info('Parca Listesi görüntülenme istegi atildi.',extra={'user': request.user.username,'detail': request.method,'path': request.path})
@@ -69,30 +79,39 @@ class PartView(APIView):
             search = request.GET.get('search_value', '')
             order_column = request.GET.get('order_column', 0)
             order_dir = request.GET.get('order_dir', 'asc')
-            start = int(request.GET.get('start', 0))
-            length = int(request.GET.get('length', 10))
 
             columns = ['name', 'type__name', 'aircraft_type__name', 'created_by', 'created_at','status']
             
             order_by = columns[int(order_column)] if int(order_column) < len(columns) else 'name'
             if order_dir == 'desc':
                 order_by = '-' + order_by
+            # Sıralama sütunu seçilmeden arama yapıldığında sonuçlar eşleşme puanına göre sıralanır
+            if search and 'order_column' not in request.GET:
+                order_by = '-' + RANK_FIELD
             
             queryset = self.get_queryset(search=search, order_by=order_by)
+            # Her sayı istek başına en fazla bir kez hesaplanır, sonuç tablo sürümüne göre önbelleğe alınır
+            records_total, records_filtered = count_records(
+                'part', queryset, self.get_queryset(), get_team_scope(request.user), search, [PART]
+            )
 
-            paginated_queryset = queryset[start:start + length]
-
-            serializer = PartSerializer(paginated_queryset, many=True)
+            # Sadece gösterilen sütunlar .values() ile okunur, model nesnesi oluşturulmaz
+            # Çıktı PartSerializer ile aynıdır
+            fields = parse_columns(request)
+            # cursor parametresi verilirse OFFSET yerine (sıralama değeri, id) üzerinden sayfalanır
+            rows, next_cursor, prev_cursor = paginate(request, PART_PROJECTION.values(queryset, fields), order_by)
             response_data = {
                 "draw": int(request.GET.get('draw', 1)),  
-                "recordsTotal": queryset.count(),  
-                "recordsFiltered": queryset.count(),  
-                "data": serializer.data 
+                "recordsTotal": records_total,
+                "recordsFiltered": records_filtered,
+                "data": PART_PROJECTION.serialize(rows, fields),
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor
             }
 
             return Response(response_data)
         else:
-            aircraft = Aircraft.objects.all()
+            aircraft = get_reference_data().aircrafts.values()
 
             return render(request, self.template_name, {'aircrafts': aircraft,'part_type':request.user.team.part_type})
         
@@ -122,16 +141,53 @@ class PartView(APIView):
         logger.info('Parça validasyon işlemini tamamlayamadı.',extra={'user': request.user.username,'detail': json.dumps(serializer.errors),'path': request.path})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+
+class PartBulkView(APIView):
+
+    @swagger_auto_schema(
+        operation_summary="Toplu parça üretir",
+        operation_description="Parça listesi veya {type, aircraft_type, count} tanımı ile tek işlemde toplu parça üretir",
+        request_body=PartBulkCreateSerializer,
+        responses={201: "Üretilen parça sayısı ve id listesi"}
+    )
+    @check_team_permission('create_part')
+    def post(self, request):
+        """POST metodu - Toplu parça üretir"""
+
+        logger.info('Toplu parca eklenme istegi atildi.',extra={'user': request.user.username,'detail': request.method,'path': request.path})
+
+        # Doğrudan liste gönderildiyse 'parts' alanına sar
+        data = {'parts': request.data} if isinstance(request.data, list) else request.data
+
+        serializer = PartBulkCreateSerializer(data=data, context={'request': request})
+        if serializer.is_valid():
+            parts = serializer.save()
+            logger.info('Toplu parca ekleme islemini tamamladi.',extra={'user': request.user.username,'detail': f"Parça sayısı:{len(parts)}",'path': request.path})
+
+            return Response(
+                {'created': len(parts), 'ids': [part.id for part in parts]},
+                status=status.HTTP_201_CREATED
+            )
+
+        logger.info('Toplu parça validasyon işlemini tamamlayamadı.',extra={'user': request.user.username,'detail': json.dumps(serializer.errors),'path': request.path})
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
     
     
 class PartDetailView(APIView):
 
+    def get_queryset(self):
+        # Detayda da listedeki takım kapsamı uygulanır, kapsam dışındaki parça 404 döner
+        return get_team_parts(self.request.user)
+
     @swagger_auto_schema(
         operation_summary="Parça detay görüntüleme",
         operation_description="Kullanıcının yetkisine göre parça detayını döndürür",
-        responses={200: PartSerializer(many=True)}
+        responses={200: PartSerializer()}
     )
     @check_team_permission('view_part')
+    @conditional_response(PART, USER, REFERENCE, scope=team_scope)
     def get(self, request, pk):
         """GET metodu - Tekil parça detayını döndürür"""
 
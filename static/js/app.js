@@ -40,4 +40,44 @@ $(document).ready(function() {
         }
         return cookieValue;
     }
-});
\ No newline at end of file
+});
+
+// DataTables için koşullu (ETag) istek gönderen ajax fonksiyonu oluşturur.
+// Aynı parametrelerle tekrar istek atıldığında son ETag gönderilir, sunucu veri değişmediyse 304 döner
+// ve saklanan yanıt yeni draw değeriyle tabloya verilir.
+function conditionalAjax(url, buildParams) {
+    const responses = new Map();
+    const maxResponses = 20;
+
+    return function(d, callback) {
+        const params = buildParams(d);
+        const key = JSON.stringify(Object.assign({}, params, { draw: null }));
+        const cached = responses.get(key);
+
+        $.ajax({
+            url: url,
+            type: 'GET',
+            contentType: 'application/json',
+            data: params,
+            headers: cached ? { 'If-None-Match': cached.etag } : {},
+            success: function(json, textStatus, xhr) {
+                if (xhr.status === 304 && cached) {
+                    json = cached.json;
+                } else {
+                    const etag = xhr.getResponseHeader('ETag');
+                    if (etag) {
+                        responses.delete(key);
+                        responses.set(key, { etag: etag, json: json });
+                        if (responses.size > maxResponses) {
+                            responses.delete(responses.keys().next().value);
+                        }
+                    }
+                }
+                callback(Object.assign({}, json, { draw: d.draw }));
+            },
+            error: function(xhr) {
+                console.error('Tablo verisi alınamadı', xhr.status);
+            }
+        });
+    };
+}